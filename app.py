@@ -1,3 +1,4 @@
+import multiprocessing
 from controller.app_controller import Controller
 
 
@@ -7,4 +8,5 @@ def main():
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     main()
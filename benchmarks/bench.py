@@ -0,0 +1,194 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks import synthetic  # noqa: E402
+from model.layout_cache import LayoutCache  # noqa: E402
+from model.model import Model  # noqa: E402
+
+STAGES = [
+    "load_layout", "read_input_df", "validate_layout", "set_layout_fields",
+    "validate_input_df", "transform_input_values", "convert_to_text",
+]
+NOISE_FLOOR = 0.05
+
+
+def _stage_calls(model: Model, layout_path: str, input_path: str,
+                 output_path: str) -> list:
+    state: dict = {}
+    return [
+        ("load_layout", lambda: state.setdefault(
+            "layout", model.load_layout(layout_path))),
+        ("read_input_df", lambda: state.setdefault(
+            "input", model.read_input_df(input_path))),
+        ("validate_layout", lambda: model.validate_layout(state["layout"])),
+        ("set_layout_fields",
+         lambda: model.set_layout_fields(state["layout"])),
+        ("validate_input_df",
+         lambda: model.validate_input_df(state["input"])),
+        ("transform_input_values",
+         lambda: model.transform_input_values(state["input"])),
+        ("convert_to_text", lambda: model.convert_to_text(output_path)),
+    ]
+
+
+def run_stages(layout_path: str, input_path: str, output_path: str,
+               memory: bool = False, workers: int = 1) -> dict:
+    model = Model(layout_cache=LayoutCache())
+    model.workers = workers
+    stages = {}
+    if memory:
+        tracemalloc.start()
+    try:
+        for name, call in _stage_calls(
+                model, layout_path, input_path, output_path):
+            if memory:
+                tracemalloc.reset_peak()
+            started = time.perf_counter()
+            call()
+            stage = {"seconds": time.perf_counter() - started}
+            if memory:
+                stage["peak_mb"] = tracemalloc.get_traced_memory()[1] / 2**20
+            stages[name] = stage
+    finally:
+        if memory:
+            tracemalloc.stop()
+    return stages
+
+
+def run_streaming(layout_path: str, input_path: str, output_path: str,
+                  workers: int = 1) -> float:
+    model = Model(layout_cache=LayoutCache())
+    model.workers = workers
+    started = time.perf_counter()
+    model.convert_file(layout_path, input_path, output_path)
+    return time.perf_counter() - started
+
+
+def run_case(args: argparse.Namespace, rows: int) -> dict:
+    layout_path, input_path = synthetic.generate(
+        args.data_dir, args.fields, rows, args.format,
+        new_line_every=args.new_line_every)
+    output_path = os.path.join(tempfile.mkdtemp(), "bench.txt")
+
+    best: dict = {}
+    for _ in range(args.repeat):
+        stages = run_stages(layout_path, input_path, output_path,
+                            workers=args.workers)
+        for name, stage in stages.items():
+            if name not in best or stage["seconds"] < best[name]["seconds"]:
+                best[name] = stage
+    if args.memory:
+        for name, stage in run_stages(
+                layout_path, input_path, output_path, memory=True,
+                workers=args.workers).items():
+            best[name]["peak_mb"] = stage["peak_mb"]
+
+    total = sum(stage["seconds"] for stage in best.values())
+    case = {
+        "rows": rows,
+        "fields": args.fields,
+        "format": args.format,
+        "stages": best,
+        "total_seconds": total,
+        "rows_per_second": rows / total if total else 0.0,
+    }
+    if args.streaming:
+        case["streaming_seconds"] = min(
+            run_streaming(layout_path, input_path, output_path,
+                          args.workers)
+            for _ in range(args.repeat))
+    return case
+
+
+def case_key(case: dict) -> str:
+    return f"{case['format']}/f{case['fields']}/r{case['rows']}"
+
+
+def compare(cases: list, baseline: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for case in cases:
+        reference = baseline.get(case_key(case))
+        if reference is None:
+            continue
+        for name, stage in case["stages"].items():
+            before = reference["stages"].get(name, {}).get("seconds")
+            if before is None:
+                continue
+            now = stage["seconds"]
+            if now > before * (1 + tolerance) and now - before > NOISE_FLOOR:
+                regressions.append(
+                    f"{case_key(case)} {name}: "
+                    f"{before:.3f}s -> {now:.3f}s")
+    return regressions
+
+
+def print_case(case: dict) -> None:
+    print(f"\n{case_key(case)}  "
+          f"{case['rows_per_second']:.0f} linhas/s "
+          f"(total {case['total_seconds']:.3f}s)")
+    for name in STAGES:
+        stage = case["stages"][name]
+        peak = stage.get("peak_mb")
+        peak_text = f"  pico {peak:8.1f} MB" if peak is not None else ""
+        print(f"  {name:<24}{stage['seconds']:9.3f}s{peak_text}")
+    if "streaming_seconds" in case:
+        print(f"  {'convert_file (stream)':<24}"
+              f"{case['streaming_seconds']:9.3f}s")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Benchmark das etapas de conversão")
+    parser.add_argument("--rows", type=int, nargs="+",
+                        default=[1000, 10000, 100000])
+    parser.add_argument("--fields", type=int, default=20)
+    parser.add_argument("--new-line-every", type=int, default=0)
+    parser.add_argument("--format", choices=["xlsx", "csv", "tsv"],
+                        default="xlsx")
+    parser.add_argument("--data-dir", default=os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "data"))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--memory", action="store_true",
+                        help="Mede o pico de memória de cada etapa")
+    parser.add_argument(
+        "--streaming", action="store_true",
+        help="Mede também Model.convert_file de ponta a ponta")
+    parser.add_argument("--save", help="Salva o resultado como baseline")
+    parser.add_argument("--compare", help="Compara com um baseline salvo")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    cases = [run_case(args, rows) for rows in args.rows]
+    for case in cases:
+        print_case(case)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({case_key(case): case for case in cases}, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(cases, json.load(f), args.tolerance)
+        if regressions:
+            print("\nRegressões encontradas:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            return 1
+        print("\nSem regressões em relação ao baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
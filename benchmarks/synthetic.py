@@ -0,0 +1,98 @@
+import csv
+import os
+import random
+
+ACCENTED_WORDS = [
+    "José", "AÇÃO", "Müller", "São Paulo", "Conceição", "Ângela",
+    "Florianópolis", "Maranhão", "plain", "Ribeirão Preto",
+]
+NULL_CHAR = "*"
+
+
+def make_layout(field_count: int, seed: int = 0,
+                new_line_every: int = 0, null_ratio: float = 0.1) -> list:
+    rng = random.Random(seed)
+    fields = []
+    for i in range(field_count):
+        code = ["", "1", "2", "3", "4", "1;3"][i % 6]
+        fields.append({
+            "campo": f"campo_{i}",
+            "tamanho": str(rng.randint(5, 40)),
+            "decimais": "2" if "3" in code else "",
+            "alinhamento": "D" if code in ("1", "3", "4", "1;3") else "E",
+            "preenchimento": "0" if code in ("1", "3", "1;3") else " ",
+            "obrigatorio": "S" if i % 4 == 0 else "N",
+            "formatacao": code,
+            "novo registro": "S" if new_line_every and i and
+            i % new_line_every == 0 else "N",
+            "anular": NULL_CHAR if rng.random() < null_ratio else "",
+        })
+    return fields
+
+
+def write_layout(fields: list, path: str) -> None:
+    columns = ["Campo", "Tamanho", "Decimais", "Alinhamento",
+               "Preenchimento", "Obrigatorio", "Formatacao",
+               "Novo registro", "Anular"]
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        out = csv.writer(f, delimiter=",")
+        out.writerow(columns)
+        for field in fields:
+            out.writerow([field[c.lower()] for c in columns])
+
+
+def _value(field: dict, rng: random.Random) -> str:
+    if field["anular"] and rng.random() < 0.05:
+        return field["anular"]
+    code = field["formatacao"]
+    if code == "1":
+        return (f"{rng.randint(0, 999)}.{rng.randint(0, 999)}"
+                f"-{rng.randint(0, 99)}")
+    if code == "2":
+        return " ".join(rng.choices(ACCENTED_WORDS, k=rng.randint(1, 3)))
+    if code in ("3", "1;3"):
+        return f"{rng.randint(0, 99999)},{rng.randint(0, 99):02d}"
+    if code == "4":
+        return rng.choice(["0", "0,00", str(rng.randint(1, 9999))])
+    return f"texto {rng.randint(0, 10 ** 6)}"
+
+
+def iter_rows(fields: list, rows: int, seed: int = 0):
+    rng = random.Random(seed)
+    for _ in range(rows):
+        yield [_value(field, rng) for field in fields]
+
+
+def write_input(fields: list, rows: int, path: str, seed: int = 0) -> None:
+    header = [field["campo"] for field in fields]
+    if path.lower().endswith(".xlsx"):
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        sheet.append(header)
+        for row in iter_rows(fields, rows, seed):
+            sheet.append(row)
+        workbook.save(path)
+        return
+
+    delimiter = "\t" if path.lower().endswith(".tsv") else ","
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        out = csv.writer(f, delimiter=delimiter)
+        out.writerow(header)
+        out.writerows(iter_rows(fields, rows, seed))
+
+
+def generate(directory: str, field_count: int, rows: int,
+             input_format: str = "xlsx", seed: int = 0,
+             new_line_every: int = 0) -> tuple[str, str]:
+    os.makedirs(directory, exist_ok=True)
+    name = f"f{field_count}_r{rows}_n{new_line_every}_s{seed}"
+    layout_path = os.path.join(directory, f"layout_{name}.csv")
+    input_path = os.path.join(directory, f"input_{name}.{input_format}")
+    fields = make_layout(field_count, seed, new_line_every)
+    if not os.path.exists(layout_path):
+        write_layout(fields, layout_path)
+    if not os.path.exists(input_path):
+        write_input(fields, rows, input_path, seed)
+    return layout_path, input_path
@@ -0,0 +1,298 @@
+import argparse
+import multiprocessing
+import sys
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="conversor",
+        description="Conversor Excel → TXT posicional (modo linha de comando)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    convert = commands.add_parser(
+        "convert", help="Converte uma planilha usando um layout CSV")
+    convert.add_argument("-l", "--layout", required=True,
+                         help="Arquivo de layout (CSV)")
+    convert.add_argument("-i", "--input", required=True,
+                         help="Arquivo de entrada (Excel, CSV ou TSV)")
+    convert.add_argument("-o", "--output", required=True,
+                         help="Arquivo de saída (.txt)")
+    convert.add_argument("-n", "--num-files", default="1",
+                         help="Número de arquivos TXT gerados")
+    convert.add_argument("--max-bytes", type=int,
+                         help="Tamanho máximo de cada TXT em bytes "
+                              "(abre um novo arquivo ao atingir o limite)")
+    convert.add_argument("--max-records", type=int,
+                         help="Número máximo de registros por TXT")
+    convert.add_argument("--chunk-size", type=int,
+                         help="Linhas lidas por bloco na leitura em streaming")
+    convert.add_argument("-w", "--workers", type=int, default=1,
+                         help="Processos usados na conversão")
+    convert.add_argument("--delimiter",
+                         help="Separador da entrada CSV/TSV "
+                              "(padrão: ',' para .csv e tab para .tsv)")
+    convert.add_argument("--encoding",
+                         help="Codificação da entrada CSV/TSV "
+                              "(padrão: utf-8-sig)")
+    convert.add_argument("--sheets",
+                         help="Abas da planilha convertidas, separadas por "
+                              "vírgula ('*' para todas; padrão: a primeira)")
+    convert.add_argument("--split-sheets", action="store_true",
+                         help="Gera um TXT por aba (saida_<aba>-1.txt, "
+                              "saida_<aba>-2.txt, ...) em vez de um único "
+                              "TXT com todas as abas")
+    convert.add_argument("--report", action="store_true",
+                         help="Grava um relatório JSON de desempenho "
+                              "ao lado da saída")
+    convert.add_argument("--fail-fast", type=int, metavar="K",
+                         help="Interrompe a conversão após K erros")
+    convert.add_argument("--incremental", action="store_true",
+                         help="Reaproveita registros de linhas que não "
+                              "mudaram desde a última conversão")
+    convert.add_argument("--layout-cache",
+                         help="Pasta para o cache persistente de layouts")
+    convert.set_defaults(handler=run_convert)
+
+    parse = commands.add_parser(
+        "parse", help="Converte um TXT posicional de volta em tabela")
+    parse.add_argument("-l", "--layout", required=True,
+                       help="Arquivo de layout (CSV)")
+    parse.add_argument("-i", "--input", required=True,
+                       help="Arquivo TXT posicional")
+    parse.add_argument("-o", "--output", required=True,
+                       help="Tabela gerada (.csv, .tsv ou .xlsx)")
+    parse.add_argument("--verify",
+                       help="Planilha de origem usada para conferir "
+                            "campo a campo o TXT")
+    parse.add_argument("--delimiter",
+                       help="Separador da tabela CSV/TSV gerada")
+    parse.add_argument("--chunk-size", type=int,
+                       help="Registros processados por bloco")
+    parse.set_defaults(handler=run_parse)
+
+    preview = commands.add_parser(
+        "preview", help="Mostra só os primeiros registros, com régua")
+    preview.add_argument("-l", "--layout", required=True,
+                         help="Arquivo de layout (CSV)")
+    preview.add_argument("-i", "--input", required=True,
+                         help="Arquivo de entrada (Excel, CSV ou TSV)")
+    preview.add_argument("-r", "--rows", type=int, default=20,
+                         help="Linhas da entrada mostradas")
+    preview.add_argument("--delimiter",
+                         help="Separador da entrada CSV/TSV")
+    preview.add_argument("--encoding",
+                         help="Codificação da entrada CSV/TSV")
+    preview.set_defaults(handler=run_preview)
+
+    batch = commands.add_parser(
+        "batch", help="Converte vários arquivos listados em um manifesto")
+    batch.add_argument("-m", "--manifest", required=True,
+                       help="Manifesto CSV ou JSON com entrada, layout, "
+                            "saida e arquivos")
+    batch.add_argument("-j", "--jobs", type=int, default=1,
+                       help="Conversões executadas em paralelo")
+    batch.add_argument("--summary",
+                       help="Grava o resumo por job em CSV")
+    batch.add_argument("--chunk-size", type=int,
+                       help="Linhas lidas por bloco na leitura em streaming")
+    batch.add_argument("--fail-fast", type=int, metavar="K",
+                       help="Interrompe cada job após K erros")
+    batch.set_defaults(handler=run_batch)
+
+    serve = commands.add_parser(
+        "serve", help="Inicia o serviço HTTP local de conversão")
+    serve.add_argument("--host", default="127.0.0.1",
+                       help="Endereço de escuta (padrão: 127.0.0.1; outros "
+                            "endereços expõem o serviço na rede)")
+    serve.add_argument("--port", type=int, default=8765,
+                       help="Porta de escuta (padrão: 8765)")
+    serve.add_argument("--socket",
+                       help="Escuta em um socket Unix em vez de host/porta")
+    serve.add_argument("-j", "--jobs", type=int, default=2,
+                       help="Conversões executadas em paralelo")
+    serve.add_argument("--queue", type=int, default=16,
+                       help="Conversões aguardando na fila antes de "
+                            "recusar novas requisições")
+    serve.add_argument("--layout-dir",
+                       help="Pasta base para os layouts informados "
+                            "nas requisições")
+    serve.add_argument("--input-dir",
+                       help="Pasta de onde ?input= pode ler arquivos "
+                            "(sem ela, ?input= fica desabilitado)")
+    serve.add_argument("--preload", nargs="*", default=[],
+                       help="Layouts carregados na inicialização")
+    serve.add_argument("--chunk-size", type=int,
+                       help="Linhas lidas por bloco na leitura em streaming")
+    serve.set_defaults(handler=run_serve)
+
+    watch = commands.add_parser(
+        "watch", help="Monitora pastas e converte os arquivos recebidos")
+    watch.add_argument("-c", "--config", required=True,
+                       help="CSV ou JSON com pasta, layout e, opcionalmente, "
+                            "saida, processados, erros e arquivos")
+    watch.add_argument("-j", "--jobs", type=int, default=2,
+                       help="Processos que convertem ao mesmo tempo")
+    watch.add_argument("--interval", type=float, default=2.0,
+                       help="Segundos entre varreduras das pastas")
+    watch.add_argument("--settle", type=float, default=1.0,
+                       help="Segundos sem mudança para considerar um "
+                            "arquivo completo")
+    watch.add_argument("--polling", action="store_true",
+                       help="Usa varredura periódica em vez de inotify")
+    watch.add_argument("--chunk-size", type=int,
+                       help="Linhas lidas por bloco na leitura em streaming")
+    watch.set_defaults(handler=run_watch)
+    return parser
+
+
+def run_convert(args: argparse.Namespace) -> None:
+    from model.layout_cache import LayoutCache
+    from model.model import Model
+
+    cache = None
+    if args.layout_cache:
+        cache = LayoutCache(cache_dir=args.layout_cache)
+    model = Model(layout_cache=cache)
+    model.workers = args.workers
+    model.instrument = args.report
+    model.incremental = args.incremental
+    model.fail_fast = args.fail_fast
+    model.max_part_bytes = args.max_bytes
+    model.max_part_records = args.max_records
+    if args.delimiter:
+        model.input_delimiter = args.delimiter.replace("\\t", "\t")
+    if args.encoding:
+        model.input_encoding = args.encoding
+    if args.chunk_size:
+        model.chunk_size = args.chunk_size
+    if args.sheets:
+        from model.reader import parse_sheets
+
+        model.sheets = parse_sheets(args.sheets)
+    model.split_sheets = args.split_sheets
+    model.convert_file(args.layout, args.input, args.output, args.num_files)
+    print("Conversão realizada com sucesso!")
+
+
+def run_parse(args: argparse.Namespace) -> None:
+    from model.model import Model
+
+    model = Model()
+    if args.delimiter:
+        model.input_delimiter = args.delimiter.replace("\\t", "\t")
+    if args.chunk_size:
+        model.chunk_size = args.chunk_size
+    rows = model.parse_file(args.layout, args.input, args.output)
+    print(f"{rows} registros exportados para {args.output}")
+    if args.verify:
+        model.verify_round_trip(args.layout, args.input, args.verify)
+        print("TXT confere com a planilha de origem.")
+
+
+def run_preview(args: argparse.Namespace) -> None:
+    from model.model import Model
+
+    model = Model()
+    if args.delimiter:
+        model.input_delimiter = args.delimiter.replace("\\t", "\t")
+    if args.encoding:
+        model.input_encoding = args.encoding
+    preview = model.preview(args.layout, args.input, args.rows)
+    print("\n".join(preview.ruler() + preview.lines))
+    for error in preview.errors:
+        print(error, file=sys.stderr)
+
+
+def run_batch(args: argparse.Namespace) -> None:
+    from model import batch
+
+    settings = {}
+    if args.chunk_size:
+        settings["chunk_size"] = args.chunk_size
+    if args.fail_fast:
+        settings["fail_fast"] = args.fail_fast
+
+    def show(result) -> None:
+        print(f"[{result.job.index}] {result.status:<4} "
+              f"{result.seconds:8.3f}s  {result.job.input}")
+
+    jobs = batch.load_manifest(args.manifest)
+    results = batch.run_batch(jobs, args.jobs, settings, show)
+    if args.summary:
+        batch.write_summary(args.summary, results)
+
+    failed = [result for result in results if result.status != "ok"]
+    total = sum(result.seconds for result in results)
+    print(f"{len(results) - len(failed)} de {len(results)} jobs "
+          f"concluídos ({total:.3f}s somando os jobs).")
+    if failed:
+        raise ValueError(
+            "❌Jobs com erro:\n" +
+            "\n".join(f"- [{result.job.index}] {result.job.input}: "
+                      f"{result.error}" for result in failed)
+        )
+
+
+def run_serve(args: argparse.Namespace) -> None:
+    import asyncio
+    from model.service import ConversionService
+
+    settings = {}
+    if args.chunk_size:
+        settings["chunk_size"] = args.chunk_size
+    service = ConversionService(
+        args.jobs, args.queue, args.layout_dir, settings, args.preload,
+        args.input_dir)
+
+    def ready(server) -> None:
+        where = args.socket or f"http://{args.host}:{args.port}"
+        print(f"Serviço de conversão em {where} "
+              f"({service.workers} conversões em paralelo).")
+
+    try:
+        asyncio.run(service.serve(args.host, args.port, args.socket, ready))
+    except KeyboardInterrupt:
+        pass
+    print("Serviço encerrado.")
+
+
+def run_watch(args: argparse.Namespace) -> None:
+    import signal
+    from model import watcher
+
+    settings = {}
+    if args.chunk_size:
+        settings["chunk_size"] = args.chunk_size
+
+    def show(path: str, status: str, seconds: float, error: str) -> None:
+        print(f"{status:<4} {seconds:8.3f}s  {path}", flush=True)
+        if error:
+            print(f"     {error.splitlines()[0]}", flush=True)
+
+    folders = watcher.load_watch_config(args.config)
+    daemon = watcher.FolderWatcher(
+        folders, args.jobs, args.interval, args.settle, args.polling,
+        settings, show)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, lambda *_: daemon.stop())
+    print(f"Monitorando {len(folders)} pasta(s). Ctrl+C encerra.", flush=True)
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        pass
+    print("Monitoramento encerrado.")
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        args.handler(args)
+    except Exception as e:
+        print(f"{e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -1,42 +1,139 @@
+import queue
+import threading
+import time
 from view.view import MainView
-from model.model import Model
+from model.model import ConversionCancelled, Model
+from model.reader import parse_sheets
 
 
 class Controller:
+    poll_interval_ms = 100
+
     def __init__(self) -> None:
         self.view = MainView(controller=self)
         self.model = Model()
+        self.model.progress = self._on_progress
         self.layout_path = ''
         self.input_path = ''
         self.output_path = ''
+        self._events: queue.Queue = queue.Queue()
+        self._worker: threading.Thread | None = None
+        self._preview: threading.Thread | None = None
+        self._polling = False
+        self._started = 0.0
 
-    def _has_paths(self) -> bool:
+    def _has_paths(self, output: bool = True) -> bool:
         errors = []
         if not self.layout_path:
             errors.append("Caminho do layout não foi definido.")
         if not self.input_path:
             errors.append("Caminho do arquivo de entrada não foi definido.")
-        if not self.output_path:
+        if output and not self.output_path:
             errors.append("Caminho do arquivo de saída não foi definido.")
         if errors:
             self.view.show_error("\n".join(errors))
             return False
         return True
 
-    def convert_file(self, num: str) -> None:
+    def convert_file(self, num: str, sheets: str = "",
+                     split_sheets: bool = False) -> None:
+        if self._worker is not None and self._worker.is_alive():
+            return
         if self._has_paths():
+            self.model.sheets = parse_sheets(sheets) or None
+            self.model.split_sheets = split_sheets
+            self._started = time.monotonic()
+            self._worker = threading.Thread(
+                target=self._convert_in_background,
+                args=(self.layout_path, self.input_path,
+                      self.output_path, num),
+                daemon=True)
+            self.view.conversion_started()
+            self._worker.start()
+            self._start_polling()
+
+    def preview_file(self) -> None:
+        if self._preview is not None and self._preview.is_alive():
+            return
+        if self._has_paths(output=False):
+            self._preview = threading.Thread(
+                target=self._preview_in_background,
+                args=(self.layout_path, self.input_path), daemon=True)
+            self.view.preview_started()
+            self._preview.start()
+            self._start_polling()
+
+    def _preview_in_background(self, layout_path: str,
+                               input_path: str) -> None:
+        # a separate model, so a running conversion keeps its layout
+        model = Model(self.model.layout_cache)
+        try:
+            self._events.put(
+                ("preview", model.preview(layout_path, input_path)))
+        except Exception as e:
+            self._events.put(("preview_error", f'{e}'))
+
+    def cancel_conversion(self) -> None:
+        self.model.cancel()
+
+    def _convert_in_background(self, layout_path: str, input_path: str,
+                               output_path: str, num: str) -> None:
+        try:
+            self.model.convert_file(layout_path, input_path, output_path, num)
+            self._events.put(("done", None))
+        except ConversionCancelled as e:
+            self._events.put(("cancelled", f'{e}'))
+        except Exception as e:
+            self._events.put(("error", f'{e}'))
+
+    def _on_progress(self, done: int, total: int | None) -> None:
+        self._events.put(("progress", (done, total)))
+
+    def _start_polling(self) -> None:
+        if not self._polling:
+            self._polling = True
+            self.view.after(self.poll_interval_ms, self._poll_events)
+
+    def _busy(self) -> bool:
+        return any(thread is not None and thread.is_alive()
+                   for thread in (self._worker, self._preview))
+
+    def _poll_events(self) -> None:
+        while True:
             try:
-                layout_df = self.model.load_layout(self.layout_path)
-                input_df = self.model.read_input_df(self.input_path)
-                self.model.validate_layout(layout_df)
-                self.model.set_layout_fields(layout_df)
-                self.model.validate_input_df(input_df)
-                self.model.transform_input_values(input_df)
-                self.model.set_num_files(num)
-                self.model.convert_to_text(self.output_path)
-                self.view.show_message('Conversão realizada com sucesso!')
-            except Exception as e:
-                self.view.show_error(f'{e}')
+                kind, payload = self._events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                self._show_progress(*payload)
+            elif kind == "preview":
+                self.view.preview_finished()
+                self.view.show_preview(payload)
+            elif kind == "preview_error":
+                self.view.preview_finished()
+                self.view.show_error(payload)
+            else:
+                self.view.conversion_finished()
+                if kind == "done":
+                    self.view.show_message(
+                        'Conversão realizada com sucesso!')
+                elif kind == "cancelled":
+                    self.view.show_message(payload)
+                else:
+                    self.view.show_error(payload)
+        # an event put just before its thread ended is still queued
+        if self._busy() or not self._events.empty():
+            self.view.after(self.poll_interval_ms, self._poll_events)
+        else:
+            self._polling = False
+
+    def _show_progress(self, done: int, total: int | None) -> None:
+        elapsed = time.monotonic() - self._started
+        rate = done / elapsed if elapsed > 0 else 0.0
+        eta = None
+        if total and rate:
+            eta = max(0, total - done) / rate
+        self.view.show_progress(done, total, rate, eta)
 
     def download_sample_layout(self, path: str) -> None:
         try:
@@ -0,0 +1,199 @@
+import csv
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from model.errors import InputErrors
+from model.layout_cache import shared_cache
+
+MANIFEST_KEYS = {
+    "entrada": "input", "input": "input",
+    "layout": "layout",
+    "saida": "output", "saída": "output", "output": "output",
+    "arquivos": "num_files", "num_files": "num_files",
+}
+SUMMARY_COLUMNS = ["job", "entrada", "layout", "saida", "status",
+                   "segundos", "bytes", "erro"]
+
+
+class BatchJob:
+    __slots__ = ("index", "input", "layout", "output", "num_files")
+
+    def __init__(self, index: int, input: str, layout: str, output: str,
+                 num_files: str = "1") -> None:
+        self.index = index
+        self.input = input
+        self.layout = layout
+        self.output = output
+        self.num_files = num_files or "1"
+
+
+class BatchResult:
+    __slots__ = ("job", "status", "seconds", "files", "bytes", "error")
+
+    def __init__(self, job: BatchJob, status: str, seconds: float = 0.0,
+                 files: list[str] | None = None, error: str = "") -> None:
+        self.job = job
+        self.status = status
+        self.seconds = seconds
+        self.files = files or []
+        self.bytes = sum(os.path.getsize(path) for path in self.files
+                         if os.path.exists(path))
+        self.error = error
+
+    def to_row(self) -> list:
+        return [self.job.index, self.job.input, self.job.layout,
+                self.job.output, self.status, f"{self.seconds:.3f}",
+                self.bytes, self.error]
+
+
+def read_manifest_rows(path: str) -> list[dict]:
+    if path.lower().endswith(".json"):
+        with open(path, encoding="utf-8-sig") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get("jobs", [])
+        return data
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        sample = f.readline()
+        f.seek(0)
+        delimiter = csv.Sniffer().sniff(sample, ";,\t").delimiter
+        return list(csv.DictReader(f, delimiter=delimiter))
+
+
+def load_manifest(path: str) -> list[BatchJob]:
+    try:
+        rows = read_manifest_rows(path)
+    except Exception as e:
+        raise ValueError(f"❌Erro ao ler manifesto: {e}")
+
+    base = os.path.dirname(os.path.abspath(path))
+    jobs = []
+    errors = []
+    for i, row in enumerate(rows, start=1):
+        fields = {}
+        for key, value in row.items():
+            name = MANIFEST_KEYS.get(str(key).strip().lower())
+            if name and value is not None:
+                fields[name] = str(value).strip()
+        missing = [key for key in ("input", "layout", "output")
+                   if not fields.get(key)]
+        if missing:
+            errors.append(f"job {i}: faltando {', '.join(missing)}")
+            continue
+        for key in ("input", "layout", "output"):
+            fields[key] = os.path.normpath(os.path.join(base, fields[key]))
+        jobs.append(BatchJob(i, **fields))
+    if errors:
+        raise ValueError(
+            "❌Foram encontrados erros no manifesto:\n" +
+            "\n".join(f"- {e}" for e in errors)
+        )
+    return jobs
+
+
+def _init_worker(layouts: dict[str, list[dict]]) -> None:
+    for key, records in layouts.items():
+        shared_cache.put(key, records)
+
+
+def worker_pool(workers: int, layouts: dict[str, list[dict]],
+                clean: bool = False) -> ProcessPoolExecutor:
+    """Pool whose workers start with the layouts already cached.
+
+    Workers are forked lazily, while the parent may hold open sockets; with
+    clean, they come from a fork server instead and inherit none of them.
+    """
+    context = None
+    if clean and "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=context, initializer=_init_worker,
+        initargs=(layouts,))
+
+
+def run_job(job: BatchJob, settings: dict) -> BatchResult:
+    from model.model import Model
+
+    model = Model()
+    for name, value in settings.items():
+        setattr(model, name, value)
+    started = time.perf_counter()
+    try:
+        model.convert_file(job.layout, job.input, job.output, job.num_files)
+    except InputErrors as e:
+        error = f"❌{e.count} erros na entrada."
+        if e.report_path:
+            error += f" Relatório completo: {e.report_path}"
+        return BatchResult(job, "erro", time.perf_counter() - started,
+                           error=error)
+    except Exception as e:
+        return BatchResult(job, "erro", time.perf_counter() - started,
+                           error=f"{e}")
+    return BatchResult(job, "ok", time.perf_counter() - started,
+                       model.written_paths)
+
+
+def load_layouts(paths) -> tuple[dict, dict]:
+    from model.model import Model
+
+    layouts = {}
+    failed = {}
+    for path in dict.fromkeys(paths):
+        model = Model()
+        try:
+            model.load_layout_fields(path)
+        except ValueError as e:
+            failed[path] = f"{e}"
+            continue
+        except Exception as e:
+            failed[path] = f"❌Erro ao ler layout: {e}"
+            continue
+        layouts[model.layout_key] = shared_cache.get(model.layout_key)
+    return layouts, failed
+
+
+def run_batch(jobs: list[BatchJob], workers: int = 1,
+              settings: dict | None = None,
+              on_result=None) -> list[BatchResult]:
+    settings = settings or {}
+    layouts, failed = load_layouts(job.layout for job in jobs)
+    results = {}
+    pending = []
+    for job in jobs:
+        if job.layout in failed:
+            results[job.index] = BatchResult(
+                job, "erro", error=failed[job.layout])
+            if on_result:
+                on_result(results[job.index])
+        else:
+            pending.append(job)
+
+    if workers <= 1:
+        for job in pending:
+            results[job.index] = run_job(job, settings)
+            if on_result:
+                on_result(results[job.index])
+    elif pending:
+        with worker_pool(min(workers, len(pending)), layouts) as executor:
+            futures = {executor.submit(run_job, job, settings): job
+                       for job in pending}
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = BatchResult(job, "erro", error=f"{e}")
+                results[job.index] = result
+                if on_result:
+                    on_result(result)
+    return [results[job.index] for job in jobs]
+
+
+def write_summary(path: str, results: list[BatchResult]) -> None:
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        out = csv.writer(f, delimiter=";")
+        out.writerow(SUMMARY_COLUMNS)
+        for result in results:
+            out.writerow(result.to_row())
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+from model.layout import FieldSpec
+from model.writer import ENCODING, NEWLINE
+
+
+def encoding_table(encoding: str = ENCODING) -> tuple[np.ndarray, np.ndarray]:
+    pairs = []
+    for byte in range(256):
+        try:
+            pairs.append((ord(bytes([byte]).decode(encoding)), byte))
+        except UnicodeDecodeError:
+            pass
+    pairs.sort()
+    return (np.array([cp for cp, _ in pairs], dtype=np.uint32),
+            np.array([byte for _, byte in pairs], dtype=np.uint8))
+
+
+def unencodable(text: str, encoding: str = ENCODING) -> str | None:
+    try:
+        text.encode(encoding)
+    except UnicodeEncodeError as e:
+        return e.object[e.start]
+    return None
+
+
+def encoding_message(char: str, encoding: str = ENCODING) -> str:
+    return (f"Caractere '{char}' (U+{ord(char):04X}) não pode ser gravado "
+            f"em {encoding}.")
+
+
+def encoding_errors(values: np.ndarray, encoding: str = ENCODING) -> dict:
+    if "".join(values).isascii():
+        return {}
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    failed = {}
+    for k, unique in enumerate(uniques):
+        char = unencodable(unique, encoding)
+        if char is not None:
+            failed[k] = encoding_message(char, encoding)
+    if not failed:
+        return {}
+    positions = np.flatnonzero(np.isin(codes, list(failed)))
+    return {int(pos): failed[codes[pos]] for pos in positions}
+
+
+class RecordEncoder:
+    """Encodes rendered field columns into fixed-width records.
+
+    Each record row is laid out as [separator][fields], so a run of rows is
+    one contiguous slice of the block; "Novo registro" fields get a line
+    break right before their offset.
+    """
+
+    def __init__(self, plan: tuple[FieldSpec, ...],
+                 encoding: str = ENCODING, newline: bytes = NEWLINE) -> None:
+        self.fixed = not any(spec.null_char for spec in plan)
+        self.separator = len(newline)
+        self.offsets = []
+        offset = self.separator
+        template = list(newline)
+        for spec in plan:
+            if spec.prefix:
+                template += newline
+                offset += len(newline)
+            self.offsets.append(offset)
+            template += b" " * spec.length
+            offset += spec.length
+        self.stride = offset
+        self.width = offset - self.separator
+        self._template = np.array(template, dtype=np.uint8)
+        self._codepoints, self._bytes = encoding_table(encoding)
+
+    def encode(self, plan: tuple[FieldSpec, ...], columns: list[np.ndarray],
+               keep: np.ndarray) -> np.ndarray:
+        block = np.empty((len(keep), self.stride), dtype=np.uint8)
+        block[:] = self._template
+        for spec, offset, values in zip(plan, self.offsets, columns):
+            block[:, offset:offset + spec.length] = self._encode_column(
+                values, len(spec.prefix), spec.length)
+        return block[keep]
+
+    def _encode_column(self, values: np.ndarray, prefix: int,
+                       length: int) -> np.ndarray:
+        width = prefix + length
+        try:
+            # pure ASCII columns are copied as they are
+            fixed = values.astype(f"S{width}")
+            codes = fixed.view(np.uint8).reshape(len(values), width)
+        except UnicodeEncodeError:
+            fixed = values.astype(f"U{width}")
+            codes = self._lookup(
+                fixed.view(np.uint32).reshape(len(values), width))
+        return codes[:, prefix:]
+
+    def _lookup(self, codes: np.ndarray) -> np.ndarray:
+        index = np.searchsorted(self._codepoints, codes)
+        index = np.minimum(index, len(self._codepoints) - 1)
+        found = self._codepoints[index] == codes
+        # rows with characters outside the encoding were already rejected
+        return np.where(found, self._bytes[index], ord("?")).astype(np.uint8)
@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+import utils.formatters as formatter
+from model import encoder as encoding
+from model.errors import RULE_ENCODING, RULE_FORMAT, InputError
+from model.layout import FieldSpec, render_record
+from model.writer import ENCODING
+
+
+def input_column(df: pd.DataFrame, name: str) -> pd.Series:
+    if name in df.columns:
+        return pd.Series(df[name].to_numpy(dtype=object))
+    return pd.Series([""] * len(df), dtype=object)
+
+
+def field_values(df: pd.DataFrame, spec: FieldSpec,
+                 start: int = 0) -> pd.Series:
+    if spec.value is not None:
+        return spec.value.column(len(df), start)
+    return input_column(df, spec.name)
+
+
+def render_field(
+        values: pd.Series, spec: FieldSpec) -> tuple[np.ndarray, dict]:
+    rendered = np.full(len(values), "", dtype=object)
+    active = np.ones(len(values), dtype=bool)
+    if spec.null_char != "":
+        active = (values != spec.null_char).to_numpy()
+        values = values[active]
+
+    values, errors = formatter.run_column_pipeline(
+        values, spec.column_formatters)
+
+    rendered[active] = spec.render_column(values).to_numpy()
+    return rendered, errors
+
+
+def render_columns(
+        df: pd.DataFrame,
+        plan: tuple[FieldSpec, ...],
+        start: int = 0) -> tuple[list[np.ndarray], dict[int, InputError]]:
+    columns = []
+    row_errors = {}
+    for spec in plan:
+        values = field_values(df, spec, start)
+        rendered, errors = render_field(values, spec)
+        columns.append(rendered)
+        for rule, found in ((RULE_FORMAT, errors),
+                            (RULE_ENCODING,
+                             encoding.encoding_errors(rendered))):
+            for pos, msg in found.items():
+                if pos not in row_errors:
+                    row_errors[pos] = InputError(
+                        start + pos + 2, spec.name, rule, values[pos], msg)
+    return columns, row_errors
+
+
+def transform_columns(
+        df: pd.DataFrame,
+        plan: tuple[FieldSpec, ...],
+        start: int = 0,
+        encoder: encoding.RecordEncoder | None = None) -> tuple[
+            list[str] | np.ndarray, list[InputError]]:
+    columns, row_errors = render_columns(df, plan, start)
+    errors = [row_errors[pos] for pos in sorted(row_errors)]
+    if encoder is not None:
+        keep = np.ones(len(df), dtype=bool)
+        keep[list(row_errors)] = False
+        return encoder.encode(plan, columns, keep), errors
+
+    if columns:
+        lines = list(map("".join, zip(*columns)))
+    else:
+        lines = [""] * len(df)
+
+    if row_errors:
+        lines = [line for pos, line in enumerate(lines)
+                 if pos not in row_errors]
+    return lines, errors
+
+
+def transform_rows(
+        df: pd.DataFrame,
+        plan: tuple[FieldSpec, ...],
+        start: int = 0) -> tuple[list[str], list[InputError]]:
+    lines = []
+    read_errors = []
+    columns = [field_values(df, spec, start).tolist() for spec in plan]
+    rows = zip(*columns) if columns else [()] * len(df)
+    for i, values in enumerate(rows):
+        try:
+            line = render_record(plan, values)
+            if not line.isascii():
+                line.encode(ENCODING)
+            lines.append(line)
+        except Exception:
+            read_errors.append(_record_error(plan, values, start + i + 2))
+    return lines, read_errors
+
+
+def _record_error(plan: tuple[FieldSpec, ...], values,
+                  row: int) -> InputError:
+    for spec, value in zip(plan, values):
+        try:
+            rendered = spec.render(value)
+        except Exception as e:
+            return InputError(row, spec.name, RULE_FORMAT, value, f"{e}")
+        char = encoding.unencodable(rendered)
+        if char is not None:
+            return InputError(row, spec.name, RULE_ENCODING, value,
+                              encoding.encoding_message(char))
+    return InputError(row, "", RULE_FORMAT, "", "Erro ao gerar registro.")
+
+
+TRANSFORMS = {
+    "rows": transform_rows,
+    "columns": transform_columns,
+}
+
+
+def transform(
+        df: pd.DataFrame,
+        plan: tuple[FieldSpec, ...],
+        engine: str = "columns",
+        start: int = 0,
+        encoder: encoding.RecordEncoder | None = None) -> tuple[
+            list[str] | np.ndarray, list[InputError]]:
+    if encoder is not None and engine != "rows":
+        return transform_columns(df, plan, start, encoder)
+    return TRANSFORMS.get(engine, transform_columns)(df, plan, start)
@@ -0,0 +1,137 @@
+import csv
+import os
+
+RULE_COLUMNS = "colunas"
+RULE_REQUIRED = "obrigatorio"
+RULE_NUMERIC = "numerico"
+RULE_LENGTH = "tamanho"
+RULE_FORMAT = "formatacao"
+RULE_ENCODING = "codificacao"
+
+REPORT_COLUMNS = ["linha", "campo", "regra", "valor", "mensagem"]
+SHEET_COLUMN = "aba"
+
+
+def errors_path(output_path: str) -> str:
+    return f"{output_path.replace('.txt', '')}.errors.csv"
+
+
+def discard_report(report_path: str | None) -> None:
+    """Removes a partial report, e.g. of a cancelled run."""
+    if report_path and os.path.exists(report_path):
+        os.remove(report_path)
+
+
+class InputError:
+    __slots__ = ("row", "field", "rule", "value", "message", "sheet")
+
+    def __init__(self, row: int | None, field: str, rule: str,
+                 value: str, message: str, sheet: str | None = None) -> None:
+        self.row = row
+        self.field = field
+        self.rule = rule
+        self.value = value
+        self.message = message
+        self.sheet = sheet
+
+    def __str__(self) -> str:
+        if self.row is None:
+            if self.sheet is None:
+                return self.message
+            return f"Aba '{self.sheet}': {self.message}"
+        if self.sheet is None:
+            return f"Linha {self.row}: {self.message}"
+        return f"Linha {self.row} (aba '{self.sheet}'): {self.message}"
+
+    def to_row(self) -> list:
+        return [self.row if self.row is not None else "", self.field,
+                self.rule, self.value, self.message]
+
+
+class InputErrors(ValueError):
+    def __init__(self, errors: list[InputError], count: int,
+                 stopped: bool = False,
+                 report_path: str | None = None) -> None:
+        self.errors = errors
+        self.count = count
+        self.stopped = stopped
+        self.report_path = report_path
+        super().__init__(self.summary())
+
+    def summary(self) -> str:
+        lines = [f"- {error}" for error in self.errors]
+        if self.count > len(self.errors):
+            lines.append(
+                f"- ... e mais {self.count - len(self.errors)} erros.")
+        if self.stopped:
+            lines.append(
+                f"Processamento interrompido após {self.count} erros.")
+        if self.report_path:
+            lines.append(f"Relatório completo: {self.report_path}")
+        return ("❌Foram encontrados erros na entrada:\n" +
+                "\n".join(lines))
+
+
+class ErrorCollector:
+    def __init__(self, max_errors: int = 1000,
+                 fail_fast: int | None = None,
+                 report_path: str | None = None) -> None:
+        self.max_errors = max_errors
+        self.fail_fast = fail_fast
+        self.report_path = report_path
+        self.errors: list[InputError] = []
+        self.count = 0
+        # set while reading a workbook sheet by sheet
+        self.sheet: str | None = None
+        self._file = None
+        self._writer = None
+
+    @property
+    def stopped(self) -> bool:
+        return bool(self.fail_fast) and self.count >= self.fail_fast
+
+    def add(self, errors) -> None:
+        for error in errors:
+            if self.stopped:
+                return
+            self.count += 1
+            if self.sheet is not None:
+                error.sheet = self.sheet
+            if len(self.errors) < self.max_errors:
+                self.errors.append(error)
+            if self.report_path:
+                row = error.to_row()
+                if self.sheet is not None:
+                    row.insert(0, error.sheet)
+                self._report().writerow(row)
+
+    def _report(self):
+        if self._writer is None:
+            self._file = open(self.report_path, "w", encoding="utf-8-sig",
+                              newline="")
+            self._writer = csv.writer(self._file, delimiter=";")
+            if self.sheet is not None:
+                self._writer.writerow([SHEET_COLUMN] + REPORT_COLUMNS)
+            else:
+                self._writer.writerow(REPORT_COLUMNS)
+        return self._writer
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def raise_errors(self) -> None:
+        self.close()
+        if self.count:
+            raise InputErrors(
+                self.errors, self.count, self.stopped,
+                self.report_path if self._writer is not None else None)
+
+    def __enter__(self) -> "ErrorCollector":
+        if self.report_path and os.path.exists(self.report_path):
+            os.remove(self.report_path)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
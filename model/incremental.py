@@ -0,0 +1,66 @@
+import json
+import os
+import pandas as pd
+from model import engine
+
+CACHE_VERSION = "2"
+SECOND_HASH_KEY = "conversor-posic2"
+
+
+def cache_path(output_path: str) -> str:
+    return f"{output_path.replace('.txt', '')}.cache.json"
+
+
+def row_keys(df: pd.DataFrame, names: list[str]) -> list[str]:
+    if not len(df):
+        return []
+    values = pd.DataFrame(
+        {i: engine.input_column(df, name) for i, name in enumerate(names)})
+    first = pd.util.hash_pandas_object(values, index=False).to_numpy()
+    second = pd.util.hash_pandas_object(
+        values, index=False, hash_key=SECOND_HASH_KEY).to_numpy()
+    return [f"{a:016x}{b:016x}"
+            for a, b in zip(first.tolist(), second.tolist())]
+
+
+class RecordCache:
+    def __init__(self, path: str, layout_key: str) -> None:
+        self.path = path
+        self.layout_key = layout_key
+        self.records: dict[str, str] = {}
+        self.fresh: dict[str, str] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def load(self) -> "RecordCache":
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return self
+        if (data.get("version") == CACHE_VERSION and
+                data.get("layout") == self.layout_key):
+            self.records = data.get("records", {})
+        return self
+
+    def lookup(self, keys: list[str]) -> list[str | None]:
+        found = [self.records.get(key) for key in keys]
+        misses = found.count(None)
+        self.misses += misses
+        self.hits += len(found) - misses
+        return found
+
+    def remember(self, keys: list[str], records: list[str]) -> None:
+        self.fresh.update(zip(keys, records))
+
+    def save(self) -> None:
+        if not self.misses and self.fresh.keys() == self.records.keys():
+            return
+        data = {"version": CACHE_VERSION, "layout": self.layout_key,
+                "records": self.fresh}
+        try:
+            with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+                f.write(json.dumps(data, ensure_ascii=False))
+            os.replace(self.path + ".tmp", self.path)
+        except OSError:
+            pass
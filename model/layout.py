@@ -1,4 +1,12 @@
+import utils.formatters as formatter
+from model.records import DETAIL, parse_value
+
+
 class LayoutField:
+    __slots__ = ("name", "length", "align", "fill", "format_rule",
+                 "required", "new_line", "decimals", "null_char",
+                 "record", "value")
+
     def __init__(self, row):
         self.name = row["campo"]
         self.length = int(row["tamanho"])
@@ -9,6 +17,8 @@ class LayoutField:
         self.new_line = row["novo registro"]
         self.decimals = row["decimais"]
         self.null_char = row["anular"]
+        self.record = row.get("registro") or DETAIL
+        self.value = parse_value(row.get("valor"))
 
     def format_value(self, value: str) -> str:
         if value is None:
@@ -26,3 +36,54 @@ class LayoutField:
         if self.new_line:
             value = '\n' + value
         return value
+
+    def compile(self, report=None) -> "FieldSpec":
+        return FieldSpec(self, report)
+
+
+class FieldSpec:
+    __slots__ = ("name", "length", "fill", "right", "prefix", "null_char",
+                 "value", "formatters", "column_formatters")
+
+    def __init__(self, field: LayoutField, report=None) -> None:
+        self.name = field.name
+        self.length = field.length
+        self.fill = field.fill
+        self.right = field.align == "right"
+        self.prefix = '\n' if field.new_line else ''
+        self.null_char = field.null_char
+        self.value = field.value
+        self.formatters = formatter.compile_format_rules(
+            field.format_rule, field.length, field.decimals, report)
+        self.column_formatters = formatter.compile_column_format_rules(
+            field.format_rule, field.length, field.decimals, report)
+
+    def render(self, value) -> str:
+        if self.null_char and value == self.null_char:
+            return ''
+        for format_rule in self.formatters:
+            value = format_rule(value)
+        if value is None:
+            value = ''
+        value = str(value)[:self.length]
+        if self.right:
+            return self.prefix + value.rjust(self.length, self.fill)
+        return self.prefix + value.ljust(self.length, self.fill)
+
+    def render_column(self, values):
+        values = values.str.slice(0, self.length)
+        side = "left" if self.right else "right"
+        values = values.str.pad(self.length, side=side, fillchar=self.fill)
+        if self.prefix:
+            values = self.prefix + values
+        return values
+
+
+def compile_layout(
+        layout_fields: list[LayoutField],
+        report=None) -> tuple[FieldSpec, ...]:
+    return tuple(field.compile(report) for field in layout_fields)
+
+
+def render_record(plan: tuple[FieldSpec, ...], values) -> str:
+    return ''.join([spec.render(value) for spec, value in zip(plan, values)])
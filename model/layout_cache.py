@@ -0,0 +1,98 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+CACHE_VERSION = "2"
+
+
+def hash_file(path: str) -> str:
+    digest = hashlib.sha256(CACHE_VERSION.encode())
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class LayoutCache:
+    def __init__(self, max_entries: int = 32,
+                 cache_dir: str | None = None) -> None:
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, list[dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> list[dict] | None:
+        with self._lock:
+            records = self._entries.get(key)
+            if records is None:
+                records = self._read_disk(key)
+                if records is not None:
+                    self._remember(key, records)
+            else:
+                self._entries.move_to_end(key)
+
+            if records is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return records
+
+    def put(self, key: str, records: list[dict]) -> None:
+        with self._lock:
+            self._remember(key, records)
+            self._write_disk(key, records)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _remember(self, key: str, records: list[dict]) -> None:
+        self._entries[key] = records
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir or "", f"{key}.json")
+
+    def _read_disk(self, key: str) -> list[dict] | None:
+        if not self.cache_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                records = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return records
+
+    def _write_disk(self, key: str, records: list[dict]) -> None:
+        if not self.cache_dir:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._disk_path(key)
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(records, f, ensure_ascii=False)
+            os.replace(path + ".tmp", path)
+            self._evict_disk()
+        except OSError:
+            pass
+
+    def _evict_disk(self) -> None:
+        entries = [
+            os.path.join(self.cache_dir, name)
+            for name in os.listdir(self.cache_dir)
+            if name.endswith(".json")
+        ]
+        entries.sort(key=os.path.getmtime)
+        for path in entries[:max(0, len(entries) - self.max_entries)]:
+            os.remove(path)
+
+
+shared_cache = LayoutCache()
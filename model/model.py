@@ -1,23 +1,81 @@
+import csv
+import itertools
+from contextlib import ExitStack, contextmanager, nullcontext
+from functools import partial
+import numpy as np
 import pandas as pd
 import utils.helpers as helpers
 import utils.validators as val
 import utils.formatters as formatter
-from model.layout import LayoutField
+from utils.instrumentation import RunReport, StageStats
+from model.layout import FieldSpec, LayoutField, compile_layout, render_record
+from model import engine, incremental, parallel, reader, writer
+from model import records as record_types
+from model.encoder import RecordEncoder
+from model.errors import (
+    RULE_COLUMNS, RULE_LENGTH, RULE_NUMERIC, RULE_REQUIRED, ErrorCollector,
+    InputError, discard_report, errors_path)
+from model.parser import PositionalParser, RecordBuffer
+from model.preview import PREVIEW_ROWS, Preview
+from model.layout_cache import LayoutCache, hash_file, shared_cache
 import os
+import threading
+
+
+def _row_total(rows) -> int | None:
+    rows = list(rows)
+    if None in rows:
+        return None
+    return sum(rows)
+
+
+class ConversionCancelled(Exception):
+    pass
+
+
+class _IncrementalFallback(Exception):
+    pass
 
 
 class Model:
     sample_file_name = "layout.csv"
 
-    def __init__(self) -> None:
+    def __init__(self, layout_cache: LayoutCache | None = None) -> None:
         self.final_file_lines: list[str] = []
         self.layout_fields: list[LayoutField] = []
+        self.layout_plan: tuple[FieldSpec, ...] = ()
+        self.header_fields: list[LayoutField] = []
+        self.header_plan: tuple[FieldSpec, ...] = ()
+        self.trailer_fields: list[LayoutField] = []
+        self.trailer_plan: tuple[FieldSpec, ...] = ()
         self.number_of_files = 1
+        self.engine = "columns"
+        self.max_errors = 1000
+        self.fail_fast: int | None = None
+        self.error_report = True
+        self.error_report_path: str | None = None
+        self.check_truncation = False
+        self.chunk_size = 50000
+        self.workers = 1
+        self.incremental = False
+        self.max_part_bytes: int | None = None
+        self.max_part_records: int | None = None
+        self.layout_key = ""
+        self.input_delimiter: str | None = None
+        self.input_encoding = reader.DEFAULT_ENCODING
+        self.sheets: list[str] | None = None
+        self.split_sheets = False
+        self.written_paths: list[str] = []
+        self.progress = None
+        self.instrument = False
+        self.report: RunReport | None = None
+        self._cancel = threading.Event()
+        self.layout_cache = layout_cache or shared_cache
 
     def load_layout(self, layout_path: str) -> pd.DataFrame:
         df = pd.read_csv(
             layout_path,
-            sep=None, engine="python",
+            sep=self._sniff_delimiter(layout_path),
             dtype=str,
             keep_default_na=False,
             encoding="utf-8-sig",
@@ -31,12 +89,34 @@ class Model:
 
         return df
 
+    def _sniff_delimiter(self, layout_path: str) -> str:
+        with open(layout_path, encoding="utf-8-sig", newline="") as f:
+            line = f.readline()
+        return csv.Sniffer().sniff(line).delimiter
+
+    def load_layout_fields(self, layout_path: str) -> None:
+        with self._stage("load_layout") as stats:
+            key = hash_file(layout_path)
+            self.layout_key = key
+            records = self.layout_cache.get(key)
+            if records is None:
+                df = self.load_layout(layout_path)
+                self.validate_layout(df)
+                records = df.to_dict("records")
+                self.layout_cache.put(key, records)
+            self.set_layout_records(records)
+            stats.rows_out += len(records)
+
     def validate_layout(self, df: pd.DataFrame) -> None:
         errors = []
         expected_columns = set(val.EXPECTED_COLUMNS)
         df_columns = set(df.columns)
         missing_columns = expected_columns - df_columns
-        exceding_columns = df_columns - expected_columns
+        exceding_columns = (df_columns - expected_columns -
+                            set(record_types.OPTIONAL_COLUMNS))
+        for column in record_types.OPTIONAL_COLUMNS:
+            if column not in df_columns:
+                df[column] = ""
 
         errors.extend(val.verify_columns(
             missing_columns, exceding_columns))
@@ -52,6 +132,8 @@ class Model:
             pre = val.verify_preenchimento(row, i)
             form = formatter.verify_formatacao(row)
             dec = val.verify_decimais(row, i)
+            reg = record_types.verify_registro(row, i)
+            value = record_types.verify_valor(row, i)
             if tam is not None:
                 errors.append(tam)
             if pre is not None:
@@ -60,6 +142,10 @@ class Model:
                 errors.extend(form)
             if dec is not None:
                 errors.append(dec)
+            if reg is not None:
+                errors.append(reg)
+            if value is not None:
+                errors.append(value)
 
         df['obrigatorio'] = df['obrigatorio'].apply(
             lambda x: helpers.parse_bool(x, default=False))
@@ -70,14 +156,22 @@ class Model:
         df['alinhamento'] = df['alinhamento'].apply(
             lambda x: helpers.parse_allign(x, default="left"))
 
+        df['registro'] = df['registro'].apply(
+            lambda x: record_types.parse_record_type(
+                x, default=record_types.DETAIL))
+
         df['campo'] = df['campo'].str.strip().str.lower()
 
-        if df['campo'].duplicated().any():
-            dup_lines = df[df['campo'].duplicated()]
+        duplicated = df.duplicated(['registro', 'campo'])
+        if duplicated.any():
+            dup_lines = df[duplicated]
             for i, line in dup_lines.iterrows():
                 value = line['campo']
                 errors.append(
-                    f'linha {i+2}: campo com valor duplicado "{value}"')
+                    f'Linha {i+2}: campo com valor duplicado "{value}"')
+
+        if not errors:
+            errors.extend(record_types.verify_record_fields(df))
 
         if errors:
             raise ValueError(
@@ -86,82 +180,275 @@ class Model:
             )
 
     def set_layout_fields(self, df) -> None:
+        self.set_layout_records(df.to_dict("records"))
+
+    def set_layout_records(self, records: list[dict]) -> None:
         self.layout_fields.clear()
 
-        self.layout_fields = [
-            LayoutField(row)
-            for _, row in df.iterrows()
-        ]
+        fields = [LayoutField(row) for row in records]
+        self.layout_fields = [field for field in fields
+                              if field.record == record_types.DETAIL]
+        self.header_fields = [field for field in fields
+                              if field.record == record_types.HEADER]
+        self.trailer_fields = [field for field in fields
+                               if field.record == record_types.TRAILER]
+        self.compile_layout()
+
+    def compile_layout(self) -> None:
+        self.layout_plan = compile_layout(self.layout_fields, self.report)
+        self.header_plan = compile_layout(self.header_fields, self.report)
+        self.trailer_plan = compile_layout(self.trailer_fields, self.report)
+        for spec in self.layout_plan:
+            if spec.value is not None:
+                # record sequence numbers count the header line
+                spec.value.first = 1 + bool(self.header_plan)
 
     def read_input_df(self, input_path: str) -> pd.DataFrame:
-        try:
-            df = pd.read_excel(input_path, dtype=str, keep_default_na=False)
-            df.columns = [str(c).strip().lower() for c in df.columns]
-        except Exception as e:
-            raise ValueError(f"❌Erro ao ler arquivo de entrada: {e}")
+        with self._stage("read_input_df") as stats:
+            try:
+                columns = self._input_columns()
+                if reader.is_delimited(input_path):
+                    df = reader.read_delimited(
+                        input_path, self.input_delimiter,
+                        self.input_encoding, columns)
+                else:
+                    df = reader.read_excel(input_path, columns)
+                df.columns = reader.normalize_columns(df.columns)
+            except Exception as e:
+                raise ValueError(f"❌Erro ao ler arquivo de entrada: {e}")
+            stats.rows_out += len(df)
         return df
 
-    def verify_required_values(self, df: pd.DataFrame) -> list[str]:
-        errors = []
+    def _input_columns(self) -> set[str] | None:
+        """Input columns the layout reads; None reads every column."""
+        columns = {field.name for field in self.layout_fields
+                   if field.value is None}
+        return columns or None
+
+    def verify_required_values(
+            self, df: pd.DataFrame, start: int = 0) -> list[str]:
+        errors, error_count = self._input_errors(df, start)
+        messages = [f"{e}" for e in itertools.islice(errors, self.max_errors)]
+        if error_count > len(messages):
+            messages.append(
+                f"... e mais {error_count - len(messages)} erros.")
+        return messages
+
+    def _input_errors(self, df: pd.DataFrame, start: int = 0):
+        checks = []
+        positions = []
         for field in self.layout_fields:
-            for i, (_, row) in enumerate(df.iterrows(), start=1):
-                value = row.get(field.name, "")
-                if field.required and (
-                        value is None or str(value).strip() == ""):
-                    errors.append(
-                        f"linha {i+1}"
-                        f"Campo obrigatório '{field.name}' está vazio.")
-        return errors
-
-    def validate_input_df(self, df) -> None:
-        errors = []
-        defined_columns = [field.name for field in self.layout_fields]
+            if field.name not in df.columns or field.value is not None:
+                continue
+            values = engine.input_column(df, field.name)
+            for mask, rule, message in self._input_checks(field, values):
+                checks.append((field.name, rule, values, message))
+                positions.append(np.flatnonzero(mask))
+        if not positions:
+            return iter(()), 0
+
+        check_ids = np.repeat(np.arange(len(positions)),
+                              [len(p) for p in positions])
+        positions = np.concatenate(positions)
+        order = np.lexsort((check_ids, positions))
+
+        def errors():
+            for k in order:
+                name, rule, values, message = checks[check_ids[k]]
+                pos = int(positions[k])
+                yield InputError(
+                    start + pos + 2, name, rule, values[pos], message(pos))
+        return errors(), len(positions)
+
+    def _input_checks(self, field: LayoutField, values: pd.Series):
+        blank = val.blank_mask(values)
+        if field.required:
+            yield blank, RULE_REQUIRED, lambda i: (
+                f"Campo obrigatório '{field.name}' está vazio.")
+
+        codes = [c for c in field.format_rule if c in formatter.FORMATTERS]
+        numeric = [c for c in codes if c in ("3", "4")]
+        if numeric:
+            prefix = codes[:codes.index(numeric[0])]
+            prepared, _ = formatter.apply_format_rules_column(
+                values, prefix, field.length, field.decimals)
+            checked = np.ones(len(values), dtype=bool)
+            if field.null_char != "":
+                checked = (values != field.null_char).to_numpy()
+            if field.required:
+                checked &= ~blank
+            mask = checked & val.non_numeric_mask(
+                prepared, finite="3" in numeric)
+            yield mask, RULE_NUMERIC, lambda i: (
+                f"Campo '{field.name}' deve ser numérico "
+                f"(recebido '{values[i]}').")
+
+        if self.check_truncation and "3" not in codes:
+            text_codes = [c for c in codes if c not in ("3", "4")]
+            prepared, _ = formatter.apply_format_rules_column(
+                values, text_codes, field.length, field.decimals)
+            yield (val.overflow_mask(prepared, field.length), RULE_LENGTH,
+                   lambda i: (
+                       f"Campo '{field.name}' excede o tamanho "
+                       f"{field.length} e será truncado "
+                       f"(recebido '{values[i]}')."))
+
+    def _missing_columns(self, df) -> list[InputError]:
+        defined_columns = [field.name for field in self.layout_fields
+                           if field.value is None]
         missing_fields_in_input = [
             field for field in defined_columns
             if field not in df.columns
         ]
         if missing_fields_in_input:
-            errors.append(
+            return [InputError(
+                None, ", ".join(missing_fields_in_input), RULE_COLUMNS, "",
                 f"Campos faltando no arquivo de entrada: "
-                f"{', '.join(missing_fields_in_input)}"
-            )
-        required = self.verify_required_values(df)
-        if required:
-            errors.extend(required)
+                f"{', '.join(missing_fields_in_input)}")]
+        return []
 
-        if errors:
-            raise ValueError(
-                "❌Foram encontrados erros na entrada:\n" +
-                "\n".join(f"- {e}" for e in errors)
-            )
+    def _collector(self) -> ErrorCollector:
+        return ErrorCollector(
+            self.max_errors, self.fail_fast, self.error_report_path)
+
+    def validate_input_df(self, df) -> None:
+        with self._stage("validate_input_df", len(df)), \
+                self._collector() as errors:
+            errors.add(self._missing_columns(df))
+            errors.add(self._input_errors(df)[0])
+        errors.raise_errors()
 
     def transform_input_values(self, df) -> None:
         self.final_file_lines.clear()
-        read_errors = []
-        for i, (_, row) in enumerate(df.iterrows()):
-            try:
-                final_string = ''
-                for field in self.layout_fields:
-                    value = row.get(field.name, "")
-                    if value == field.null_char and field.null_char != "":
-                        continue
+        totals = self._totals()
+        self.final_file_lines.extend(self._header_lines())
+        with self._collector() as errors, self._transformer() as transform:
+            for start in range(0, len(df), self.chunk_size):
+                chunk = df.iloc[start:start + self.chunk_size]
+                with self._stage(
+                        "transform_input_values", len(chunk)) as stats:
+                    lines, found = transform(chunk, start)
+                    self._accumulate(totals, chunk, start, len(lines))
+                    stats.rows_out += len(lines)
+                self.final_file_lines.extend(lines)
+                errors.add(found)
+                if errors.stopped:
+                    break
+                self._checkpoint(start + len(chunk), len(df))
+        errors.raise_errors()
+        self.final_file_lines.extend(self._trailer_lines(totals))
+
+    def _transform(
+            self, df, start: int = 0,
+            encoder: RecordEncoder | None = None) -> tuple[
+                list[str] | np.ndarray, list[InputError]]:
+        return engine.transform(
+            df, self.layout_plan, self.engine, start, encoder)
+
+    @contextmanager
+    def _transformer(self, encoder: RecordEncoder | None = None):
+        if self.workers > 1:
+            with parallel.ParallelTransformer(
+                    self.layout_plan, self.engine,
+                    self.workers, encoder) as transformer:
+                yield transformer.transform
+        else:
+            yield partial(self._transform, encoder=encoder)
+
+    def _totals(self) -> record_types.Totals:
+        names = {field.value.argument for field in self.trailer_fields
+                 if field.value is not None and
+                 field.value.kind == record_types.SUM}
+        return record_types.Totals(
+            bool(self.header_plan),
+            [spec for spec in self.layout_plan if spec.name in names])
+
+    def _accumulate(self, totals: record_types.Totals, chunk, start: int,
+                    count: int) -> None:
+        totals.add({spec.name: engine.field_values(chunk, spec, start)
+                    for spec in totals.specs}, count)
+
+    def _header_lines(self) -> list[str]:
+        return self._extra_record(self.header_plan, "header", 1)
+
+    def _trailer_lines(self, totals: record_types.Totals) -> list[str]:
+        return self._extra_record(
+            self.trailer_plan, "trailer", totals.records, totals)
+
+    def _extra_record(self, plan: tuple[FieldSpec, ...], name: str,
+                      sequence: int,
+                      totals: record_types.Totals | None = None) -> list[str]:
+        if not plan:
+            return []
+        values = self._extra_values(plan, sequence, totals)
+        try:
+            line = render_record(plan, values)
+            line.encode(writer.ENCODING)
+        except Exception as e:
+            raise ValueError(f"❌Erro ao gerar o registro {name}: {e}")
+        return [line]
+
+    def _extra_values(self, plan: tuple[FieldSpec, ...], sequence: int,
+                      totals: record_types.Totals | None = None) -> list:
+        return [
+            "" if spec.value is None else spec.value.resolve(totals, sequence)
+            for spec in plan]
+
+    def preview(self, layout_path: str, input_path: str,
+                rows: int = PREVIEW_ROWS) -> Preview:
+        """Renders only the first rows of the input, as convert would."""
+        self.load_layout_fields(layout_path)
+        try:
+            df = reader.read_head(
+                input_path, rows, self.input_delimiter, self.input_encoding,
+                self._input_columns())
+        except ValueError:
+            raise
+        except Exception as e:
+            raise ValueError(f"❌Erro ao ler arquivo de entrada: {e}")
 
-                    value = formatter.apply_format_rules(
-                        value, field.format_rule,
-                        field.length, field.decimals)
+        result = Preview()
+        result.rows = len(df)
+        errors = self._missing_columns(df)
+        errors.extend(self._input_errors(df)[0])
+        checked = {error.row for error in errors}
+        totals = self._totals()
+        self._preview_extra(result, self.header_plan, "header", 1)
+
+        columns, row_errors = engine.render_columns(df, self.layout_plan)
+        for pos, values in enumerate(zip(*columns)):
+            if pos not in row_errors:
+                result.add_record(self.layout_plan, values)
+        # a row the checks rejected fails to format for the same reason
+        errors.extend(row_errors[pos] for pos in sorted(row_errors)
+                      if row_errors[pos].row not in checked)
+        result.errors[:0] = [f"{e}" for e in errors[:self.max_errors]]
+        try:
+            self._accumulate(totals, df, 0, len(df) - len(row_errors))
+        except ValueError as e:
+            result.errors.append(f"{e}")
+        else:
+            self._preview_extra(
+                result, self.trailer_plan, "trailer", totals.records, totals)
+        return result
+
+    def _preview_extra(self, result: Preview, plan: tuple[FieldSpec, ...],
+                       name: str, sequence: int,
+                       totals: record_types.Totals | None = None) -> None:
+        if not plan:
+            return
+        try:
+            values = self._extra_values(plan, sequence, totals)
+            result.add_record(plan, [spec.render(value) for spec, value
+                                     in zip(plan, values)])
+        except Exception as e:
+            result.errors.append(f"❌Erro ao gerar o registro {name}: {e}")
 
-                    value = field.format_value(value)
-                    final_string += value
-                self.final_file_lines.append(final_string)
-
-            except Exception as e:
-                read_errors.append(f'Linha {i+2}: {e}')
-                continue
-        if read_errors:
-            raise ValueError(
-                "❌Foram encontrados erros na entrada:\n" +
-                "\n".join(f"- {e}" for e in read_errors)
-            )
+    def _record_encoder(self) -> RecordEncoder | None:
+        if self.engine == "rows":
+            return None
+        encoder = RecordEncoder(self.layout_plan)
+        return encoder if encoder.fixed else None
 
     def final_file_division(self, num: int) -> list:
         size = len(self.final_file_lines) // num
@@ -177,16 +464,329 @@ class Model:
             start = end
         return res
 
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def _checkpoint(self, done: int, total: int | None) -> None:
+        if self._cancel.is_set():
+            raise ConversionCancelled("Conversão cancelada.")
+        if self.progress is not None:
+            self.progress(done, total)
+
+    def _stage(self, name: str, rows_in: int = 0):
+        if self.report is None:
+            return nullcontext(StageStats())
+        return self.report.stage(name, rows_in)
+
+    def _written(self, paths: list[str]) -> None:
+        self.written_paths = paths
+        if self.report is None:
+            return
+        self.report.files = paths
+        self.report.bytes_written = sum(
+            os.path.getsize(path) for path in paths)
+
+    def get_report(self) -> dict | None:
+        if self.report is None:
+            return None
+        return self.report.to_dict()
+
+    def convert_file(self, layout_path: str, input_path: str,
+                     output_path: str, num: str = "1") -> None:
+        self._cancel.clear()
+        self.report = RunReport() if self.instrument else None
+        self.error_report_path = (
+            errors_path(output_path) if self.error_report else None)
+        memo_start = formatter.memo_stats()
+        try:
+            self._convert_file(layout_path, input_path, output_path, num)
+        except ConversionCancelled as e:
+            # the collector was closed on the way out; its report is partial
+            discard_report(self.error_report_path)
+            self._finish_report(output_path, memo_start, "cancelled", f"{e}")
+            raise
+        except Exception as e:
+            self._finish_report(output_path, memo_start, "error", f"{e}")
+            raise
+        self._finish_report(output_path, memo_start, "ok")
+
+    def _finish_report(self, output_path: str, memo_start: dict,
+                       status: str, error: str = "") -> None:
+        if self.report is None:
+            return
+        self.report.finish(status, error)
+        if self.engine == "rows" and self.workers <= 1:
+            self.report.rows_memo = formatter.memo_stats(since=memo_start)
+        self.report.write_json(writer.report_path(output_path))
+
+    def _convert_file(self, layout_path: str, input_path: str,
+                      output_path: str, num: str) -> None:
+        self.load_layout_fields(layout_path)
+        self.set_num_files(num)
+        if self.sheets:
+            self.convert_workbook(input_path, output_path)
+            return
+        if self.incremental:
+            try:
+                self.convert_incremental(input_path, output_path)
+                return
+            except _IncrementalFallback:
+                pass
+        if reader.supports_streaming(input_path):
+            self.convert_streaming(input_path, output_path)
+            return
+        input_df = self.read_input_df(input_path)
+        self._checkpoint(0, len(input_df))
+        self.validate_input_df(input_df)
+        self.transform_input_values(input_df)
+        self._checkpoint(len(input_df), len(input_df))
+        self.convert_to_text(output_path)
+
     def convert_to_text(self, output_path: str) -> None:
-        output_path = output_path.replace('.txt', '')
-        for i, file_lines in enumerate(
-                self.final_file_division(self.number_of_files), start=1):
-
-            with open(f'{output_path}{i}.txt', 'w', encoding='CP1252') as f:
-                for i, line in enumerate(file_lines):
-                    f.write(line)
-                    if i < len(file_lines) - 1:
-                        f.write('\n')
+        with self._stage(
+                "convert_to_text", len(self.final_file_lines)) as stats:
+            if self.max_part_bytes or self.max_part_records:
+                with self._text_writer(
+                        output_path, len(self.final_file_lines)) as out:
+                    out.write_records(self.final_file_lines)
+                paths = out.paths
+            else:
+                paths = writer.write_parts(
+                    output_path, self.final_file_lines,
+                    self.number_of_files, self.workers)
+            stats.rows_out += len(self.final_file_lines)
+        self._written(paths)
+
+    def _text_writer(self, output_path: str, total: int | None = None,
+                     part_separator: str = "") -> writer.TextWriter:
+        return writer.TextWriter(
+            output_path, self.number_of_files, total,
+            self.max_part_bytes, self.max_part_records, part_separator)
+
+    def convert_streaming(self, input_path: str, output_path: str) -> None:
+        with reader.open_chunks(
+                input_path, self.chunk_size, self.input_delimiter,
+                self.input_encoding, self._input_columns()) as chunks:
+            self._convert_sheets(
+                [(output_path, [None])], lambda sheet: chunks,
+                {None: chunks.total_rows})
+
+    def convert_workbook(self, input_path: str, output_path: str) -> None:
+        """Converts the selected sheets one after another, in one pass."""
+        with reader.open_workbook(
+                input_path, self.chunk_size,
+                self._input_columns()) as workbook:
+            sheets = reader.select_sheets(workbook.sheet_names, self.sheets)
+            separator = ""
+            if self.split_sheets:
+                outputs = [(path, [sheet]) for path, sheet in zip(
+                    writer.sheet_paths(output_path, sheets), sheets)]
+                separator = writer.SHEET_PART_SEPARATOR
+            else:
+                outputs = [(output_path, sheets)]
+            self._convert_sheets(
+                outputs, workbook.sheet_chunks,
+                {sheet: workbook.sheet_rows(sheet) for sheet in sheets},
+                separator)
+
+    def _convert_sheets(self, outputs: list[tuple[str, list]], chunks_of,
+                        rows: dict, part_separator: str = "") -> None:
+        """Streams each output's sheets into its own TXT.
+
+        Line numbers in errors count from each sheet's header, while
+        sequence numbers and totals run over the whole output. Nothing is
+        kept if any sheet has errors.
+        """
+        input_failed = False
+        done = 0
+        total = _row_total(rows.values())
+        texts = []
+        with self._transformer(self._record_encoder()) as transform, \
+                self._collector() as errors, ExitStack() as files:
+            self._checkpoint(0, total)
+            for output_path, sheets in outputs:
+                out = files.enter_context(self._text_writer(
+                    output_path, self._total_records(
+                        _row_total(rows[sheet] for sheet in sheets)),
+                    part_separator))
+                texts.append(out)
+                totals = self._totals()
+                out.write_records(self._header_lines())
+                position = 0
+                for sheet in sheets:
+                    errors.sheet = sheet
+                    start = 0
+                    chunks = iter(chunks_of(sheet))
+                    while not errors.stopped:
+                        with self._stage("read_input_df") as stats:
+                            chunk = next(chunks, None)
+                            if chunk is None:
+                                break
+                            stats.rows_out += len(chunk)
+
+                        with self._stage("validate_input_df", len(chunk)):
+                            count = errors.count
+                            if start == 0:
+                                errors.add(self._missing_columns(chunk))
+                            errors.add(self._input_errors(chunk, start)[0])
+                            input_failed = input_failed or (
+                                errors.count > count)
+
+                        if not input_failed:
+                            with self._stage("transform_input_values",
+                                             len(chunk)) as stats:
+                                lines, found = transform(chunk, position)
+                                self._accumulate(
+                                    totals, chunk, position, len(lines))
+                                stats.rows_out += len(lines)
+                            for error in found:
+                                error.row -= position - start
+                            errors.add(found)
+                            if not errors.count:
+                                with self._stage("convert_to_text",
+                                                 len(lines)) as stats:
+                                    out.write_records(lines)
+                                    stats.rows_out += len(lines)
+                        start += len(chunk)
+                        position += len(chunk)
+                        done += len(chunk)
+                        self._checkpoint(done, total)
+                if errors.count:
+                    break
+                out.write_records(self._trailer_lines(totals))
+            errors.raise_errors()
+        self._written([path for out in texts for path in out.paths])
+
+    def _total_records(self, total_rows: int | None) -> int | None:
+        if total_rows is None:
+            return None
+        return total_rows + bool(self.header_plan) + bool(self.trailer_plan)
+
+    def convert_incremental(self, input_path: str, output_path: str) -> None:
+        if self.header_plan or self.trailer_plan or any(
+                spec.value is not None for spec in self.layout_plan):
+            raise _IncrementalFallback()
+        cache = incremental.RecordCache(
+            incremental.cache_path(output_path), self.layout_key).load()
+        names = [field.name for field in self.layout_fields]
+        start = 0
+        with self._text_writer(output_path) as out, \
+                self._transformer() as transform:
+            self._checkpoint(0, None)
+            for chunk in self._input_chunks(input_path):
+                if start == 0 and self._missing_columns(chunk):
+                    raise _IncrementalFallback()
+                keys = incremental.row_keys(chunk, names)
+                records = cache.lookup(keys)
+                changed = [pos for pos, record in enumerate(records)
+                           if record is None]
+                if changed:
+                    rows = chunk.iloc[changed].reset_index(drop=True)
+                    with self._stage("validate_input_df", len(rows)):
+                        _, error_count = self._input_errors(rows)
+                    if error_count:
+                        raise _IncrementalFallback()
+                    with self._stage(
+                            "transform_input_values", len(rows)) as stats:
+                        lines, errors = transform(rows, 0)
+                        stats.rows_out += len(lines)
+                    if errors:
+                        raise _IncrementalFallback()
+                    for pos, line in zip(changed, lines):
+                        records[pos] = line
+                with self._stage("convert_to_text", len(records)) as stats:
+                    out.write_records(records)
+                    stats.rows_out += len(records)
+                cache.remember(keys, records)
+                start += len(chunk)
+                self._checkpoint(start, None)
+        cache.save()
+        if self.report is not None:
+            self.report.incremental = {
+                "reused": cache.hits, "converted": cache.misses}
+        self._written(out.paths)
+
+    def parse_file(self, layout_path: str, txt_path: str,
+                   output_path: str) -> int:
+        self.load_layout_fields(layout_path)
+        parser = self._parser()
+        delimiter = (self.input_delimiter or
+                     reader.default_delimiter(output_path))
+        try:
+            return writer.write_table(
+                output_path, parser.iter_frames(txt_path),
+                parser.columns, delimiter)
+        except ValueError:
+            raise
+        except Exception as e:
+            raise ValueError(f"❌Erro ao ler arquivo TXT: {e}")
+
+    def verify_round_trip(self, layout_path: str, txt_path: str,
+                          input_path: str) -> int:
+        self.load_layout_fields(layout_path)
+        parser = self._parser()
+        records = RecordBuffer(parser.iter_raw(txt_path))
+        differences: list[str] = []
+        count = 0
+        start = 0
+        for chunk in self._input_chunks(input_path):
+            found, present = records.take(len(chunk))
+            if len(present) < len(chunk):
+                raise ValueError(
+                    f"❌O TXT tem {start + len(present)} registros e a "
+                    f"entrada tem pelo menos {start + len(chunk)} linhas.")
+            for j, spec in enumerate(self.layout_plan):
+                expected, errors = engine.render_field(
+                    engine.field_values(chunk, spec, start), spec)
+                if errors:
+                    pos = min(errors)
+                    raise ValueError(
+                        "❌Foram encontrados erros na entrada:\n"
+                        f"- Linha {start+pos+2}: {errors[pos]}")
+                expected = pd.Series(expected).str.slice(len(spec.prefix))
+                actual = np.where(present[:, j], found[j], "")
+                for pos in np.flatnonzero(expected.to_numpy() != actual):
+                    count += 1
+                    if len(differences) < self.max_errors:
+                        differences.append(
+                            f"Linha {start+pos+2}, campo '{spec.name}': "
+                            f"esperado '{expected[pos]}', "
+                            f"encontrado '{actual[pos]}'")
+            start += len(chunk)
+
+        extra = records.remaining()
+        if extra:
+            raise ValueError(
+                f"❌O TXT tem {start + extra} registros e a entrada tem "
+                f"{start} linhas.")
+        if count > len(differences):
+            differences.append(f"... e mais {count - len(differences)} erros.")
+        if differences:
+            raise ValueError(
+                "❌Foram encontradas diferenças entre o TXT e a entrada:\n" +
+                "\n".join(f"- {d}" for d in differences)
+            )
+        return start
+
+    def _parser(self) -> PositionalParser:
+        return PositionalParser(
+            self.layout_fields, self.chunk_size,
+            self._record_lines(self.header_fields),
+            self._record_lines(self.trailer_fields))
+
+    def _record_lines(self, fields: list[LayoutField]) -> int:
+        if not fields:
+            return 0
+        return 1 + sum(bool(field.new_line) for field in fields)
+
+    def _input_chunks(self, input_path: str):
+        if not reader.supports_streaming(input_path):
+            yield self.read_input_df(input_path)
+            return
+        with reader.open_chunks(
+                input_path, self.chunk_size, self.input_delimiter,
+                self.input_encoding, self._input_columns()) as chunks:
+            yield from chunks
 
     def download_sample_layout(self, path: str) -> None:
         output_path = os.path.join(path, self.sample_file_name)
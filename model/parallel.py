@@ -0,0 +1,103 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from model import engine
+from model.encoder import RecordEncoder
+from model.errors import InputError
+from model.layout import FieldSpec
+from utils.instrumentation import formatter_stats
+
+# below this a shard costs more to pickle and hand over than it saves,
+# and the first one also pays for starting the pool
+MIN_SHARD_ROWS = 20000
+
+_plan: tuple[FieldSpec, ...] = ()
+_engine = "columns"
+_encoder: RecordEncoder | None = None
+
+
+def _init_worker(plan: tuple[FieldSpec, ...], engine_name: str,
+                 encoder: RecordEncoder | None = None) -> None:
+    global _plan, _engine, _encoder
+    _plan = plan
+    _engine = engine_name
+    _encoder = encoder
+
+
+def _transform_shard(shard: pd.DataFrame, start: int) -> tuple[
+        list[str] | np.ndarray, list[InputError], list[tuple]]:
+    stats = formatter_stats(_plan)
+    before = [item.totals() for item in stats]
+    lines, errors = engine.transform(shard, _plan, _engine, start, _encoder)
+    used = [tuple(now - then for now, then in zip(item.totals(), old))
+            for item, old in zip(stats, before)]
+    return lines, errors, used
+
+
+def cpu_count() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def shard_bounds(total: int, workers: int) -> list[tuple[int, int]]:
+    count = max(1, min(workers, cpu_count(), total // MIN_SHARD_ROWS))
+    size, remainder = divmod(total, count)
+    bounds = []
+    start = 0
+    for i in range(count):
+        end = start + size + (1 if i < remainder else 0)
+        bounds.append((start, end))
+        start = end
+    return bounds
+
+
+class ParallelTransformer:
+    def __init__(self, plan: tuple[FieldSpec, ...], engine_name: str,
+                 workers: int, encoder: RecordEncoder | None = None) -> None:
+        self.plan = plan
+        self.engine = engine_name
+        self.workers = workers
+        self.encoder = encoder
+        self._executor: ProcessPoolExecutor | None = None
+
+    def __enter__(self) -> "ParallelTransformer":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def transform(self, df: pd.DataFrame, start: int = 0) -> tuple[
+            list[str] | np.ndarray, list[InputError]]:
+        bounds = shard_bounds(len(df), self.workers)
+        if len(bounds) < 2:
+            return engine.transform(
+                df, self.plan, self.engine, start, self.encoder)
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=min(self.workers, cpu_count()),
+                initializer=_init_worker,
+                initargs=(self.plan, self.engine, self.encoder))
+        futures = [
+            self._executor.submit(
+                _transform_shard, df.iloc[first:last], start + first)
+            for first, last in bounds
+        ]
+        results = [future.result() for future in futures]
+        # formatter timings were taken on the workers' copies of the plan
+        stats = formatter_stats(self.plan)
+        for _, _, used in results:
+            for item, totals in zip(stats, used):
+                item.add(*totals)
+        errors = [error for _, found, _ in results for error in found]
+        if isinstance(results[0][0], np.ndarray):
+            return np.concatenate([block for block, _, _ in results]), errors
+        return [line for lines, _, _ in results for line in lines], errors
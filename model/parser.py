@@ -0,0 +1,333 @@
+import mmap
+import os
+import numpy as np
+import pandas as pd
+import utils.formatters as formatter
+from model.layout import LayoutField
+from model.writer import ENCODING
+
+CHUNK_RECORDS = 50000
+WINDOW_BYTES = 1 << 26
+
+
+def codepoint_table(encoding: str = ENCODING) -> np.ndarray:
+    table = np.full(256, 0xFFFD, dtype=np.uint32)
+    for byte in range(256):
+        try:
+            table[byte] = ord(bytes([byte]).decode(encoding))
+        except UnicodeDecodeError:
+            pass
+    return table
+
+
+class ParseSpec:
+    __slots__ = ("name", "length", "fill", "right", "new_line", "null_char",
+                 "decimals", "zero_as_blank")
+
+    def __init__(self, field: LayoutField) -> None:
+        self.name = field.name
+        self.length = field.length
+        self.fill = field.fill
+        self.right = field.align == "right"
+        self.new_line = bool(field.new_line)
+        self.null_char = field.null_char
+        self.decimals = None
+        if "3" in field.format_rule:
+            self.decimals = formatter.parse_decimals(field.decimals)
+        self.zero_as_blank = "4" in field.format_rule
+
+    def unpad(self, raw: np.ndarray) -> np.ndarray:
+        if self.right:
+            return np.char.lstrip(raw, self.fill)
+        return np.char.rstrip(raw, self.fill)
+
+    def decode(self, raw: np.ndarray, present: np.ndarray) -> pd.Series:
+        values = self.unpad(raw)
+        if self.zero_as_blank:
+            values = np.where(np.char.strip(raw, " ") == "", "0", values)
+        values = pd.Series(values.astype(object))
+        if self.decimals is not None:
+            values = formatter.unscale_money_column(values, self.decimals)
+        if not present.all():
+            values[~present] = self.null_char
+        return values
+
+
+class PositionalParser:
+    def __init__(self, layout_fields: list[LayoutField],
+                 chunk_records: int = CHUNK_RECORDS, skip_first: int = 0,
+                 skip_last: int = 0) -> None:
+        self.specs = tuple(ParseSpec(field) for field in layout_fields)
+        self.columns = [spec.name for spec in self.specs]
+        self.chunk_records = chunk_records
+        self.skip_first = skip_first
+        self.skip_last = skip_last
+        self.lines_per_record = 1 + sum(spec.new_line for spec in self.specs)
+        self.nullable = any(spec.null_char for spec in self.specs)
+        self._table = codepoint_table()
+        self._placements: dict[tuple, tuple | None] = {}
+        if not self.nullable:
+            self._fixed = self._place(self._full_lengths())
+
+    def _full_lengths(self) -> tuple[int, ...]:
+        lengths = [0]
+        for spec in self.specs:
+            if spec.new_line:
+                lengths.append(0)
+            lengths[-1] += spec.length
+        return tuple(lengths)
+
+    def _place(self, lengths: tuple[int, ...]) -> tuple | None:
+        if lengths not in self._placements:
+            placed: list = []
+            used = self._search(lengths, 0, 0, 0, placed)
+            self._placements[lengths] = (
+                None if used is None else (used, tuple(placed)))
+        return self._placements[lengths]
+
+    def _search(self, lengths: tuple[int, ...], j: int, line: int,
+                offset: int, placed: list) -> int | None:
+        if j == len(self.specs):
+            return line + 1 if offset == lengths[line] else None
+        spec = self.specs[j]
+
+        next_line, next_offset = line, offset
+        if spec.new_line:
+            if (offset != lengths[line] or line + 1 == len(lengths) or
+                    lengths[line + 1] < 0):
+                next_line = None
+            else:
+                next_line, next_offset = line + 1, 0
+        if (next_line is not None and
+                next_offset + spec.length <= lengths[next_line]):
+            placed.append((next_line, next_offset))
+            used = self._search(lengths, j + 1, next_line,
+                                next_offset + spec.length, placed)
+            if used is not None:
+                return used
+            placed.pop()
+
+        if spec.null_char:
+            placed.append(None)
+            used = self._search(lengths, j + 1, line, offset, placed)
+            if used is not None:
+                return used
+            placed.pop()
+        return None
+
+    def iter_frames(self, path: str):
+        return self._iter_mapped(path, self._frame)
+
+    def iter_raw(self, path: str):
+        return self._iter_mapped(path, self._raw)
+
+    def _iter_mapped(self, path: str, convert):
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            buf = np.frombuffer(mapped, dtype=np.uint8)
+            fields = self._iter_fields(buf)
+            try:
+                for starts, present in fields:
+                    yield convert(buf, starts, present)
+            finally:
+                fields.close()
+                del buf
+                try:
+                    mapped.close()
+                except BufferError:
+                    # a traceback still references the view; the map is
+                    # released when the exception is collected
+                    pass
+
+    def parse(self, path: str) -> pd.DataFrame:
+        frames = list(self.iter_frames(path))
+        if not frames:
+            return pd.DataFrame(columns=self.columns, dtype=object)
+        return pd.concat(frames, ignore_index=True)
+
+    def _frame(self, buf: np.ndarray, starts: np.ndarray,
+               present: np.ndarray) -> pd.DataFrame:
+        data = {}
+        for j, spec in enumerate(self.specs):
+            raw = self._slice(buf, starts[:, j], spec.length)
+            data[spec.name] = spec.decode(raw, present[:, j]).to_numpy()
+        return pd.DataFrame(data, columns=self.columns)
+
+    def _raw(self, buf: np.ndarray, starts: np.ndarray,
+             present: np.ndarray) -> tuple[list[np.ndarray], np.ndarray]:
+        return [self._slice(buf, starts[:, j], spec.length)
+                for j, spec in enumerate(self.specs)], present
+
+    def _slice(self, buf: np.ndarray, starts: np.ndarray,
+               width: int) -> np.ndarray:
+        index = np.maximum(starts, 0)[:, None] + np.arange(width)
+        index[starts < 0] = 0
+        codes = self._table[buf[index]]
+        return np.ascontiguousarray(codes).view(f"<U{width}").ravel()
+
+    def _iter_fields(self, buf: np.ndarray):
+        pending_starts = np.empty(0, dtype=np.int64)
+        pending_lengths = np.empty(0, dtype=np.int64)
+        record = 0
+        for starts, lengths, last in self._iter_body(buf):
+            pending_starts = np.concatenate((pending_starts, starts))
+            pending_lengths = np.concatenate((pending_lengths, lengths))
+            if self.nullable:
+                fields, used = self._place_records(
+                    pending_starts, pending_lengths, record, last)
+            else:
+                fields, used = self._place_fixed(
+                    pending_starts, pending_lengths, record, last)
+            pending_starts = pending_starts[used:]
+            pending_lengths = pending_lengths[used:]
+            for k in range(0, len(fields[0]), self.chunk_records):
+                yield (fields[0][k:k + self.chunk_records],
+                       fields[1][k:k + self.chunk_records])
+            record += len(fields[0])
+
+    def _iter_lines(self, buf: np.ndarray):
+        size = len(buf)
+        line_start = 0
+        for pos in range(0, size, WINDOW_BYTES):
+            stop = min(pos + WINDOW_BYTES, size)
+            ends = np.flatnonzero(buf[pos:stop] == 10).astype(np.int64)
+            ends += pos
+            last = stop == size
+            if last and line_start < size and (
+                    not len(ends) or ends[-1] != size - 1):
+                ends = np.append(ends, size)
+            if not len(ends):
+                continue
+            starts = np.empty_like(ends)
+            starts[0] = line_start
+            starts[1:] = ends[:-1] + 1
+            line_start = int(ends[-1]) + 1
+            carriage = (ends > starts) & (buf[ends - 1] == 13)
+            ends[carriage] -= 1
+            yield starts, ends - starts, last
+
+    def _iter_body(self, buf: np.ndarray):
+        """Lines of the detail records, without header and trailer lines."""
+        if not self.skip_first and not self.skip_last:
+            yield from self._iter_lines(buf)
+            return
+        skip = self.skip_first
+        held_starts = np.empty(0, dtype=np.int64)
+        held_lengths = np.empty(0, dtype=np.int64)
+        for starts, lengths, last in self._iter_lines(buf):
+            dropped = min(skip, len(starts))
+            skip -= dropped
+            starts = np.concatenate((held_starts, starts[dropped:]))
+            lengths = np.concatenate((held_lengths, lengths[dropped:]))
+            cut = max(0, len(starts) - self.skip_last)
+            held_starts, held_lengths = starts[cut:], lengths[cut:]
+            if last and (skip or len(held_starts) < self.skip_last):
+                break
+            if cut or last:
+                yield starts[:cut], lengths[:cut], last
+        if skip or len(held_starts) < self.skip_last:
+            raise ValueError(
+                "❌O TXT não tem as linhas de header e trailer do layout.")
+
+    def _place_fixed(self, starts: np.ndarray, lengths: np.ndarray,
+                     record: int, last: bool) -> tuple[tuple, int]:
+        per_record = self.lines_per_record
+        count = len(starts) // per_record
+        if last and len(starts) % per_record:
+            self._invalid(record + count, lengths, count * per_record)
+        used = count * per_record
+        starts = starts[:used].reshape(count, per_record)
+        lengths = lengths[:used].reshape(count, per_record)
+        expected = np.array(self._full_lengths())
+        wrong = np.flatnonzero((lengths != expected).any(axis=1))
+        if len(wrong):
+            self._invalid(record + wrong[0], lengths.ravel(),
+                          wrong[0] * per_record)
+
+        _, placed = self._fixed
+        lines = np.array([line for line, _ in placed], dtype=np.intp)
+        offsets = np.array([offset for _, offset in placed], dtype=np.int64)
+        fields = starts[:, lines] + offsets
+        present = np.ones(fields.shape, dtype=bool)
+        return (fields, present), used
+
+    def _place_records(self, starts: np.ndarray, lengths: np.ndarray,
+                       record: int, last: bool) -> tuple[tuple, int]:
+        per_record = self.lines_per_record
+        count = len(lengths)
+        window = np.full((count, per_record), -1, dtype=np.int64)
+        for k in range(per_record):
+            window[:count - k, k] = lengths[k:]
+        keys, inverse = np.unique(window, axis=0, return_inverse=True)
+        inverse = inverse.reshape(-1)
+
+        fields = len(self.specs)
+        used = np.zeros(len(keys), dtype=np.int64)
+        lines = np.zeros((len(keys), fields), dtype=np.int64)
+        offsets = np.zeros((len(keys), fields), dtype=np.int64)
+        present = np.zeros((len(keys), fields), dtype=bool)
+        for k, key in enumerate(keys.tolist()):
+            placement = self._place(tuple(key))
+            if placement is None:
+                continue
+            used[k], placed = placement
+            for j, spot in enumerate(placed):
+                if spot is not None:
+                    lines[k, j], offsets[k, j] = spot
+                    present[k, j] = True
+
+        used_by_line = used[inverse].tolist()
+        limit = count if last else count - per_record + 1
+        record_lines = []
+        line = 0
+        while line < limit:
+            step = used_by_line[line]
+            if not step:
+                self._invalid(record + len(record_lines), lengths, line)
+            record_lines.append(line)
+            line += step
+
+        first = np.array(record_lines, dtype=np.int64)
+        key = inverse[first]
+        found = starts[first[:, None] + lines[key]] + offsets[key]
+        found[~present[key]] = -1
+        return (found, present[key]), line
+
+    def _invalid(self, record: int, lengths: np.ndarray, line: int) -> None:
+        found = lengths[line:line + self.lines_per_record].tolist()
+        raise ValueError(
+            f"❌Registro {record + 1} não corresponde ao layout: "
+            f"tamanho(s) de linha esperado(s) {list(self._full_lengths())}, "
+            f"encontrado(s) {found}.")
+
+
+class RecordBuffer:
+    def __init__(self, chunks) -> None:
+        self._chunks = iter(chunks)
+        self._fields: list[np.ndarray] = []
+        self._present = np.empty((0, 0), dtype=bool)
+
+    def take(self, count: int) -> tuple[list[np.ndarray], np.ndarray]:
+        while len(self._present) < count:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            fields, present = chunk
+            if self._fields:
+                fields = [np.concatenate((old, new))
+                          for old, new in zip(self._fields, fields)]
+                present = np.concatenate((self._present, present))
+            self._fields, self._present = fields, present
+        taken = ([values[:count] for values in self._fields],
+                 self._present[:count])
+        self._fields = [values[count:] for values in self._fields]
+        self._present = self._present[count:]
+        return taken
+
+    def remaining(self) -> int:
+        count = len(self._present)
+        for _, present in self._chunks:
+            count += len(present)
+        return count
@@ -0,0 +1,58 @@
+from model.layout import FieldSpec
+
+PREVIEW_ROWS = 20
+RULER_STEP = 10
+
+
+class FieldSpan:
+    __slots__ = ("name", "line", "start", "end")
+
+    def __init__(self, name: str, line: int, start: int, end: int) -> None:
+        self.name = name
+        self.line = line
+        self.start = start
+        self.end = end
+
+
+class Preview:
+    """First lines of the TXT and where each field landed in them.
+
+    Lines and spans are 0-based; spans come from the rendered values, so a
+    nulled field takes no room, as in the converted file.
+    """
+
+    def __init__(self) -> None:
+        self.lines: list[str] = []
+        self.spans: list[FieldSpan] = []
+        self.errors: list[str] = []
+        self.rows = 0
+
+    def add_record(self, plan: tuple[FieldSpec, ...], values) -> None:
+        parts = [""]
+        for spec, value in zip(plan, values):
+            if spec.prefix and value:
+                parts.append("")
+                value = value[len(spec.prefix):]
+            if value:
+                start = len(parts[-1])
+                self.spans.append(FieldSpan(
+                    spec.name, len(self.lines) + len(parts) - 1,
+                    start, start + len(value)))
+                parts[-1] += value
+        self.lines.extend(parts)
+
+    @property
+    def width(self) -> int:
+        return max((len(line) for line in self.lines), default=0)
+
+    def ruler(self) -> list[str]:
+        return ruler(self.width)
+
+
+def ruler(width: int) -> list[str]:
+    """Two ruler lines: tens every RULER_STEP columns, then units."""
+    tens = "".join(
+        str(col // RULER_STEP % 10) if col % RULER_STEP == 0 else " "
+        for col in range(1, width + 1))
+    units = "".join(str(col % 10) for col in range(1, width + 1))
+    return [tens, units]
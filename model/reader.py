@@ -0,0 +1,360 @@
+import datetime
+from functools import partial
+import pandas as pd
+
+EXCEL_STREAMING_EXTENSIONS = (".xlsx", ".xlsm")
+# .txt stays out: it is this tool's positional output, not a table
+DELIMITED_EXTENSIONS = (".csv", ".tsv")
+STREAMING_EXTENSIONS = EXCEL_STREAMING_EXTENSIONS + DELIMITED_EXTENSIONS
+DEFAULT_ENCODING = "utf-8-sig"
+ALL_SHEETS = "*"
+
+
+def supports_streaming(input_path: str) -> bool:
+    return input_path.lower().endswith(STREAMING_EXTENSIONS)
+
+
+def is_delimited(input_path: str) -> bool:
+    return input_path.lower().endswith(DELIMITED_EXTENSIONS)
+
+
+def default_delimiter(input_path: str) -> str:
+    if input_path.lower().endswith(".tsv"):
+        return "\t"
+    return ","
+
+
+def read_delimited(input_path: str, delimiter: str | None = None,
+                   encoding: str = DEFAULT_ENCODING,
+                   columns: set[str] | None = None, **kwargs):
+    read = partial(
+        pd.read_csv,
+        input_path,
+        sep=delimiter or default_delimiter(input_path),
+        encoding=encoding,
+        dtype=str,
+        keep_default_na=False,
+        engine="c",
+    )
+    if columns:
+        kwargs["usecols"] = column_positions(
+            read(nrows=0).columns, columns)
+    return read(**kwargs)
+
+
+def read_excel(input_path: str, columns: set[str] | None = None,
+               **kwargs):
+    read = partial(pd.read_excel, input_path, dtype=str,
+                   keep_default_na=False)
+    if columns:
+        kwargs["usecols"] = column_positions(
+            read(nrows=0).columns, columns)
+    return read(**kwargs)
+
+
+def read_head(input_path: str, rows: int, delimiter: str | None = None,
+              encoding: str = DEFAULT_ENCODING,
+              columns: set[str] | None = None) -> pd.DataFrame:
+    """First rows of the input, without reading the rest of the file."""
+    if is_delimited(input_path):
+        df = read_delimited(input_path, delimiter, encoding, columns,
+                            nrows=rows)
+    elif input_path.lower().endswith(EXCEL_STREAMING_EXTENSIONS):
+        with ExcelChunkReader(input_path, rows, columns) as chunks:
+            df = next(iter(chunks))
+    else:
+        df = read_excel(input_path, columns, nrows=rows)
+    df.columns = normalize_columns(df.columns)
+    return df
+
+
+def count_lines(input_path: str) -> int:
+    count = 0
+    last = b"\n"
+    with open(input_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            count += block.count(b"\n")
+            last = block[-1:]
+    if last != b"\n":
+        count += 1
+    return count
+
+
+def open_chunks(input_path: str, chunk_size: int,
+                delimiter: str | None = None,
+                encoding: str = DEFAULT_ENCODING,
+                columns: set[str] | None = None):
+    if is_delimited(input_path):
+        return DelimitedChunkReader(
+            input_path, chunk_size, delimiter, encoding, columns)
+    return ExcelChunkReader(input_path, chunk_size, columns)
+
+
+def normalize_column(column) -> str:
+    return str(column).strip().lower()
+
+
+def normalize_columns(columns) -> list[str]:
+    return [normalize_column(c) for c in columns]
+
+
+def column_positions(header, columns: set[str]) -> list[int] | None:
+    """Positions of the wanted columns; None (every column) if none match.
+
+    Positions keep duplicated headers apart, and reading at least every
+    column when nothing matches keeps the row count.
+    """
+    positions = [i for i, column in enumerate(header)
+                 if normalize_column(column) in columns]
+    return positions or None
+
+
+def cell_to_str(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return str(value)
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, (int, float, str)):
+        return str(value)
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return str(pd.Timestamp(value))
+    return str(value)
+
+
+def _header_labels(header: list, width: int) -> list:
+    labels = []
+    seen: dict = {}
+    for i in range(width):
+        value = header[i] if i < len(header) else None
+        if value is None or value == "":
+            label = f"Unnamed: {i}"
+        elif isinstance(value, float) and value.is_integer():
+            label = int(value)
+        else:
+            label = value
+        if label in seen:
+            count = seen[label]
+            while f"{label}.{count}" in seen:
+                count += 1
+            seen[label] = count + 1
+            label = f"{label}.{count}"
+        seen[label] = seen.get(label, 1)
+        labels.append(label)
+    return labels
+
+
+def _row_end(row: tuple) -> int:
+    end = len(row)
+    while end and (row[end - 1] is None or row[end - 1] == ""):
+        end -= 1
+    return end
+
+
+class ExcelChunkReader:
+    def __init__(self, input_path: str, chunk_size: int,
+                 columns: set[str] | None = None,
+                 sheet: str | None = None) -> None:
+        from openpyxl import load_workbook
+
+        try:
+            self._workbook = load_workbook(
+                input_path, read_only=True, data_only=True)
+        except Exception as e:
+            raise ValueError(f"❌Erro ao ler arquivo de entrada: {e}")
+        self.chunk_size = chunk_size
+        self.columns = columns or None
+        self.sheet = sheet or self.sheet_names[0]
+        self.total_rows = self.sheet_rows(self.sheet)
+
+    def __enter__(self) -> "ExcelChunkReader":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._workbook.close()
+
+    @property
+    def sheet_names(self) -> list[str]:
+        return [sheet.title for sheet in self._workbook.worksheets]
+
+    def sheet_rows(self, sheet: str) -> int | None:
+        max_row = self._workbook[sheet].max_row
+        return max_row - 1 if max_row else None
+
+    def __iter__(self):
+        return self.sheet_chunks(self.sheet)
+
+    def sheet_chunks(self, sheet: str):
+        rows = self._workbook[sheet].iter_rows(values_only=True)
+        header = next(rows, ())
+        width = len(header)
+        header = list(header)
+        columns, keep = self._project(header, width)
+
+        chunk: list[list[str]] = []
+        blank_rows = 0
+        emitted = False
+        for row in rows:
+            end = _row_end(row)
+            if not end:
+                blank_rows += 1
+                continue
+            if end > width:
+                width = end
+                columns, keep = self._project(header, width)
+            # only the kept cells are converted
+            values = [cell_to_str(row[i]) if i < end else "" for i in keep]
+            chunk.extend([[]] * blank_rows)
+            blank_rows = 0
+            chunk.append(values)
+            if len(chunk) >= self.chunk_size:
+                yield _chunk_frame(chunk, columns)
+                emitted = True
+                chunk = []
+        if chunk or not emitted:
+            yield _chunk_frame(chunk, columns)
+
+    def _project(self, header: list,
+                 width: int) -> tuple[list[str], list[int]]:
+        labels = normalize_columns(_header_labels(header, width))
+        keep = [i for i, label in enumerate(labels)
+                if self.columns is None or label in self.columns]
+        return [labels[i] for i in keep], keep
+
+
+class LegacyExcelReader:
+    """Sheets of an .xls workbook, read one sheet at a time."""
+
+    def __init__(self, input_path: str, chunk_size: int,
+                 columns: set[str] | None = None) -> None:
+        try:
+            self._file = pd.ExcelFile(input_path)
+        except Exception as e:
+            raise ValueError(f"❌Erro ao ler arquivo de entrada: {e}")
+        self.chunk_size = chunk_size
+        self.columns = columns or None
+
+    def __enter__(self) -> "LegacyExcelReader":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._file.close()
+
+    @property
+    def sheet_names(self) -> list[str]:
+        return [str(name) for name in self._file.sheet_names]
+
+    def sheet_rows(self, sheet: str) -> int | None:
+        return None
+
+    def sheet_chunks(self, sheet: str):
+        read = partial(self._file.parse, sheet, dtype=str,
+                       keep_default_na=False)
+        try:
+            if self.columns:
+                df = read(usecols=column_positions(
+                    read(nrows=0).columns, self.columns))
+            else:
+                df = read()
+        except Exception as e:
+            raise ValueError(f"❌Erro ao ler arquivo de entrada: {e}")
+        df.columns = normalize_columns(df.columns)
+        for start in range(0, max(1, len(df)), self.chunk_size):
+            yield df.iloc[start:start + self.chunk_size]
+
+
+def open_workbook(input_path: str, chunk_size: int,
+                  columns: set[str] | None = None):
+    if input_path.lower().endswith(EXCEL_STREAMING_EXTENSIONS):
+        return ExcelChunkReader(input_path, chunk_size, columns)
+    if input_path.lower().endswith(".xls"):
+        return LegacyExcelReader(input_path, chunk_size, columns)
+    raise ValueError(
+        "❌A seleção de abas só vale para planilhas do Excel "
+        "(.xlsx, .xlsm ou .xls).")
+
+
+def parse_sheets(text: str) -> list[str]:
+    return [name.strip() for name in text.split(",") if name.strip()]
+
+
+def select_sheets(available: list[str], wanted: list[str]) -> list[str]:
+    """Sheets in workbook order; "*" selects every sheet.
+
+    Names are compared after removing spaces and ignoring case.
+    """
+    if ALL_SHEETS in wanted:
+        return list(available)
+    names = {normalize_column(name): name for name in available}
+    missing = [name for name in wanted if normalize_column(name) not in names]
+    if missing:
+        raise ValueError(
+            f"❌Abas não encontradas na planilha: {', '.join(missing)}\n"
+            f"Abas disponíveis: {', '.join(available)}")
+    selected = {names[normalize_column(name)] for name in wanted}
+    return [name for name in available if name in selected]
+
+
+def iter_excel_chunks(input_path: str, chunk_size: int):
+    with ExcelChunkReader(input_path, chunk_size) as chunks:
+        yield from chunks
+
+
+def _chunk_frame(chunk: list[list[str]], columns: list[str]) -> pd.DataFrame:
+    width = len(columns)
+    data = [values + [""] * (width - len(values)) for values in chunk]
+    return pd.DataFrame(data, columns=columns, dtype=object)
+
+
+class DelimitedChunkReader:
+    def __init__(self, input_path: str, chunk_size: int,
+                 delimiter: str | None = None,
+                 encoding: str = DEFAULT_ENCODING,
+                 columns: set[str] | None = None) -> None:
+        self.input_path = input_path
+        self.chunk_size = chunk_size
+        self.delimiter = delimiter
+        self.encoding = encoding
+        self.columns = columns
+        try:
+            self.total_rows = max(0, count_lines(input_path) - 1)
+            self._chunks = read_delimited(
+                input_path, delimiter, encoding, columns,
+                chunksize=chunk_size)
+        except Exception as e:
+            raise ValueError(f"❌Erro ao ler arquivo de entrada: {e}")
+
+    def __enter__(self) -> "DelimitedChunkReader":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._chunks.close()
+
+    def __iter__(self):
+        emitted = False
+        while True:
+            try:
+                chunk = next(self._chunks)
+            except StopIteration:
+                break
+            except Exception as e:
+                raise ValueError(f"❌Erro ao ler arquivo de entrada: {e}")
+            chunk.columns = normalize_columns(chunk.columns)
+            emitted = True
+            yield chunk
+        if not emitted:
+            empty = read_delimited(
+                self.input_path, self.delimiter, self.encoding,
+                self.columns, nrows=0)
+            empty.columns = normalize_columns(empty.columns)
+            yield empty
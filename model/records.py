@@ -0,0 +1,168 @@
+import datetime
+import re
+import numpy as np
+import pandas as pd
+import utils.formatters as formatter
+
+DETAIL = "detalhe"
+HEADER = "header"
+TRAILER = "trailer"
+RECORD_TYPES = {
+    "": DETAIL, "d": DETAIL, "detalhe": DETAIL, "detail": DETAIL,
+    "h": HEADER, "header": HEADER, "cabecalho": HEADER, "cabeçalho": HEADER,
+    "t": TRAILER, "trailer": TRAILER, "rodape": TRAILER, "rodapé": TRAILER,
+}
+OPTIONAL_COLUMNS = ["registro", "valor"]
+
+CONSTANT = ""
+SEQUENCE = "sequencial"
+DATE = "data"
+COUNT = "quantidade"
+TOTAL = "total"
+SUM = "soma"
+EXPRESSIONS = (SEQUENCE, DATE, COUNT, TOTAL, SUM)
+AGGREGATES = (COUNT, TOTAL, SUM)
+DATE_FORMAT = "%d%m%Y"
+
+EXPRESSION_PATTERN = re.compile(r"=\s*(\w+)\s*(?:\((.*)\))?\s*$")
+
+
+class FieldValue:
+    """Value of a field that is not read from the input.
+
+    Either a constant or an expression: =sequencial, =data(%d%m%y),
+    =quantidade, =total and =soma(campo).
+    """
+    __slots__ = ("kind", "argument", "first")
+
+    def __init__(self, kind: str, argument: str = "") -> None:
+        self.kind = kind
+        self.argument = argument
+        self.first = 1
+
+    def column(self, count: int, start: int = 0) -> pd.Series:
+        if self.kind == SEQUENCE:
+            first = self.first + start
+            return pd.Series(np.arange(first, first + count).astype(str),
+                             dtype=object)
+        return pd.Series([self.resolve()] * count, dtype=object)
+
+    def resolve(self, totals: "Totals | None" = None,
+                sequence: int = 1) -> str:
+        if self.kind == CONSTANT:
+            return self.argument
+        if self.kind == DATE:
+            return datetime.date.today().strftime(
+                self.argument or DATE_FORMAT)
+        if self.kind == SEQUENCE:
+            return str(sequence)
+        if self.kind == COUNT:
+            return str(totals.count)
+        if self.kind == TOTAL:
+            return str(totals.records)
+        return str(totals.sums[self.argument])
+
+
+def parse_value(text) -> FieldValue | None:
+    text = "" if text is None else str(text)
+    if not text:
+        return None
+    if not text.startswith("="):
+        return FieldValue(CONSTANT, text)
+    match = EXPRESSION_PATTERN.match(text)
+    if match is None or match.group(1).lower() not in EXPRESSIONS:
+        raise ValueError(text)
+    kind = match.group(1).lower()
+    argument = (match.group(2) or "").strip()
+    if kind == SUM:
+        argument = argument.lower()
+        if not argument:
+            raise ValueError(text)
+    return FieldValue(kind, argument)
+
+
+def parse_record_type(x: str, default: str = DETAIL) -> str:
+    if x is None:
+        return default
+    return RECORD_TYPES.get(str(x).strip().lower(), default)
+
+
+def verify_registro(row: pd.Series, i: int) -> str | None:
+    value = row.get("registro", "")
+    if str(value).strip().lower() not in RECORD_TYPES:
+        return (f"Linha {i+1}: 'registro' deve ser header, detalhe ou "
+                f"trailer (recebido '{value}').")
+    return None
+
+
+def verify_valor(row: pd.Series, i: int) -> str | None:
+    value = row.get("valor", "")
+    try:
+        parsed = parse_value(value)
+    except ValueError:
+        return (f"Linha {i+1}: 'valor' inválido '{value}'. Use um texto fixo "
+                f"ou ={', ='.join(EXPRESSIONS[:-1])}, =soma(campo).")
+    if parsed is None or parsed.kind not in AGGREGATES:
+        return None
+    if parse_record_type(row.get("registro")) != TRAILER:
+        return (f"Linha {i+1}: '{value}' só pode ser usado em campos do "
+                "trailer.")
+    return None
+
+
+def verify_record_fields(df: pd.DataFrame) -> list[str]:
+    errors = []
+    details = set(df.loc[df["registro"] == DETAIL, "campo"])
+    for i, row in df.iterrows():
+        try:
+            parsed = parse_value(row["valor"])
+        except ValueError:
+            continue
+        if parsed is not None and parsed.kind == SUM and (
+                parsed.argument not in details):
+            errors.append(
+                f"Linha {i+2}: '{row['valor']}' usa o campo "
+                f"'{parsed.argument}', que não existe no detalhe")
+    if (df["registro"] != DETAIL).any() and not (
+            df["registro"] == DETAIL).any():
+        errors.append("o layout precisa de pelo menos um campo de detalhe")
+    return errors
+
+
+class Totals:
+    """Aggregates of the detail records, accumulated chunk by chunk."""
+
+    def __init__(self, header: bool, sum_specs: list) -> None:
+        self.header = int(header)
+        self.count = 0
+        self.sums = {spec.name: 0 for spec in sum_specs}
+        self.specs = sum_specs
+
+    @property
+    def records(self) -> int:
+        return self.header + self.count + 1
+
+    def add(self, values: dict[str, pd.Series], count: int) -> None:
+        self.count += count
+        for spec in self.specs:
+            self.sums[spec.name] += self._sum(spec, values[spec.name])
+
+    def _sum(self, spec, values: pd.Series) -> int:
+        if spec.null_char != "":
+            values = values[values != spec.null_char]
+        formatted, errors = formatter.run_column_pipeline(
+            values, spec.column_formatters)
+        if errors:
+            formatted = formatted.drop(list(errors))
+        codes, uniques = pd.factorize(formatted, use_na_sentinel=False)
+        counts = np.bincount(codes, minlength=len(uniques))
+        total = 0
+        for unique, times in zip(uniques, counts.tolist()):
+            text = str(unique).strip()
+            try:
+                total += int(text or "0") * times
+            except ValueError:
+                raise ValueError(
+                    f"❌O campo '{spec.name}' tem o valor '{unique}', que não "
+                    "é inteiro e não pode ser somado. Use a formatação 3.")
+        return total
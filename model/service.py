@@ -0,0 +1,386 @@
+import asyncio
+import json
+import logging
+import os
+import shutil
+import signal
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import parse_qs, urlsplit
+from model import batch
+from model.writer import ENCODING
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+STREAM_BYTES = 1 << 16
+LATENCY_WINDOW = 1000
+DEFAULT_FILENAME = "entrada.csv"
+
+log = logging.getLogger(__name__)
+
+STATUS_TEXT = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    422: "Unprocessable Entity",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        self.status = status
+        self.message = message
+        super().__init__(message)
+
+
+class ServiceMetrics:
+    def __init__(self) -> None:
+        self.started = time.monotonic()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.bytes_out = 0
+        self.convert_seconds = 0.0
+        self.latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def to_dict(self) -> dict:
+        uptime = time.monotonic() - self.started
+        latencies = sorted(self.latencies)
+        finished = self.completed + self.failed
+        return {
+            "uptime_seconds": round(uptime, 3),
+            "queue_depth": self.queued,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "latency_seconds": {
+                "avg": _round(sum(latencies) / len(latencies))
+                if latencies else None,
+                "p50": _percentile(latencies, 0.50),
+                "p95": _percentile(latencies, 0.95),
+                "max": _round(latencies[-1]) if latencies else None,
+            },
+            "convert_seconds_avg": _round(self.convert_seconds / finished)
+            if finished else None,
+            "throughput": {
+                "jobs_per_second": _round(self.completed / uptime),
+                "bytes_per_second": _round(self.bytes_out / uptime),
+            },
+            "bytes_out": self.bytes_out,
+        }
+
+
+def _round(value: float) -> float:
+    return round(value, 4)
+
+
+def _percentile(values: list[float], fraction: float) -> float | None:
+    if not values:
+        return None
+    return _round(values[min(len(values) - 1, int(fraction * len(values)))])
+
+
+def resolve_inside(root: str, path: str) -> str | None:
+    """Real path of path under root; None if it points outside root."""
+    path = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, path]) != root:
+        return None
+    return path
+
+
+def convert_job(layout: str, input_path: str, output_path: str,
+                settings: dict) -> tuple[list[str], str, float]:
+    """Runs one conversion in a pool worker: (paths, error, seconds)."""
+    from model.model import Model
+
+    model = Model()
+    for name, value in settings.items():
+        setattr(model, name, value)
+    started = time.perf_counter()
+    try:
+        model.convert_file(layout, input_path, output_path)
+    except Exception as e:
+        return [], f"{e}", time.perf_counter() - started
+    return model.written_paths, "", time.perf_counter() - started
+
+
+class ConversionService:
+    """Local HTTP service running conversions on a warm worker pool.
+
+    POST /convert?layout=<layout.csv>[&input=<path>|&filename=<name>]
+    converts the input path, or the uploaded request body, and answers with
+    the positional TXT. GET /metrics reports queue depth, latency and
+    throughput.
+
+    Layouts must be inside layout_dir and ?input= paths inside input_dir;
+    without an input_dir, ?input= is refused.
+    """
+
+    def __init__(self, workers: int = 2, max_queue: int = 16,
+                 layout_dir: str | None = None,
+                 settings: dict | None = None,
+                 preload: list[str] | None = None,
+                 input_dir: str | None = None) -> None:
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.layout_dir = os.path.realpath(layout_dir or os.getcwd())
+        self.input_dir = os.path.realpath(input_dir) if input_dir else None
+        self.settings = {"error_report": False, **(settings or {})}
+        self.metrics = ServiceMetrics()
+        self._preload = [os.path.join(self.layout_dir, path)
+                         for path in preload or []]
+        self._layouts: dict[str, list[dict]] = {}
+        self._slots: asyncio.Semaphore | None = None
+        self._executor = None
+        self._stopped: asyncio.Event | None = None
+
+    async def serve(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                    socket_path: str | None = None, ready=None) -> None:
+        layouts, failed = batch.load_layouts(self._preload)
+        if failed:
+            raise ValueError("\n".join(failed.values()))
+        self._layouts = layouts
+        self._slots = asyncio.Semaphore(self.workers)
+        self._stopped = asyncio.Event()
+        # clean: a worker forked mid-request would keep client sockets open
+        self._executor = batch.worker_pool(self.workers, layouts, clean=True)
+        loop = asyncio.get_running_loop()
+        if (hasattr(signal, "SIGTERM") and os.name != "nt" and
+                threading.current_thread() is threading.main_thread()):
+            loop.add_signal_handler(signal.SIGTERM, self.stop)
+        try:
+            if socket_path:
+                server = await asyncio.start_unix_server(
+                    self._handle, path=socket_path)
+            else:
+                server = await asyncio.start_server(
+                    self._handle, host, port)
+            async with server:
+                if ready is not None:
+                    ready(server)
+                await self._stopped.wait()
+        finally:
+            self._executor.shutdown(cancel_futures=True)
+            if socket_path and os.path.exists(socket_path):
+                os.remove(socket_path)
+
+    def stop(self) -> None:
+        if self._stopped is not None:
+            self._stopped.set()
+
+    async def _handle(self, reader: asyncio.StreamReader,
+                      writer: asyncio.StreamWriter) -> None:
+        try:
+            method, target, headers = await self._read_head(reader)
+            url = urlsplit(target)
+            query = {key: values[-1]
+                     for key, values in parse_qs(url.query).items()}
+            if url.path == "/metrics":
+                self._check_method(method, "GET")
+                await self._send(writer, 200, json.dumps(
+                    self.metrics.to_dict()).encode(), "application/json")
+            elif url.path == "/convert":
+                self._check_method(method, "POST")
+                await self._convert(reader, writer, headers, query)
+            else:
+                raise HttpError(404, "❌Caminho não encontrado.")
+        except HttpError as e:
+            await self._send_error(writer, e)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception:
+            log.exception("Erro inesperado ao atender a requisição")
+            await self._send_error(
+                writer, HttpError(500, "❌Erro interno do serviço."))
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _read_head(self, reader: asyncio.StreamReader) -> tuple[
+            str, str, dict[str, str]]:
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.LimitOverrunError:
+            raise HttpError(400, "❌Cabeçalho da requisição muito grande.")
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, _ = lines[0].split(" ", 2)
+        except ValueError:
+            raise HttpError(400, "❌Requisição inválida.")
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        return method.upper(), target, headers
+
+    def _check_method(self, method: str, expected: str) -> None:
+        if method != expected:
+            raise HttpError(405, f"❌Use o método {expected}.")
+
+    async def _convert(self, reader: asyncio.StreamReader,
+                       writer: asyncio.StreamWriter, headers: dict,
+                       query: dict) -> None:
+        received = time.monotonic()
+        if not query.get("layout"):
+            raise HttpError(400, "❌Informe o layout (?layout=...).")
+        layout = resolve_inside(self.layout_dir, query["layout"])
+        if layout is None:
+            raise HttpError(
+                400, "❌O layout precisa estar dentro da pasta de layouts.")
+        if not os.path.isfile(layout):
+            raise HttpError(
+                400, f"❌Layout não encontrado: {query['layout']}")
+        input_path = None
+        if query.get("input"):
+            if self.input_dir is None:
+                raise HttpError(
+                    400, "❌?input= está desabilitado; inicie o serviço "
+                         "com --input-dir.")
+            input_path = resolve_inside(self.input_dir, query["input"])
+            if input_path is None:
+                raise HttpError(
+                    400, "❌A entrada precisa estar dentro da pasta de "
+                         "entradas.")
+        settings = dict(self.settings)
+        if query.get("delimiter"):
+            settings["input_delimiter"] = query["delimiter"]
+        if query.get("encoding"):
+            settings["input_encoding"] = query["encoding"]
+
+        workdir = tempfile.mkdtemp(prefix="conversor-")
+        try:
+            # the queue slot is taken before the upload is read
+            self._reserve()
+            if input_path is None:
+                try:
+                    input_path = await self._receive(
+                        reader, headers, workdir,
+                        query.get("filename", DEFAULT_FILENAME))
+                except BaseException:
+                    self.metrics.queued -= 1
+                    raise
+            paths, error, seconds = await self._run(
+                layout, input_path, os.path.join(workdir, "saida.txt"),
+                settings)
+            self.metrics.convert_seconds += seconds
+            try:
+                if error:
+                    self.metrics.failed += 1
+                    raise HttpError(422, error)
+                size = sum(os.path.getsize(path) for path in paths)
+                try:
+                    await self._send_files(writer, paths, size)
+                except ConnectionError:
+                    self.metrics.failed += 1
+                    raise
+                self.metrics.completed += 1
+                self.metrics.bytes_out += size
+            finally:
+                self.metrics.latencies.append(time.monotonic() - received)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    async def _receive(self, reader: asyncio.StreamReader, headers: dict,
+                       workdir: str, filename: str) -> str:
+        if "content-length" not in headers:
+            raise HttpError(
+                411, "❌Envie o arquivo de entrada no corpo da requisição "
+                     "(com Content-Length) ou informe ?input=.")
+        try:
+            remaining = int(headers["content-length"])
+        except ValueError:
+            raise HttpError(400, "❌Content-Length inválido.")
+        extension = os.path.splitext(os.path.basename(filename))[1].lower()
+        path = os.path.join(workdir, "entrada" + extension)
+        with open(path, "wb") as f:
+            while remaining > 0:
+                block = await reader.readexactly(
+                    min(STREAM_BYTES, remaining))
+                f.write(block)
+                remaining -= len(block)
+        return path
+
+    def _reserve(self) -> None:
+        if self.metrics.queued + self.metrics.running >= (
+                self.workers + self.max_queue):
+            self.metrics.rejected += 1
+            raise HttpError(503, "❌Fila de conversões cheia; tente de novo.")
+        self.metrics.queued += 1
+
+    async def _run(self, layout: str, input_path: str, output_path: str,
+                   settings: dict) -> tuple[list[str], str, float]:
+        """Runs a job reserved with _reserve once a worker is free."""
+        try:
+            await self._slots.acquire()
+        finally:
+            self.metrics.queued -= 1
+        self.metrics.running += 1
+        executor = self._executor
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                executor, convert_job, layout, input_path,
+                output_path, settings)
+        except BrokenProcessPool:
+            # a worker died (killed, out of memory); later jobs get a new pool
+            if self._executor is executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = batch.worker_pool(
+                    self.workers, self._layouts, clean=True)
+            self.metrics.failed += 1
+            raise HttpError(
+                500, "❌O processo de conversão foi encerrado; tente de novo.")
+        finally:
+            self.metrics.running -= 1
+            self._slots.release()
+
+    async def _send_files(self, writer: asyncio.StreamWriter,
+                          paths: list[str], size: int) -> None:
+        writer.write(self._head(
+            200, size, f"text/plain; charset={ENCODING.lower()}"))
+        try:
+            for path in paths:
+                with open(path, "rb") as f:
+                    for block in iter(lambda: f.read(STREAM_BYTES), b""):
+                        writer.write(block)
+                        await writer.drain()
+            await writer.drain()
+        except Exception as e:
+            # the 200 and its length are out: an error response would land
+            # inside the body, so the client only sees a cut connection
+            if not isinstance(e, ConnectionError):
+                log.exception("Erro ao enviar o TXT convertido")
+            writer.transport.abort()
+            raise ConnectionAbortedError() from e
+
+    async def _send_error(self, writer: asyncio.StreamWriter,
+                          error: HttpError) -> None:
+        try:
+            await self._send(writer, error.status, error.message.encode(
+                "utf-8"), "text/plain; charset=utf-8")
+        except ConnectionError:
+            pass
+
+    async def _send(self, writer: asyncio.StreamWriter, status: int,
+                    body: bytes, content_type: str) -> None:
+        writer.write(self._head(status, len(body), content_type) + body)
+        await writer.drain()
+
+    def _head(self, status: int, length: int, content_type: str) -> bytes:
+        return (f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {length}\r\n"
+                "Connection: close\r\n\r\n").encode("latin-1")
@@ -0,0 +1,401 @@
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import shutil
+import struct
+import sys
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+from model import batch, reader, writer
+from model.errors import errors_path
+
+WATCH_KEYS = {
+    "pasta": "folder", "folder": "folder", "entrada": "folder",
+    "layout": "layout",
+    "saida": "output", "saída": "output", "output": "output",
+    "processados": "archive", "archive": "archive",
+    "erros": "errors", "errors": "errors",
+    "arquivos": "num_files", "num_files": "num_files",
+}
+INPUT_EXTENSIONS = reader.STREAMING_EXTENSIONS + (".xls",)
+STATE_FILE = ".conversor-watch.json"
+ERROR_SUFFIX = ".erro.txt"
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+EVENT = struct.Struct("iIII")
+
+
+class WatchFolder:
+    __slots__ = ("folder", "layout", "output", "archive", "errors",
+                 "num_files")
+
+    def __init__(self, folder: str, layout: str, output: str = "",
+                 archive: str = "", errors: str = "",
+                 num_files: str = "1") -> None:
+        self.folder = folder
+        self.layout = layout
+        self.output = output or os.path.join(folder, "saida")
+        self.archive = archive or os.path.join(folder, "processados")
+        self.errors = errors or os.path.join(folder, "erros")
+        self.num_files = num_files or "1"
+
+
+def load_watch_config(path: str) -> list[WatchFolder]:
+    try:
+        rows = batch.read_manifest_rows(path)
+    except Exception as e:
+        raise ValueError(f"❌Erro ao ler configuração: {e}")
+
+    base = os.path.dirname(os.path.abspath(path))
+    folders = []
+    errors = []
+    for i, row in enumerate(rows, start=1):
+        fields = {}
+        for key, value in row.items():
+            name = WATCH_KEYS.get(str(key).strip().lower())
+            if name and value is not None and str(value).strip():
+                fields[name] = str(value).strip()
+        missing = [key for key in ("folder", "layout") if key not in fields]
+        if missing:
+            errors.append(f"pasta {i}: faltando {', '.join(missing)}")
+            continue
+        for key in ("folder", "layout", "output", "archive", "errors"):
+            if key in fields:
+                fields[key] = os.path.normpath(
+                    os.path.join(base, fields[key]))
+        folders.append(WatchFolder(**fields))
+    errors.extend(check_folders(folders))
+    if errors:
+        raise ValueError(
+            "❌Foram encontrados erros na configuração:\n" +
+            "\n".join(f"- {e}" for e in errors)
+        )
+    return folders
+
+
+def check_folders(folders: list[WatchFolder]) -> list[str]:
+    """Configurations that would overwrite outputs or convert them again."""
+    errors = []
+    watched = {os.path.realpath(folder.folder) for folder in folders}
+    if len(watched) < len(folders):
+        errors.append("a mesma pasta aparece mais de uma vez")
+    outputs = [os.path.realpath(folder.output) for folder in folders]
+    if len(set(outputs)) < len(outputs):
+        errors.append("a mesma pasta de saída aparece mais de uma vez")
+    for folder in folders:
+        for name, path in (("saída", folder.output),
+                           ("processados", folder.archive),
+                           ("erros", folder.errors)):
+            if os.path.realpath(path) in watched:
+                errors.append(
+                    f"{folder.folder}: a pasta de {name} não pode ser uma "
+                    "pasta monitorada")
+    return errors
+
+
+def output_path(folder: WatchFolder, name: str) -> str:
+    """TXT of an input: a.csv -> a_csv.txt, so a.csv and a.xlsx differ."""
+    stem, extension = os.path.splitext(name)
+    return os.path.join(folder.output, f"{stem}_{extension[1:].lower()}.txt")
+
+
+def convert_job(layout: str, path: str, output: str, num_files: str,
+                settings: dict) -> str:
+    """Runs one conversion in a pool worker; returns the error, if any."""
+    from model.model import Model
+
+    model = Model()
+    model.instrument = True
+    for key, value in settings.items():
+        setattr(model, key, value)
+    try:
+        model.convert_file(layout, path, output, num_files)
+    except Exception as e:
+        return f"{e}"
+    return ""
+
+
+class PollingSource:
+    """Wakes up every interval; readiness comes from stable file stats."""
+
+    def wait(self, timeout: float) -> set[str]:
+        time.sleep(timeout)
+        return set()
+
+    def close(self) -> None:
+        pass
+
+
+class InotifySource:
+    """Reports files closed after writing or moved into the folders."""
+
+    def __init__(self, folders: list[str]) -> None:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6",
+                           use_errno=True)
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        self._folders = {}
+        for folder in folders:
+            wd = libc.inotify_add_watch(
+                self._fd, os.fsencode(folder), IN_CLOSE_WRITE | IN_MOVED_TO)
+            if wd < 0:
+                os.close(self._fd)
+                raise OSError(ctypes.get_errno(), "inotify_add_watch", folder)
+            self._folders[wd] = folder
+
+    def wait(self, timeout: float) -> set[str]:
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        data = os.read(self._fd, 1 << 16)
+        closed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, size = EVENT.unpack_from(data, offset)
+            offset += EVENT.size
+            name = data[offset:offset + size].rstrip(b"\0")
+            offset += size
+            if not mask & IN_Q_OVERFLOW and wd in self._folders:
+                closed.add(os.path.join(self._folders[wd],
+                                        os.fsdecode(name)))
+        return closed
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+def open_source(folders: list[str], polling: bool = False):
+    if polling or not sys.platform.startswith("linux"):
+        return PollingSource()
+    try:
+        return InotifySource(folders)
+    except (OSError, AttributeError):
+        return PollingSource()
+
+
+class WatchState:
+    """Journal of converted files, so a restart does not convert them again.
+
+    A file is recorded as done, by size and mtime, before it is moved out
+    of the watched folder; a done file still in the folder after a restart
+    is only archived.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path, encoding="utf-8") as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def is_done(self, name: str, stamp: list[int]) -> str | None:
+        entry = self._entries.get(name)
+        if entry is None or entry["stamp"] != stamp:
+            return None
+        return entry["status"]
+
+    def mark(self, name: str, stamp: list[int], status: str) -> None:
+        with self._lock:
+            self._entries[name] = {"stamp": stamp, "status": status}
+            self._save()
+
+    def forget(self, name: str) -> None:
+        with self._lock:
+            if self._entries.pop(name, None) is not None:
+                self._save()
+
+    def _save(self) -> None:
+        with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, ensure_ascii=False)
+        os.replace(self.path + ".tmp", self.path)
+
+
+def _stamp(path: str) -> list[int] | None:
+    try:
+        info = os.stat(path)
+    except OSError:
+        return None
+    return [info.st_size, info.st_mtime_ns]
+
+
+def _is_input(name: str) -> bool:
+    return (not name.startswith((".", "~$")) and
+            name.lower().endswith(INPUT_EXTENSIONS))
+
+
+def _free_path(folder: str, name: str) -> str:
+    path = os.path.join(folder, name)
+    if not os.path.exists(path):
+        return path
+    stem, extension = os.path.splitext(name)
+    return os.path.join(
+        folder, f"{stem}.{time.strftime('%Y%m%d%H%M%S')}{extension}")
+
+
+class FolderWatcher:
+    """Converts files dropped in the watched folders as they are finished.
+
+    Conversions run on a process pool whose workers keep the layouts
+    parsed, so CPU-bound conversions of several files run in parallel.
+    """
+
+    def __init__(self, folders: list[WatchFolder], jobs: int = 2,
+                 interval: float = 2.0, settle: float = 1.0,
+                 polling: bool = False, settings: dict | None = None,
+                 on_result=None) -> None:
+        self.folders = {folder.folder: folder for folder in folders}
+        self.jobs = max(1, jobs)
+        self.interval = interval
+        self.settle = settle
+        self.polling = polling
+        self.settings = settings or {}
+        self.on_result = on_result
+        self._seen: dict[str, tuple[list[int], float]] = {}
+        self._running: set[str] = set()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._states: dict[str, WatchState] = {}
+        self._executor = None
+        self._layouts: dict[str, list[dict]] = {}
+        self._broken = False
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def run(self) -> None:
+        errors = check_folders(list(self.folders.values()))
+        if errors:
+            raise ValueError(
+                "❌Foram encontrados erros na configuração:\n" +
+                "\n".join(f"- {e}" for e in errors))
+        for folder in self.folders.values():
+            for path in (folder.folder, folder.output, folder.archive,
+                         folder.errors):
+                os.makedirs(path, exist_ok=True)
+            self._states[folder.folder] = WatchState(
+                os.path.join(folder.output, STATE_FILE))
+        self._layouts, failed = batch.load_layouts(
+            folder.layout for folder in self.folders.values())
+        if failed:
+            raise ValueError("\n".join(failed.values()))
+
+        source = open_source(list(self.folders), self.polling)
+        self._executor = batch.worker_pool(self.jobs, self._layouts)
+        try:
+            closed: set[str] = set()
+            while not self._stopped.is_set():
+                for folder, path in self._ready(closed):
+                    self._submit(folder, path)
+                closed = source.wait(
+                    self.settle if self._seen else self.interval)
+        finally:
+            source.close()
+            self._executor.shutdown()
+
+    def _ready(self, closed: set[str]):
+        now = time.monotonic()
+        seen_now = {}
+        for folder in self.folders.values():
+            try:
+                names = os.listdir(folder.folder)
+            except OSError:
+                continue
+            for name in sorted(names):
+                path = os.path.join(folder.folder, name)
+                if not _is_input(name) or not os.path.isfile(path):
+                    continue
+                with self._lock:
+                    if path in self._running:
+                        continue
+                stamp = _stamp(path)
+                if stamp is None:
+                    continue
+                seen = self._seen.get(path)
+                if path in closed or (
+                        seen is not None and seen[0] == stamp and
+                        now - seen[1] >= self.settle):
+                    yield folder, path
+                elif seen is None or seen[0] != stamp:
+                    seen_now[path] = (stamp, now)
+                else:
+                    seen_now[path] = seen
+        self._seen = seen_now
+
+    def _submit(self, folder: WatchFolder, path: str) -> None:
+        name = os.path.basename(path)
+        output = output_path(folder, name)
+        stamp = _stamp(path)
+        status = self._states[folder.folder].is_done(name, stamp)
+        if status is not None:
+            # converted before a restart; only the move was left
+            self._done(folder, path, output, stamp, time.perf_counter(),
+                       status, "")
+            return
+        if self._broken:
+            # a worker died; the pool has to be replaced before reuse
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = batch.worker_pool(self.jobs, self._layouts)
+            self._broken = False
+        with self._lock:
+            self._running.add(path)
+        started = time.perf_counter()
+        future = self._executor.submit(
+            convert_job, folder.layout, path, output, folder.num_files,
+            self.settings)
+        future.add_done_callback(
+            lambda done: self._converted(
+                folder, path, output, stamp, started, done))
+
+    def _converted(self, folder: WatchFolder, path: str, output: str,
+                   stamp: list[int], started: float, future) -> None:
+        try:
+            error = future.result()
+        except BrokenProcessPool as e:
+            self._broken = True
+            error = f"❌O processo de conversão foi encerrado: {e}"
+        except Exception as e:
+            error = f"{e}"
+        status = "erro" if error else "ok"
+        self._states[folder.folder].mark(
+            os.path.basename(path), stamp, status)
+        self._done(folder, path, output, stamp, started, status, error)
+
+    def _done(self, folder: WatchFolder, path: str, output: str,
+              stamp: list[int], started: float, status: str,
+              error: str) -> None:
+        try:
+            self._finish(folder, path, output, status, error)
+            self._states[folder.folder].forget(os.path.basename(path))
+        except Exception as e:
+            status, error = "erro", f"{e}"
+        finally:
+            with self._lock:
+                self._running.discard(path)
+        if self.on_result:
+            self.on_result(path, status, time.perf_counter() - started,
+                           error)
+
+    def _finish(self, folder: WatchFolder, path: str, output: str,
+                status: str, error: str) -> None:
+        name = os.path.basename(path)
+        target = folder.archive if status == "ok" else folder.errors
+        reports = [(writer.report_path(output), ".report.json")]
+        if status != "ok":
+            reports.append((errors_path(output), ".errors.csv"))
+            if error:
+                with open(_free_path(target, name + ERROR_SUFFIX), "w",
+                          encoding="utf-8") as f:
+                    f.write(error + "\n")
+        for report, suffix in reports:
+            if os.path.exists(report):
+                shutil.move(report, _free_path(target, name + suffix))
+        if os.path.exists(path):
+            shutil.move(path, _free_path(target, name))
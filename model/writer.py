@@ -0,0 +1,292 @@
+import csv
+import os
+import re
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+ENCODING = "CP1252"
+NEWLINE = os.linesep.encode()
+SHEET_PART_SEPARATOR = "-"
+
+
+def part_path(output_path: str, index: int, separator: str = "") -> str:
+    return f"{output_path.replace('.txt', '')}{separator}{index}.txt"
+
+
+def sheet_paths(output_path: str, sheets: list[str]) -> list[str]:
+    """One output per sheet: saida.txt -> saida_<aba>.txt.
+
+    Written with SHEET_PART_SEPARATOR before the part index, as
+    saida_<aba>-1.txt, saida_<aba>-2.txt, ..., so a sheet name ending in a
+    digit cannot be confused with another sheet's part.
+    """
+    stem = output_path.replace('.txt', '')
+    paths = []
+    for sheet in sheets:
+        name = re.sub(r"[^\w-]+", "_", sheet).strip("_") or "aba"
+        path = f"{stem}_{name}.txt"
+        count = 2
+        while path in paths:
+            path = f"{stem}_{name}_{count}.txt"
+            count += 1
+        paths.append(path)
+    return paths
+
+
+def report_path(output_path: str) -> str:
+    return f"{output_path.replace('.txt', '')}.report.json"
+
+
+def part_sizes(total: int, number_of_files: int) -> list[int]:
+    size = total // number_of_files
+    remainder = total % number_of_files
+    return [size + (1 if i < remainder else 0)
+            for i in range(number_of_files)]
+
+
+def write_parts(output_path: str, records: list[str],
+                number_of_files: int = 1, workers: int = 1) -> list[str]:
+    """Writes the parts of an in-memory conversion, `workers` at a time.
+
+    Only the .xls path holds every record before writing; streamed inputs
+    go through TextWriter, which fills the parts in order as chunks arrive.
+    """
+    paths = [part_path(output_path, i)
+             for i in range(1, number_of_files + 1)]
+    bounds = []
+    start = 0
+    for size in part_sizes(len(records), number_of_files):
+        bounds.append((start, start + size))
+        start += size
+
+    def write_part(path: str, start: int, end: int) -> None:
+        with open(path + ".tmp", "w", encoding=ENCODING) as f:
+            f.write("\n".join(records[start:end]))
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = [executor.submit(write_part, path, start, end)
+                       for path, (start, end) in zip(paths, bounds)]
+            for future in futures:
+                future.result()
+    except BaseException:
+        for path in paths:
+            if os.path.exists(path + ".tmp"):
+                os.remove(path + ".tmp")
+        raise
+    for path in paths:
+        os.replace(path + ".tmp", path)
+    return paths
+
+
+def write_table(output_path: str, frames, columns: list[str],
+                delimiter: str = ",") -> int:
+    rows = 0
+    try:
+        if output_path.lower().endswith((".xlsx", ".xlsm")):
+            from openpyxl import Workbook
+
+            workbook = Workbook(write_only=True)
+            sheet = workbook.create_sheet()
+            sheet.append(columns)
+            for frame in frames:
+                for row in frame.itertuples(index=False):
+                    sheet.append(list(row))
+                rows += len(frame)
+            workbook.save(output_path + ".tmp")
+        else:
+            with open(output_path + ".tmp", "w", encoding="utf-8-sig",
+                      newline="") as f:
+                csv.writer(f, delimiter=delimiter,
+                           lineterminator="\n").writerow(columns)
+                for frame in frames:
+                    frame.to_csv(f, sep=delimiter, header=False,
+                                 index=False, lineterminator="\n")
+                    rows += len(frame)
+    except BaseException:
+        if os.path.exists(output_path + ".tmp"):
+            os.remove(output_path + ".tmp")
+        raise
+    os.replace(output_path + ".tmp", output_path)
+    return rows
+
+
+class TextWriter:
+    encoding = ENCODING
+
+    def __init__(self, output_path: str, number_of_files: int = 1,
+                 total: int | None = None, max_bytes: int | None = None,
+                 max_records: int | None = None,
+                 part_separator: str = "") -> None:
+        self.output_path = output_path
+        self.part_separator = part_separator
+        self.rolling = bool(max_bytes or max_records)
+        self.max_bytes = max_bytes
+        self.max_records = max_records
+        self.total = total
+        self.paths = [] if self.rolling else [
+            part_path(output_path, i, part_separator)
+            for i in range(1, number_of_files + 1)]
+        self._opened: list[str] = []
+        self._spools: list[str] = []
+        self._file = None
+        self._reset(total)
+
+    def _reset(self, total: int | None) -> None:
+        self.records = 0
+        self._part = -1
+        self._counts: list[int] = []
+        self._bytes = 0
+        self._lengths = array("I")
+        if self.rolling or len(self.paths) == 1:
+            self._sizes = None
+        elif total is None:
+            self._sizes = [float("inf")] * len(self.paths)
+        else:
+            self._sizes = part_sizes(total, len(self.paths))
+
+    def __enter__(self) -> "TextWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+
+    def write_records(self, records) -> None:
+        if isinstance(records, np.ndarray):
+            self.write_block(records)
+            return
+        for record in records:
+            data = record.encode(self.encoding)
+            if NEWLINE != b"\n":
+                data = data.replace(b"\n", NEWLINE)
+            self._write(data)
+
+    def write_block(self, block: np.ndarray) -> None:
+        """Writes fixed-width records laid out as [separator][record]."""
+        stride = block.shape[1]
+        width = stride - len(NEWLINE)
+        data = memoryview(np.ascontiguousarray(block)).cast("B")
+        done = 0
+        while done < len(block):
+            self._check_size(width)
+            while self._file is None or self._part_full(width):
+                self._next_part()
+            count = self._fits(width, len(block) - done)
+            skip = 0 if self._counts[-1] else len(NEWLINE)
+            self._file.write(data[done * stride + skip:
+                                  (done + count) * stride])
+            self._bytes += count * stride - skip
+            self._counts[-1] += count
+            self.records += count
+            if self._sizes is not None:
+                self._lengths.extend(array("I", [width]) * count)
+            done += count
+
+    def _fits(self, width: int, pending: int) -> int:
+        count = self._counts[-1]
+        if self.rolling:
+            if self.max_records:
+                pending = min(pending, self.max_records - count)
+            if self.max_bytes:
+                room = self.max_bytes - self._bytes
+                if not count:
+                    room += len(NEWLINE)
+                pending = min(pending, room // (width + len(NEWLINE)))
+            return pending
+        if self._sizes is None or self._part == len(self.paths) - 1:
+            return pending
+        return min(pending, self._sizes[self._part] - count)
+
+    def _check_size(self, size: int) -> None:
+        if self.max_bytes and size > self.max_bytes:
+            raise ValueError(
+                f"❌O registro {self.records + 1} tem {size} bytes, "
+                f"acima do limite de {self.max_bytes} bytes por arquivo.")
+
+    def _write(self, data: bytes) -> None:
+        self._check_size(len(data))
+        while self._file is None or self._part_full(len(data)):
+            self._next_part()
+        if self._counts[-1]:
+            self._file.write(NEWLINE)
+            self._bytes += len(NEWLINE)
+        self._file.write(data)
+        self._bytes += len(data)
+        self._counts[-1] += 1
+        self.records += 1
+        if self._sizes is not None:
+            self._lengths.append(len(data))
+
+    def _part_full(self, size: int) -> bool:
+        count = self._counts[-1]
+        if self.rolling:
+            if not count:
+                return False
+            if self.max_records and count >= self.max_records:
+                return True
+            return bool(self.max_bytes and
+                        self._bytes + len(NEWLINE) + size > self.max_bytes)
+        if self._sizes is None:
+            return False
+        return (count >= self._sizes[self._part]
+                and self._part < len(self.paths) - 1)
+
+    def _next_part(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        self._part += 1
+        self._counts.append(0)
+        self._bytes = 0
+        if self.rolling:
+            self.paths.append(part_path(
+                self.output_path, self._part + 1, self.part_separator))
+        path = self.paths[self._part] + ".tmp"
+        self._opened.append(path)
+        self._file = open(path, "wb")
+
+    def commit(self) -> None:
+        try:
+            if self._sizes is not None and self.records != self.total:
+                self._rebalance()
+            if self._file is None:
+                self._next_part()
+            while self._part < len(self.paths) - 1:
+                self._next_part()
+            self._file.close()
+        except BaseException:
+            self.abort()
+            raise
+        for path in self.paths:
+            os.replace(path + ".tmp", path)
+
+    def _rebalance(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        for path in self._opened:
+            os.replace(path, path + ".spool")
+            self._spools.append(path + ".spool")
+        self._opened = []
+        lengths, counts = self._lengths, self._counts
+        self._reset(self.records)
+
+        k = 0
+        for spool, count in zip(self._spools, counts):
+            with open(spool, "rb") as f:
+                for _ in range(count):
+                    self._write(f.read(lengths[k]))
+                    f.seek(len(NEWLINE), os.SEEK_CUR)
+                    k += 1
+            os.remove(spool)
+        self._spools = []
+
+    def abort(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        for path in self._opened + self._spools:
+            if os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,71 @@
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks import synthetic  # noqa: E402
+from model import parallel  # noqa: E402
+
+RECORD_LAYOUT = (
+    "Campo,Tamanho,Decimais,Alinhamento,Preenchimento,Obrigatorio,"
+    "Formatacao,Novo registro,Anular,Registro,Valor\n"
+    "Tipo,1,,E, ,N,,N,,header,0\n"
+    "Banco,3,,E, ,N,,N,,header,341\n"
+    "Seq,6,,D,0,N,,N,,header,=sequencial\n"
+    "Tipo,1,,E, ,N,,N,,,1\n"
+    "campo_1,10,,D,0,S,1,N,,,\n"
+    "campo_2,20,,E, ,N,2,N,,,\n"
+    "campo_3,15,2,D,0,N,3,N,,,\n"
+    "Seq,6,,D,0,N,,N,,d,=sequencial\n"
+    "Tipo,1,,E, ,N,,N,,trailer,9\n"
+    "Qtd,8,,D,0,N,,N,,trailer,=quantidade\n"
+    "Total,18,,D,0,N,,N,,trailer,=soma(campo_3)\n"
+    "Regs,6,,D,0,N,,N,,trailer,=total\n"
+    "Seq,6,,D,0,N,,N,,trailer,=sequencial\n"
+)
+
+
+@pytest.fixture
+def synthetic_files(tmp_path):
+    """A 30-field layout with line breaks and nulls, and a 500-row CSV."""
+    fields = synthetic.make_layout(30, seed=3, new_line_every=12,
+                                   null_ratio=0.3)
+    layout_path = str(tmp_path / "layout.csv")
+    input_path = str(tmp_path / "input.csv")
+    synthetic.write_layout(fields, layout_path)
+    synthetic.write_input(fields, 500, input_path, seed=3)
+    return layout_path, input_path
+
+
+@pytest.fixture
+def record_files(tmp_path):
+    """A layout with header and trailer records over a 300-row CSV."""
+    fields = synthetic.make_layout(6, seed=5)
+    layout_path = str(tmp_path / "layout_records.csv")
+    input_path = str(tmp_path / "input_records.csv")
+    with open(layout_path, "w", encoding="utf-8") as f:
+        f.write(RECORD_LAYOUT)
+    synthetic.write_input(fields, 300, input_path, seed=5)
+    return layout_path, input_path
+
+
+class CountingPool(ProcessPoolExecutor):
+    submitted = 0
+
+    def submit(self, *args, **kwargs):
+        CountingPool.submitted += 1
+        return super().submit(*args, **kwargs)
+
+
+@pytest.fixture
+def sharded(monkeypatch):
+    """Splits even the small test inputs into shards of 50 rows."""
+    monkeypatch.setattr(parallel, "MIN_SHARD_ROWS", 50)
+    monkeypatch.setattr(parallel, "cpu_count", lambda: 4)
+    monkeypatch.setattr(parallel, "ProcessPoolExecutor", CountingPool)
+    CountingPool.submitted = 0
+    return CountingPool
@@ -0,0 +1,83 @@
+import csv
+import json
+
+import pytest
+
+from model import batch
+
+
+@pytest.fixture
+def manifest(synthetic_files, tmp_path):
+    """Three jobs: a good one, one with a broken layout, one bad input."""
+    layout_path, input_path = synthetic_files
+    with open(tmp_path / "quebrado.csv", "w", encoding="utf-8") as f:
+        f.write("Campo,Tamanho\nCodigo,10\n")
+    with open(tmp_path / "ruim.csv", "w", encoding="utf-8") as f:
+        f.write("campo_0\n\n")
+    path = tmp_path / "lote.csv"
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("Entrada;Layout;Saída;Arquivos\n"
+                "input.csv;layout.csv;out/a.txt;2\n"
+                "input.csv;quebrado.csv;out/b.txt;\n"
+                "ruim.csv;layout.csv;out/c.txt;\n")
+    (tmp_path / "out").mkdir()
+    return str(path)
+
+
+def test_manifest_paths_are_relative_to_it(manifest, tmp_path):
+    jobs = batch.load_manifest(manifest)
+    assert [job.index for job in jobs] == [1, 2, 3]
+    assert jobs[0].input == str(tmp_path / "input.csv")
+    assert jobs[0].output == str(tmp_path / "out" / "a.txt")
+    assert [job.num_files for job in jobs] == ["2", "1", "1"]
+
+
+def test_json_manifest_and_missing_keys(tmp_path):
+    path = tmp_path / "lote.json"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"jobs": [
+            {"input": "a.xlsx", "layout": "l.csv", "output": "a.txt"},
+            {"input": "b.xlsx", "saida": "b.txt"},
+        ]}, f)
+    with pytest.raises(ValueError, match="job 2: faltando layout"):
+        batch.load_manifest(str(path))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_failed_jobs_do_not_stop_the_batch(manifest, tmp_path, workers):
+    seen = []
+    results = batch.run_batch(batch.load_manifest(manifest), workers,
+                              {"chunk_size": 100}, seen.append)
+
+    assert [result.job.index for result in results] == [1, 2, 3]
+    assert sorted(result.job.index for result in seen) == [1, 2, 3]
+    assert [result.status for result in results] == ["ok", "erro", "erro"]
+    assert results[0].files == [str(tmp_path / "out" / "a1.txt"),
+                                str(tmp_path / "out" / "a2.txt")]
+    assert results[0].bytes == sum(
+        (tmp_path / "out" / name).stat().st_size
+        for name in ("a1.txt", "a2.txt"))
+    assert "layout" in results[1].error
+    assert results[2].error.startswith("❌1 erros na entrada.")
+
+
+def test_batch_output_matches_a_single_conversion(manifest, tmp_path):
+    from model.model import Model
+
+    job = batch.load_manifest(manifest)[0]
+    Model().convert_file(job.layout, job.input,
+                         str(tmp_path / "direto.txt"), "2")
+    batch.run_batch([job], 2)
+    for part in ("1", "2"):
+        assert ((tmp_path / "out" / f"a{part}.txt").read_bytes() ==
+                (tmp_path / f"direto{part}.txt").read_bytes())
+
+
+def test_summary(manifest, tmp_path):
+    results = batch.run_batch(batch.load_manifest(manifest))
+    path = str(tmp_path / "resumo.csv")
+    batch.write_summary(path, results)
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        rows = list(csv.reader(f, delimiter=";"))
+    assert rows[0] == batch.SUMMARY_COLUMNS
+    assert [row[4] for row in rows[1:]] == ["ok", "erro", "erro"]
@@ -0,0 +1,49 @@
+import os
+
+import pytest
+
+from model.model import ConversionCancelled, Model
+
+
+def test_progress_counts_rows_up_to_the_total(synthetic_files, tmp_path):
+    layout_path, input_path = synthetic_files
+    model = Model()
+    model.chunk_size = 200
+    calls = []
+    model.progress = lambda done, total: calls.append((done, total))
+    model.convert_file(layout_path, input_path, str(tmp_path / "saida.txt"))
+
+    assert calls[0] == (0, 500)
+    assert calls[-1] == (500, 500)
+    assert [done for done, _ in calls] == sorted(done for done, _ in calls)
+
+
+def test_cancel_leaves_no_output(synthetic_files, tmp_path):
+    layout_path, input_path = synthetic_files
+    with open(input_path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    # campo_0 is required: blank it on the first rows so errors are found
+    # before the cancel lands
+    for i in range(1, 6):
+        lines[i] = "," + lines[i].split(",", 1)[1]
+    with open(input_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+    model = Model()
+    model.chunk_size = 50
+
+    def progress(done: int, total: int | None) -> None:
+        if done >= 100:
+            model.cancel()
+
+    model.progress = progress
+    with pytest.raises(ConversionCancelled):
+        model.convert_file(layout_path, input_path,
+                           str(tmp_path / "saida.txt"), "2")
+    assert sorted(os.listdir(tmp_path)) == ["input.csv", "layout.csv"]
+
+    # the next run starts uncancelled
+    model.progress = None
+    with pytest.raises(ValueError, match="Linha 2"):
+        model.convert_file(layout_path, input_path,
+                           str(tmp_path / "saida.txt"))
@@ -0,0 +1,45 @@
+import subprocess
+import sys
+
+import cli
+from conftest import ROOT
+
+
+def test_import_loads_no_gui_or_pandas():
+    code = ("import sys, cli; print(sorted(name for name in "
+            "('customtkinter', 'tkinter', 'pandas', 'model.model') "
+            "if name in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
+
+
+def test_convert_and_parse_back(synthetic_files, tmp_path, capsys):
+    layout_path, input_path = synthetic_files
+    output_path = str(tmp_path / "saida.txt")
+    assert cli.main(["convert", "-l", layout_path, "-i", input_path,
+                     "-o", output_path, "-n", "2"]) == 0
+    assert (tmp_path / "saida1.txt").exists()
+    assert (tmp_path / "saida2.txt").exists()
+
+    single_path = str(tmp_path / "unico.txt")
+    cli.main(["convert", "-l", layout_path, "-i", input_path,
+              "-o", single_path])
+    assert cli.main(["parse", "-l", layout_path, "-i",
+                     str(tmp_path / "unico1.txt"), "-o",
+                     str(tmp_path / "tabela.csv"), "--verify",
+                     input_path]) == 0
+    out = capsys.readouterr().out
+    assert "Conversão realizada com sucesso!" in out
+    assert "500 registros exportados" in out
+    assert "TXT confere com a planilha de origem." in out
+
+
+def test_errors_go_to_stderr_with_exit_code(tmp_path, capsys):
+    status = cli.main(["convert", "-l", str(tmp_path / "nenhum.csv"),
+                       "-i", str(tmp_path / "nenhuma.csv"),
+                       "-o", str(tmp_path / "saida.txt")])
+    captured = capsys.readouterr()
+    assert status == 1
+    assert captured.out == ""
+    assert "nenhum.csv" in captured.err
@@ -0,0 +1,87 @@
+import time
+
+import pytest
+
+pytest.importorskip("customtkinter")
+pytest.importorskip("CTkMessagebox")
+
+from controller import app_controller  # noqa: E402
+
+
+class FakeView:
+    """Records what the controller asks of the window."""
+
+    def __init__(self, controller) -> None:
+        self.calls: list[tuple] = []
+        self.scheduled: list = []
+
+    def after(self, ms: int, callback) -> None:
+        self.scheduled.append(callback)
+
+    def __getattr__(self, name: str):
+        return lambda *args: self.calls.append((name, *args))
+
+    def names(self) -> list[str]:
+        return [call[0] for call in self.calls]
+
+
+def run_polling(view: FakeView, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while view.scheduled:
+        assert time.monotonic() < deadline
+        view.scheduled.pop(0)()
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def controller(monkeypatch, synthetic_files, tmp_path):
+    monkeypatch.setattr(app_controller, "MainView", FakeView)
+    controller = app_controller.Controller()
+    controller.layout_path, controller.input_path = synthetic_files
+    controller.output_path = str(tmp_path / "saida.txt")
+    controller.model.chunk_size = 100
+    return controller
+
+
+def test_conversion_runs_off_the_main_thread(controller):
+    controller.convert_file("1")
+    assert controller.view.names()[0] == "conversion_started"
+    run_polling(controller.view)
+
+    names = controller.view.names()
+    assert "show_progress" in names
+    assert names[-2:] == ["conversion_finished", "show_message"]
+    assert controller.view.calls[-1][1] == "Conversão realizada com sucesso!"
+    assert not controller._polling
+
+
+def test_cancel_reports_and_stops_polling(controller):
+    def progress(done: int, total: int | None) -> None:
+        if done:
+            controller.cancel_conversion()
+        controller._on_progress(done, total)
+
+    controller.model.progress = progress
+    controller.convert_file("1")
+    run_polling(controller.view)
+
+    assert controller.view.calls[-1] == (
+        "show_message", "Conversão cancelada.")
+    assert not controller._polling
+
+
+def test_preview_is_delivered_through_the_queue(controller):
+    controller.preview_file()
+    assert controller.view.names() == ["preview_started"]
+    run_polling(controller.view)
+
+    assert controller.view.names()[-2:] == [
+        "preview_finished", "show_preview"]
+    assert controller.view.calls[-1][1].rows > 0
+
+
+def test_missing_paths_are_reported(controller):
+    controller.input_path = ""
+    controller.convert_file("1")
+    assert controller.view.names() == ["show_error"]
+    assert not controller.view.scheduled
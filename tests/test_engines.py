@@ -0,0 +1,102 @@
+import os
+
+import pytest
+
+from model import parallel
+from model.model import Model
+
+VARIANTS = {
+    "rows": {"engine": "rows"},
+    "chunked": {"chunk_size": 37},
+}
+
+
+def convert(layout_path: str, input_path: str, output_path: str,
+            num: str = "1", **options) -> dict[str, bytes]:
+    model = Model()
+    for name, value in options.items():
+        setattr(model, name, value)
+    model.convert_file(layout_path, input_path, output_path, num)
+    outputs = {}
+    for path in model.written_paths:
+        with open(path, "rb") as f:
+            outputs[os.path.basename(path)] = f.read()
+    return outputs
+
+
+def conversion_error(layout_path: str, input_path: str, directory,
+                     **options) -> tuple[str, bytes]:
+    directory.mkdir()
+    output_path = str(directory / "saida.txt")
+    with pytest.raises(ValueError) as error:
+        convert(layout_path, input_path, output_path, **options)
+    with open(str(directory / "saida.errors.csv"), "rb") as f:
+        report = f.read()
+    return f"{error.value}".replace(str(directory), ""), report
+
+
+def write_invalid_input(directory) -> tuple[str, str]:
+    layout_path = str(directory / "layout.csv")
+    input_path = str(directory / "input.csv")
+    with open(layout_path, "w", encoding="utf-8") as f:
+        f.write(
+            "Campo,Tamanho,Decimais,Alinhamento,Preenchimento,Obrigatorio,"
+            "Formatacao,Novo registro,Anular\n"
+            "Codigo,10,,D,0,S,1,N,\n"
+            "Nome,20,,E, ,S,2,N,\n"
+            "Valor,12,2,D,0,N,3,N,\n")
+    rows = ["Codigo,Nome,Valor"]
+    for i in range(150):
+        value = ["45,70", "x1", "inf", "1e3", "2.675"][i % 5]
+        name = "" if i % 7 == 0 else "José"
+        rows.append(f"{i},{name},{value}")
+    with open(input_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(rows) + "\n")
+    return layout_path, input_path
+
+
+@pytest.mark.parametrize("variant", VARIANTS)
+@pytest.mark.parametrize("num", ["1", "3"])
+def test_engines_write_identical_files(synthetic_files, tmp_path, variant,
+                                       num):
+    layout_path, input_path = synthetic_files
+    expected = convert(layout_path, input_path,
+                       str(tmp_path / "columns.txt"), num)
+    actual = convert(layout_path, input_path,
+                     str(tmp_path / f"{variant}.txt"), num,
+                     **VARIANTS[variant])
+    assert len(expected) == int(num)
+    assert list(actual.values()) == list(expected.values())
+
+
+@pytest.mark.parametrize("variant", VARIANTS)
+def test_engines_report_the_same_errors(tmp_path, variant):
+    layout_path, input_path = write_invalid_input(tmp_path)
+    expected = conversion_error(layout_path, input_path, tmp_path / "a")
+    actual = conversion_error(layout_path, input_path, tmp_path / "b",
+                              **VARIANTS[variant])
+    assert "Linha 2:" in expected[0]
+    assert actual == expected
+
+
+@pytest.mark.parametrize("num", ["1", "3"])
+def test_parallel_writes_identical_files(synthetic_files, tmp_path, sharded,
+                                         num):
+    layout_path, input_path = synthetic_files
+    expected = convert(layout_path, input_path,
+                       str(tmp_path / "columns.txt"), num)
+    assert sharded.submitted == 0
+    actual = convert(layout_path, input_path,
+                     str(tmp_path / "parallel.txt"), num, workers=3,
+                     chunk_size=200)
+    # 500 rows in chunks of 200, 200 and 100 rows, 3 + 3 + 2 shards
+    assert sharded.submitted == 8
+    assert list(actual.values()) == list(expected.values())
+
+
+def test_shards_are_capped_by_size_and_cpus(monkeypatch):
+    monkeypatch.setattr(parallel, "cpu_count", lambda: 2)
+    rows = parallel.MIN_SHARD_ROWS
+    assert parallel.shard_bounds(rows * 2 - 1, 4) == [(0, rows * 2 - 1)]
+    assert parallel.shard_bounds(rows * 3, 4) == [
+        (0, rows * 3 // 2), (rows * 3 // 2, rows * 3)]
@@ -0,0 +1,102 @@
+import csv
+
+import pytest
+
+from model.errors import REPORT_COLUMNS, InputError, InputErrors
+from model.model import Model
+
+LAYOUT = (
+    "Campo,Tamanho,Decimais,Alinhamento,Preenchimento,Obrigatorio,"
+    "Formatacao,Novo registro,Anular\n"
+    "Codigo,6,,D,0,S,1,N,\n"
+    "Nome,10,,E, ,S,2,N,\n"
+    "Valor,12,2,D,0,N,3,N,\n"
+)
+
+
+@pytest.fixture
+def invalid_files(tmp_path):
+    """40 rows; every 4th has no Nome and every 5th a non-numeric Valor."""
+    layout_path = str(tmp_path / "layout.csv")
+    input_path = str(tmp_path / "input.csv")
+    with open(layout_path, "w", encoding="utf-8") as f:
+        f.write(LAYOUT)
+    with open(input_path, "w", encoding="utf-8") as f:
+        f.write("Codigo,Nome,Valor\n")
+        for i in range(40):
+            name = "" if i % 4 == 0 else "Ana"
+            value = "x1" if i % 5 == 0 else "1,5"
+            f.write(f"{i},{name},{value}\n")
+    return layout_path, input_path
+
+
+def convert(layout_path: str, input_path: str, output_path: str,
+            **options) -> InputErrors:
+    model = Model()
+    model.chunk_size = 16
+    for name, value in options.items():
+        setattr(model, name, value)
+    with pytest.raises(InputErrors) as error:
+        model.convert_file(layout_path, input_path, output_path)
+    return error.value
+
+
+def read_report(path) -> list[list[str]]:
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        return list(csv.reader(f, delimiter=";"))
+
+
+def test_report_lists_every_error(invalid_files, tmp_path):
+    layout_path, input_path = invalid_files
+    error = convert(layout_path, input_path, str(tmp_path / "saida.txt"),
+                    max_errors=5)
+
+    rows = read_report(tmp_path / "saida.errors.csv")
+    assert rows[0] == REPORT_COLUMNS
+    # 10 blank names and 8 invalid values
+    assert error.count == len(rows) - 1 == 18
+    assert rows[1][:4] == ["2", "nome", "obrigatorio", ""]
+    assert ["2", "valor", "numerico", "x1"] == rows[2][:4]
+    assert len(error.errors) == 5
+    message = f"{error}"
+    assert message.splitlines()[1].startswith("- Linha 2: ")
+    assert "- ... e mais 13 erros." in message
+    assert message.endswith(f"Relatório completo: {error.report_path}")
+    assert not (tmp_path / "saida1.txt").exists()
+
+
+def test_fail_fast_stops_after_k_errors(invalid_files, tmp_path):
+    layout_path, input_path = invalid_files
+    error = convert(layout_path, input_path, str(tmp_path / "saida.txt"),
+                    fail_fast=3)
+    assert error.count == 3
+    assert len(read_report(tmp_path / "saida.errors.csv")) == 4
+    assert "Processamento interrompido após 3 erros." in f"{error}"
+
+
+def test_report_can_be_turned_off(invalid_files, tmp_path):
+    layout_path, input_path = invalid_files
+    error = convert(layout_path, input_path, str(tmp_path / "saida.txt"),
+                    error_report=False)
+    assert error.report_path is None
+    assert "Relatório completo" not in f"{error}"
+    assert not (tmp_path / "saida.errors.csv").exists()
+
+
+def test_clean_run_removes_a_stale_report(invalid_files, tmp_path):
+    layout_path, input_path = invalid_files
+    convert(layout_path, input_path, str(tmp_path / "saida.txt"))
+    with open(input_path, "w", encoding="utf-8") as f:
+        f.write("Codigo,Nome,Valor\n1,Ana,2\n")
+    Model().convert_file(layout_path, input_path, str(tmp_path / "saida.txt"))
+    assert not (tmp_path / "saida.errors.csv").exists()
+
+
+@pytest.mark.parametrize("row, sheet, text", [
+    (3, None, "Linha 3: falhou"),
+    (3, "Jan", "Linha 3 (aba 'Jan'): falhou"),
+    (None, "Jan", "Aba 'Jan': falhou"),
+    (None, None, "falhou"),
+])
+def test_error_text(row, sheet, text):
+    assert f"{InputError(row, 'campo', 'regra', '', 'falhou', sheet)}" == text
@@ -0,0 +1,75 @@
+import pytest
+
+from model.model import Model
+
+
+def convert(layout_path: str, input_path: str, output_path: str,
+            incremental: bool = True) -> tuple[bytes, dict]:
+    model = Model()
+    model.incremental = incremental
+    model.instrument = True
+    model.chunk_size = 128
+    model.convert_file(layout_path, input_path, output_path)
+    with open(model.written_paths[0], "rb") as f:
+        return f.read(), model.report.incremental
+
+
+def change_row(input_path: str, row: int) -> None:
+    with open(input_path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    first, rest = lines[row].split(",", 1)
+    lines[row] = f"{first}x,{rest}"
+    with open(input_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def test_unchanged_input_is_reused(synthetic_files, tmp_path):
+    layout_path, input_path = synthetic_files
+    output_path = str(tmp_path / "saida.txt")
+    first, stats = convert(layout_path, input_path, output_path)
+    assert stats == {"reused": 0, "converted": 500}
+    assert (tmp_path / "saida.cache.json").exists()
+
+    second, stats = convert(layout_path, input_path, output_path)
+    assert stats == {"reused": 500, "converted": 0}
+    assert second == first
+
+
+def test_only_changed_rows_are_converted(synthetic_files, tmp_path):
+    layout_path, input_path = synthetic_files
+    output_path = str(tmp_path / "saida.txt")
+    convert(layout_path, input_path, output_path)
+    change_row(input_path, 250)
+
+    data, stats = convert(layout_path, input_path, output_path)
+    assert stats == {"reused": 499, "converted": 1}
+    full, _ = convert(layout_path, input_path, str(tmp_path / "full.txt"),
+                      incremental=False)
+    assert data == full
+
+
+def test_changed_layout_converts_everything(synthetic_files, tmp_path):
+    layout_path, input_path = synthetic_files
+    output_path = str(tmp_path / "saida.txt")
+    convert(layout_path, input_path, output_path)
+    # any edit to the layout file changes its key
+    with open(layout_path, "a", encoding="utf-8") as f:
+        f.write("\n")
+
+    _, stats = convert(layout_path, input_path, output_path)
+    assert stats == {"reused": 0, "converted": 500}
+
+
+def test_invalid_rows_fall_back_to_a_full_run(synthetic_files, tmp_path):
+    layout_path, input_path = synthetic_files
+    output_path = str(tmp_path / "saida.txt")
+    convert(layout_path, input_path, output_path)
+    with open(input_path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    # campo_0 is required
+    lines[10] = "," + lines[10].split(",", 1)[1]
+    with open(input_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+    with pytest.raises(ValueError, match="Linha 11"):
+        convert(layout_path, input_path, output_path)
@@ -0,0 +1,97 @@
+import os
+
+import pytest
+
+from model.layout_cache import LayoutCache, hash_file
+from model.model import Model
+
+LAYOUT = (
+    "Campo,Tamanho,Decimais,Alinhamento,Preenchimento,Obrigatorio,"
+    "Formatacao,Novo registro,Anular\n"
+    "Codigo,10,,D,0,S,1,N,\n"
+    "Nome,20,,E, ,N,2,N,\n"
+)
+
+
+def write_layout(path, text: str = LAYOUT) -> str:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return str(path)
+
+
+def field_names(model: Model) -> list[str]:
+    return [field.name for field in model.layout_fields]
+
+
+def test_second_load_is_a_hit(tmp_path):
+    cache = LayoutCache()
+    layout_path = write_layout(tmp_path / "layout.csv")
+    first, second = Model(cache), Model(cache)
+    first.load_layout_fields(layout_path)
+    second.load_layout_fields(layout_path)
+
+    assert (cache.misses, cache.hits) == (1, 1)
+    assert first.layout_key == second.layout_key == hash_file(layout_path)
+    assert field_names(second) == ["codigo", "nome"]
+
+
+def test_changed_layout_is_reloaded(tmp_path):
+    cache = LayoutCache()
+    layout_path = write_layout(tmp_path / "layout.csv")
+    Model(cache).load_layout_fields(layout_path)
+    write_layout(layout_path, LAYOUT + "Valor,12,2,D,0,N,3,N,\n")
+    model = Model(cache)
+    model.load_layout_fields(layout_path)
+
+    assert cache.misses == 2
+    assert field_names(model) == ["codigo", "nome", "valor"]
+
+
+def test_invalid_layout_is_not_cached(tmp_path):
+    cache = LayoutCache()
+    layout_path = write_layout(tmp_path / "layout.csv",
+                               LAYOUT.replace("Tamanho", "Largura"))
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            Model(cache).load_layout_fields(layout_path)
+    assert (cache.misses, cache.hits) == (2, 0)
+
+
+def test_disk_cache_survives_a_new_process(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    layout_path = write_layout(tmp_path / "layout.csv")
+    Model(LayoutCache(cache_dir=cache_dir)).load_layout_fields(layout_path)
+    assert os.listdir(cache_dir) == [f"{hash_file(layout_path)}.json"]
+
+    cache = LayoutCache(cache_dir=cache_dir)
+    model = Model(cache)
+    model.load_layout_fields(layout_path)
+    assert (cache.misses, cache.hits) == (0, 1)
+    assert field_names(model) == ["codigo", "nome"]
+
+
+def test_corrupt_disk_entry_is_a_miss(tmp_path):
+    cache = LayoutCache(cache_dir=str(tmp_path))
+    with open(tmp_path / "chave.json", "w", encoding="utf-8") as f:
+        f.write("{")
+    assert cache.get("chave") is None
+    assert cache.misses == 1
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = LayoutCache(max_entries=2)
+    cache.put("a", [{"campo": "a"}])
+    cache.put("b", [{"campo": "b"}])
+    cache.get("a")
+    cache.put("c", [{"campo": "c"}])
+
+    assert cache.get("b") is None
+    assert cache.get("a") == [{"campo": "a"}]
+    assert cache.get("c") == [{"campo": "c"}]
+
+
+def test_disk_cache_is_bounded(tmp_path):
+    cache = LayoutCache(max_entries=2, cache_dir=str(tmp_path))
+    for key in "abc":
+        cache.put(key, [{"campo": key}])
+    assert len(os.listdir(tmp_path)) == 2
@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+from utils.numeric import (DigitColumn, parse_decimal, scale_column,
+                           scale_decimal, zero_column)
+
+
+@pytest.mark.parametrize("value, decimals, expected", [
+    ("2.675", 2, "268"),
+    ("2,665", 2, "267"),
+    ("-2.675", 2, "-268"),
+    ("0.005", 2, "1"),
+    ("0.0049", 2, "0"),
+    ("-0.005", 2, "-1"),
+    ("-0.005", 0, "0"),
+    ("9.995", 2, "1000"),
+    ("2.5", 0, "3"),
+    ("-2.5", 0, "-3"),
+    ("00.50", 0, "1"),
+    (".5", 2, "50"),
+    ("5.", 2, "500"),
+    ("+1.5", 0, "2"),
+    ("-0", 2, "0"),
+    ("0,125", 2, "13"),
+    ("999999999999.995", 2, "100000000000000"),
+    ("12345678901234.5", 2, "1234567890123450"),
+    ("99999999999999999999.5", 0, "100000000000000000000"),
+    ("1e3", 2, "100000"),
+])
+def test_scale_rounds_half_up(value, decimals, expected):
+    results, invalid = scale_column([value], decimals)
+    assert not invalid[0]
+    assert results[0] == expected
+
+
+@pytest.mark.parametrize("value", ["", "abc", "1.2.3", "1,2,3", "--1",
+                                   "1-", "nan"])
+def test_scale_flags_invalid_values(value):
+    results, invalid = scale_column([value], 2)
+    assert invalid[0]
+    assert results[0] == ""
+
+
+def test_fast_path_only_takes_plain_decimals():
+    column = DigitColumn(["12", "-1,5", "+3", "1e3", "1.2.3", "", "x",
+                          "٣4", "1" * 41])
+    assert column.simple.tolist() == [
+        True, True, True, False, False, False, False, False, False]
+
+
+@pytest.mark.parametrize("decimals", [0, 2, 3])
+def test_scale_matches_decimal(decimals):
+    rng = random.Random(decimals)
+    values = []
+    for _ in range(5000):
+        integer = str(rng.randint(0, 10 ** rng.randint(0, 16)))
+        fraction = "".join(rng.choices("0123456789", k=rng.randint(0, 6)))
+        if fraction and rng.random() < 0.3:
+            fraction = fraction[:-1] + "5"
+        value = integer + rng.choice(".,") + fraction if fraction else integer
+        values.append(rng.choice(["", "-"]) + value)
+    results, invalid = scale_column(values, decimals)
+    assert not invalid.any()
+    expected = [str(scale_decimal(parse_decimal(value), decimals))
+                for value in values]
+    assert results.tolist() == expected
+
+
+def test_zero_column():
+    zero, invalid = zero_column(["0", "0,00", "-0", "00.0", "0.01", "1e-9",
+                                 "0e5", "abc", ""])
+    assert zero.tolist() == [
+        True, True, True, True, False, False, True, False, False]
+    assert invalid.tolist() == [
+        False, False, False, False, False, False, False, True, True]
@@ -0,0 +1,102 @@
+import pandas as pd
+import pytest
+
+from model.model import Model
+
+FLAT_LAYOUT = (
+    "Campo,Tamanho,Decimais,Alinhamento,Preenchimento,Obrigatorio,"
+    "Formatacao,Novo registro,Anular\n"
+    "Codigo,6,,D,0,S,1,N,\n"
+    "Nome,10,,E, ,N,2,N,\n"
+    "Valor,12,2,D,0,N,3,N,\n"
+    "Zero,5,,D,0,N,4,N,\n"
+)
+
+
+def convert(layout_path: str, input_path: str, output_path: str) -> str:
+    model = Model()
+    model.convert_file(layout_path, input_path, output_path)
+    return model.written_paths[0]
+
+
+@pytest.fixture
+def flat_files(tmp_path):
+    layout_path = str(tmp_path / "layout_flat.csv")
+    input_path = str(tmp_path / "input_flat.csv")
+    with open(layout_path, "w", encoding="utf-8") as f:
+        f.write(FLAT_LAYOUT)
+    with open(input_path, "w", encoding="utf-8") as f:
+        f.write("Codigo,Nome,Valor,Zero\n")
+        for i in range(100):
+            f.write(f"{i},Ação {i},{i}.5,{i % 3}\n")
+    return layout_path, input_path
+
+
+@pytest.mark.parametrize("chunk_size", [50000, 29])
+def test_round_trip_matches_input(synthetic_files, tmp_path, chunk_size):
+    layout_path, input_path = synthetic_files
+    txt_path = convert(layout_path, input_path, str(tmp_path / "saida.txt"))
+    model = Model()
+    model.chunk_size = chunk_size
+    assert model.verify_round_trip(layout_path, txt_path, input_path) == 500
+
+
+def test_parse_file_reads_every_record(synthetic_files, tmp_path):
+    layout_path, input_path = synthetic_files
+    txt_path = convert(layout_path, input_path, str(tmp_path / "saida.txt"))
+    table_path = str(tmp_path / "tabela.csv")
+    model = Model()
+    model.chunk_size = 64
+    assert model.parse_file(layout_path, txt_path, table_path) == 500
+
+    table = pd.read_csv(table_path, dtype=str, keep_default_na=False)
+    assert list(table.columns) == [
+        field.name for field in model.layout_fields]
+    assert len(table) == 500
+
+
+def test_parse_file_undoes_padding_and_scaling(flat_files, tmp_path):
+    layout_path, input_path = flat_files
+    txt_path = convert(layout_path, input_path, str(tmp_path / "saida.txt"))
+    table_path = str(tmp_path / "tabela.csv")
+    Model().parse_file(layout_path, txt_path, table_path)
+
+    table = pd.read_csv(table_path, dtype=str, keep_default_na=False)
+    assert table.iloc[7].tolist() == ["7", "ACAO 7", "7.50", "1"]
+    assert table.iloc[3].tolist() == ["3", "ACAO 3", "3.50", "0"]
+
+
+def test_round_trip_reports_changed_field(synthetic_files, tmp_path):
+    layout_path, input_path = synthetic_files
+    txt_path = convert(layout_path, input_path, str(tmp_path / "saida.txt"))
+    with open(txt_path, "rb") as f:
+        data = bytearray(f.read())
+    # first field of the first record is right aligned and zero padded
+    data[0] = ord("9") if data[0] != ord("9") else ord("8")
+    with open(txt_path, "wb") as f:
+        f.write(data)
+
+    with pytest.raises(ValueError, match="Linha 2, campo 'campo_0'"):
+        Model().verify_round_trip(layout_path, txt_path, input_path)
+
+
+def test_round_trip_reports_missing_records(flat_files, tmp_path):
+    layout_path, input_path = flat_files
+    txt_path = convert(layout_path, input_path, str(tmp_path / "saida.txt"))
+    with open(txt_path, "rb") as f:
+        lines = f.read().splitlines(keepends=True)
+    with open(txt_path, "wb") as f:
+        f.writelines(lines[:60])
+
+    with pytest.raises(ValueError, match="O TXT tem 60 registros"):
+        Model().verify_round_trip(layout_path, txt_path, input_path)
+
+
+def test_malformed_line_is_reported(flat_files, tmp_path):
+    layout_path, input_path = flat_files
+    txt_path = convert(layout_path, input_path, str(tmp_path / "saida.txt"))
+    with open(txt_path, "ab") as f:
+        f.write(b"\ncurta")
+    with pytest.raises(ValueError, match="Registro 101"):
+        Model().parse_file(layout_path, txt_path,
+                           str(tmp_path / "tabela.csv"))
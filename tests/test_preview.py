@@ -0,0 +1,90 @@
+import cli
+from conftest import RECORD_LAYOUT
+from model import preview
+from model.model import Model
+from model.writer import NEWLINE
+
+
+def converted_lines(layout_path: str, input_path: str,
+                    output_path: str) -> list[str]:
+    model = Model()
+    model.convert_file(layout_path, input_path, output_path)
+    with open(model.written_paths[0], "rb") as f:
+        return f.read().decode("cp1252").split(NEWLINE.decode())
+
+
+def test_preview_matches_the_start_of_the_conversion(synthetic_files,
+                                                     tmp_path):
+    layout_path, input_path = synthetic_files
+    result = Model().preview(layout_path, input_path, rows=20)
+    assert result.rows == 20
+    assert result.errors == []
+    expected = converted_lines(layout_path, input_path,
+                               str(tmp_path / "saida.txt"))
+    assert result.lines == expected[:len(result.lines)]
+
+
+def test_spans_cover_each_line_in_order(synthetic_files):
+    layout_path, input_path = synthetic_files
+    result = Model().preview(layout_path, input_path, rows=5)
+    covered = [""] * len(result.lines)
+    for span in result.spans:
+        assert span.start == len(covered[span.line])
+        assert span.end > span.start
+        covered[span.line] += result.lines[span.line][span.start:span.end]
+    assert covered == result.lines
+
+
+def test_preview_renders_header_and_trailer(tmp_path):
+    layout_path = str(tmp_path / "layout.csv")
+    input_path = str(tmp_path / "input.csv")
+    with open(layout_path, "w", encoding="utf-8") as f:
+        f.write(RECORD_LAYOUT)
+    with open(input_path, "w", encoding="utf-8") as f:
+        f.write("campo_1,campo_2,campo_3\n"
+                "12.3-4,José,1.5\n"
+                "7,Ana,\"2,675\"\n"
+                "99,Zé,\"0,01\"\n")
+    result = Model().preview(layout_path, input_path, rows=2)
+    assert result.lines == [
+        "0341000001",
+        "10000001234JOSE                000000000000150000002",
+        "10000000007ANA                 000000000000268000003",
+        "9" "00000002" "000000000000000418" "000004" "000004",
+    ]
+    assert [span.name for span in result.spans if span.line == 0] == [
+        "tipo", "banco", "seq"]
+
+
+def test_invalid_rows_are_listed_and_skipped(tmp_path):
+    layout_path = str(tmp_path / "layout.csv")
+    input_path = str(tmp_path / "input.csv")
+    with open(layout_path, "w", encoding="utf-8") as f:
+        f.write("Campo,Tamanho,Decimais,Alinhamento,Preenchimento,"
+                "Obrigatorio,Formatacao,Novo registro,Anular\n"
+                "Codigo,5,,D,0,S,1,N,\n"
+                "Valor,8,2,D,0,N,3,N,\n")
+    with open(input_path, "w", encoding="utf-8") as f:
+        f.write("Codigo,Valor\n1,2.5\n2,x1\n3,7\n")
+    result = Model().preview(layout_path, input_path)
+    assert result.rows == 3
+    assert result.lines == ["0000100000250", "0000300000700"]
+    # reported once, by the check, not again by the formatter
+    assert result.errors == [
+        "Linha 3: Campo 'valor' deve ser numérico (recebido 'x1')."]
+
+
+def test_ruler_marks_tens_and_units():
+    assert preview.ruler(23) == ["         1         2   ",
+                                 "12345678901234567890123"]
+    assert preview.ruler(0) == ["", ""]
+
+
+def test_cli_prints_the_ruler_above_the_lines(synthetic_files, capsys):
+    layout_path, input_path = synthetic_files
+    assert cli.main(["preview", "-l", layout_path, "-i", input_path,
+                     "-r", "3"]) == 0
+    out = capsys.readouterr().out.splitlines()
+    result = Model().preview(layout_path, input_path, rows=3)
+    assert out == result.ruler() + result.lines
+    assert len(out[1]) == result.width
@@ -0,0 +1,64 @@
+import pytest
+
+from conftest import RECORD_LAYOUT
+from model import reader
+from model.model import Model
+
+ROWS = [["1", "Ana", "x" * 40, "1.5", "extra"],
+        ["2", "Bia", "y" * 40, "2", "extra"]]
+HEADER = ["Campo_1", " campo_2 ", "Notas", "CAMPO_3", "Outra"]
+
+
+def write_input(path: str) -> str:
+    if path.endswith(".xlsx"):
+        from openpyxl import Workbook
+
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(HEADER)
+        for row in ROWS:
+            sheet.append(row)
+        workbook.save(path)
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(",".join(HEADER) + "\n")
+            f.write("\n".join(",".join(row) for row in ROWS) + "\n")
+    return path
+
+
+@pytest.fixture
+def model(tmp_path):
+    layout_path = str(tmp_path / "layout.csv")
+    with open(layout_path, "w", encoding="utf-8") as f:
+        f.write(RECORD_LAYOUT)
+    model = Model()
+    model.load_layout_fields(layout_path)
+    return model
+
+
+def test_only_detail_input_columns_are_wanted(model):
+    assert model._input_columns() == {"campo_1", "campo_2", "campo_3"}
+
+
+@pytest.mark.parametrize("extension", ["csv", "xlsx"])
+def test_unreferenced_columns_are_not_read(model, tmp_path, extension):
+    input_path = write_input(str(tmp_path / f"entrada.{extension}"))
+    df = model.read_input_df(input_path)
+    assert list(df.columns) == ["campo_1", "campo_2", "campo_3"]
+    assert df["campo_3"].tolist() == ["1.5", "2"]
+
+    with reader.open_chunks(input_path, 1, columns=model._input_columns()
+                            ) as chunks:
+        frames = list(chunks)
+    assert [list(frame.columns) for frame in frames] == [
+        ["campo_1", "campo_2", "campo_3"]] * 2
+
+
+def test_no_matching_column_keeps_the_rows(model, tmp_path):
+    input_path = str(tmp_path / "entrada.csv")
+    with open(input_path, "w", encoding="utf-8") as f:
+        f.write("a,b\n1,2\n3,4\n")
+    assert len(model.read_input_df(input_path)) == 2
+    with pytest.raises(ValueError, match="Campos faltando no arquivo de "
+                       "entrada: campo_1, campo_2, campo_3"):
+        model.validate_input_df(model.read_input_df(input_path))
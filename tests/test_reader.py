@@ -0,0 +1,78 @@
+import os
+
+import pytest
+
+from benchmarks import synthetic
+from model import reader, watcher
+from model.model import Model
+
+
+def convert(layout_path: str, input_path: str, output_path: str,
+            **options) -> bytes:
+    model = Model()
+    for name, value in options.items():
+        setattr(model, name, value)
+    model.convert_file(layout_path, input_path, output_path)
+    with open(model.written_paths[0], "rb") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("name, delimited, delimiter", [
+    ("a.csv", True, ","),
+    ("A.TSV", True, "\t"),
+    ("a.txt", False, ","),
+    ("a.xlsx", False, ","),
+])
+def test_delimited_inputs(name, delimited, delimiter):
+    assert reader.is_delimited(name) is delimited
+    assert reader.default_delimiter(name) == delimiter
+
+
+def test_positional_output_is_not_an_input():
+    assert reader.supports_streaming("a.xlsx")
+    assert not reader.supports_streaming("saida1.txt")
+    assert ".txt" not in watcher.INPUT_EXTENSIONS
+
+
+def test_every_input_format_gives_the_same_txt(tmp_path):
+    fields = synthetic.make_layout(12, seed=7, new_line_every=5)
+    layout_path = str(tmp_path / "layout.csv")
+    synthetic.write_layout(fields, layout_path)
+    outputs = set()
+    for extension in ("csv", "tsv", "xlsx"):
+        input_path = str(tmp_path / f"input.{extension}")
+        synthetic.write_input(fields, 200, input_path, seed=7)
+        outputs.add(convert(layout_path, input_path,
+                            str(tmp_path / f"{extension}.txt")))
+    assert len(outputs) == 1
+
+
+def test_delimiter_and_encoding_options(tmp_path):
+    layout_path = str(tmp_path / "layout.csv")
+    with open(layout_path, "w", encoding="utf-8") as f:
+        f.write(
+            "Campo,Tamanho,Decimais,Alinhamento,Preenchimento,Obrigatorio,"
+            "Formatacao,Novo registro,Anular\n"
+            "Codigo,6,,D,0,S,1,N,\n"
+            "Nome,10,,E, ,S,,N,\n")
+    input_path = str(tmp_path / "input.csv")
+    with open(input_path, "w", encoding="latin-1") as f:
+        f.write("Codigo;Nome\n1-2;Conceição\n")
+
+    data = convert(layout_path, input_path, str(tmp_path / "saida.txt"),
+                   input_delimiter=";", input_encoding="latin-1")
+    assert data == "000012Conceição ".encode("cp1252")
+
+
+def test_txt_input_is_rejected(tmp_path):
+    layout_path = str(tmp_path / "layout.csv")
+    with open(layout_path, "w", encoding="utf-8") as f:
+        f.write("Campo,Tamanho,Decimais,Alinhamento,Preenchimento,"
+                "Obrigatorio,Formatacao,Novo registro,Anular\n"
+                "Codigo,6,,D,0,S,1,N,\n")
+    input_path = str(tmp_path / "entrada.txt")
+    with open(input_path, "w", encoding="utf-8") as f:
+        f.write("Codigo\n1\n")
+    with pytest.raises(ValueError, match="Erro ao ler arquivo de entrada"):
+        convert(layout_path, input_path, str(tmp_path / "saida.txt"))
+    assert sorted(os.listdir(tmp_path)) == ["entrada.txt", "layout.csv"]
@@ -0,0 +1,80 @@
+import pytest
+
+from conftest import RECORD_LAYOUT
+from model.model import Model
+from model.writer import NEWLINE
+
+VARIANTS = {
+    "rows": {"engine": "rows"},
+    "chunked": {"chunk_size": 37},
+    "parallel": {"workers": 3, "chunk_size": 120},
+}
+
+
+def convert(layout_path: str, input_path: str, output_path: str,
+            num: str = "1", **options) -> list[list[str]]:
+    model = Model()
+    for name, value in options.items():
+        setattr(model, name, value)
+    model.convert_file(layout_path, input_path, output_path, num)
+    parts = []
+    for path in model.written_paths:
+        with open(path, "rb") as f:
+            parts.append(f.read().decode("cp1252").split(NEWLINE.decode()))
+    return parts
+
+
+@pytest.fixture
+def small_files(tmp_path):
+    layout_path = str(tmp_path / "layout.csv")
+    input_path = str(tmp_path / "input.csv")
+    with open(layout_path, "w", encoding="utf-8") as f:
+        f.write(RECORD_LAYOUT)
+    with open(input_path, "w", encoding="utf-8") as f:
+        f.write("campo_1,campo_2,campo_3\n"
+                "12.3-4,José,1.5\n"
+                "7,Ana,\"2,675\"\n"
+                "99,Zé,\"0,01\"\n")
+    return layout_path, input_path
+
+
+def test_header_and_trailer_values(small_files, tmp_path):
+    layout_path, input_path = small_files
+    [lines] = convert(layout_path, input_path, str(tmp_path / "saida.txt"))
+    assert lines == [
+        "0341000001",
+        "10000001234JOSE                000000000000150000002",
+        "10000000007ANA                 000000000000268000003",
+        "10000000099ZE                  000000000000001000004",
+        "9" "00000003" "000000000000000419" "000005" "000005",
+    ]
+
+
+def test_every_part_gets_header_and_trailer(small_files, tmp_path):
+    layout_path, input_path = small_files
+    parts = convert(layout_path, input_path, str(tmp_path / "saida.txt"),
+                    "2")
+    assert [len(part) for part in parts] == [3, 2]
+    assert parts[0][0] == "0341000001"
+    assert parts[1][-1].startswith("9")
+
+
+@pytest.mark.parametrize("variant", VARIANTS)
+def test_engines_agree_on_records(record_files, tmp_path, sharded, variant):
+    layout_path, input_path = record_files
+    expected = convert(layout_path, input_path, str(tmp_path / "a.txt"))
+    actual = convert(layout_path, input_path, str(tmp_path / "b.txt"),
+                     **VARIANTS[variant])
+    assert actual == expected
+    assert expected[0][-1].startswith("9" "00000300")
+    if variant == "parallel":
+        # chunks of 120, 120 and 60 rows: 2 + 2 shards, then one in-process
+        assert sharded.submitted == 4
+
+
+def test_round_trip_skips_header_and_trailer(record_files, tmp_path):
+    layout_path, input_path = record_files
+    model = Model()
+    model.convert_file(layout_path, input_path, str(tmp_path / "saida.txt"))
+    assert Model().verify_round_trip(
+        layout_path, model.written_paths[0], input_path) == 300
@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+from model.model import Model
+
+
+def run_report(layout_path: str, input_path: str, output_path: str,
+               **options) -> dict:
+    model = Model()
+    model.instrument = True
+    for name, value in options.items():
+        setattr(model, name, value)
+    model.convert_file(layout_path, input_path, output_path)
+    with open(output_path.replace(".txt", ".report.json"),
+              encoding="utf-8") as f:
+        report = json.load(f)
+    return report
+
+
+def test_report_covers_stages_and_formatters(synthetic_files, tmp_path):
+    layout_path, input_path = synthetic_files
+    report = run_report(layout_path, input_path, str(tmp_path / "saida.txt"))
+
+    assert report["status"] == "ok"
+    assert report["stages"]["load_layout"]["calls"] == 1
+    assert report["stages"]["transform_input_values"]["rows_in"] == 500
+    assert report["files"] == [str(tmp_path / "saida1.txt")]
+    assert report["bytes_written"] == (tmp_path / "saida1.txt").stat().st_size
+    assert set(report["formatters"]) == {
+        "1:only_digits", "2:remove_accents", "3:format_as_money",
+        "4:zero_as_blank"}
+    for stats in report["formatters"].values():
+        assert stats["calls"] > 0
+        assert stats["values"] > 0
+    assert report["rows_memo"] == {}
+
+
+def test_rows_engine_reports_memo(synthetic_files, tmp_path):
+    layout_path, input_path = synthetic_files
+    report = run_report(layout_path, input_path, str(tmp_path / "saida.txt"),
+                        engine="rows")
+    assert report["rows_memo"]
+
+
+def test_parallel_runs_merge_formatter_stats(synthetic_files, tmp_path,
+                                             sharded):
+    layout_path, input_path = synthetic_files
+    expected = run_report(layout_path, input_path, str(tmp_path / "a.txt"),
+                          chunk_size=200)
+    actual = run_report(layout_path, input_path, str(tmp_path / "b.txt"),
+                        chunk_size=200, workers=3)
+    assert sharded.submitted == 8
+    assert set(actual["formatters"]) == set(expected["formatters"])
+    for code, stats in actual["formatters"].items():
+        assert stats["calls"] >= expected["formatters"][code]["calls"]
+        assert stats["values"] >= expected["formatters"][code]["values"]
+        assert stats["seconds"] > 0
+
+
+def test_failed_run_is_reported(tmp_path):
+    layout_path = str(tmp_path / "layout.csv")
+    with open(layout_path, "w", encoding="utf-8") as f:
+        f.write("Campo,Tamanho\nCodigo,10\n")
+    model = Model()
+    model.instrument = True
+    with pytest.raises(ValueError):
+        model.convert_file(layout_path, str(tmp_path / "input.csv"),
+                           str(tmp_path / "saida.txt"))
+    report = model.get_report()
+    assert report["status"] == "error"
+    assert "layout" in report["error"]
@@ -0,0 +1,191 @@
+import asyncio
+import http.client
+import json
+import threading
+
+import pytest
+
+from model import service as service_module
+from model.model import Model
+from model.service import ConversionService, resolve_inside
+
+
+class Client:
+    def __init__(self, port: int) -> None:
+        self.port = port
+
+    def request(self, method: str, path: str,
+                body: bytes | None = None) -> tuple[int, bytes]:
+        connection = http.client.HTTPConnection("127.0.0.1", self.port,
+                                                timeout=60)
+        try:
+            connection.request(method, path, body)
+            response = connection.getresponse()
+            return response.status, response.read()
+        finally:
+            connection.close()
+
+    def metrics(self) -> dict:
+        status, body = self.request("GET", "/metrics")
+        assert status == 200
+        return json.loads(body)
+
+
+@pytest.fixture
+def start_service():
+    running = []
+
+    def start(**options) -> tuple[ConversionService, Client]:
+        service = ConversionService(**options)
+        ready = threading.Event()
+        found = {}
+
+        async def main() -> None:
+            found["loop"] = asyncio.get_running_loop()
+
+            def listening(server) -> None:
+                found["port"] = server.sockets[0].getsockname()[1]
+                ready.set()
+
+            await service.serve("127.0.0.1", 0, None, listening)
+
+        thread = threading.Thread(target=asyncio.run, args=(main(),),
+                                  daemon=True)
+        thread.start()
+        assert ready.wait(30)
+        running.append((service, found["loop"], thread))
+        return service, Client(found["port"])
+
+    yield start
+    for service, loop, thread in running:
+        loop.call_soon_threadsafe(service.stop)
+        thread.join(30)
+
+
+@pytest.fixture
+def folders(synthetic_files, tmp_path):
+    layout_path, input_path = synthetic_files
+    expected = tmp_path / "esperado.txt"
+    model = Model()
+    model.convert_file(layout_path, input_path, str(expected))
+    with open(model.written_paths[0], "rb") as f:
+        data = f.read()
+    other = tmp_path / "outra"
+    other.mkdir()
+    (other / "layout.csv").write_bytes(
+        (tmp_path / "layout.csv").read_bytes())
+    return {"root": tmp_path, "input": (tmp_path / "input.csv").read_bytes(),
+            "expected": data}
+
+
+def test_resolve_inside(tmp_path):
+    root = str(tmp_path)
+    assert resolve_inside(root, "a/b.csv") == str(tmp_path / "a" / "b.csv")
+    assert resolve_inside(root, "../b.csv") is None
+    assert resolve_inside(root, "/etc/passwd") is None
+
+
+def test_convert_upload_and_input_path(start_service, folders):
+    root = folders["root"]
+    _, client = start_service(workers=1, layout_dir=str(root),
+                              input_dir=str(root))
+    assert client.request(
+        "POST", "/convert?layout=layout.csv&filename=input.csv",
+        folders["input"]) == (200, folders["expected"])
+    assert client.request(
+        "POST", "/convert?layout=layout.csv&input=input.csv") == (
+        200, folders["expected"])
+
+    metrics = client.metrics()
+    assert metrics["completed"] == 2
+    assert metrics["failed"] == 0
+    assert metrics["queue_depth"] == metrics["running"] == 0
+    assert metrics["bytes_out"] == 2 * len(folders["expected"])
+    assert metrics["latency_seconds"]["max"] > 0
+
+
+@pytest.mark.parametrize("query", [
+    "layout=../layout.csv",
+    "layout={root}/layout.csv",
+    "layout=sub/../../layout.csv",
+])
+def test_layouts_outside_the_folder_are_refused(start_service, folders,
+                                                query):
+    root = folders["root"]
+    _, client = start_service(workers=1, layout_dir=str(root / "outra"))
+    status, body = client.request(
+        "POST", "/convert?" + query.format(root=root), folders["input"])
+    assert status == 400
+    assert "pasta de layouts" in body.decode()
+
+
+def test_input_paths_are_confined(start_service, folders):
+    root = folders["root"]
+    _, client = start_service(workers=1, layout_dir=str(root),
+                              input_dir=str(root / "outra"))
+    for name in ("../input.csv", str(root / "input.csv"), "/etc/passwd"):
+        status, body = client.request(
+            "POST", f"/convert?layout=layout.csv&input={name}")
+        assert status == 400
+        assert "pasta de entradas" in body.decode()
+
+
+def test_input_paths_are_off_by_default(start_service, folders):
+    _, client = start_service(workers=1, layout_dir=str(folders["root"]))
+    status, body = client.request(
+        "POST", "/convert?layout=layout.csv&input=input.csv")
+    assert status == 400
+    assert "--input-dir" in body.decode()
+
+
+def test_request_errors(start_service, folders):
+    _, client = start_service(workers=1, layout_dir=str(folders["root"]))
+    assert client.request("GET", "/nada")[0] == 404
+    assert client.request("GET", "/convert?layout=layout.csv")[0] == 405
+    assert client.request("POST", "/convert", b"")[0] == 400
+    assert client.request("POST", "/convert?layout=nenhum.csv",
+                          b"")[0] == 400
+
+    status, body = client.request(
+        "POST", "/convert?layout=layout.csv", b"campo_0\n\n")
+    assert status == 422
+    assert "Campos faltando" in body.decode()
+    assert client.metrics()["failed"] == 1
+
+
+def test_failure_while_streaming_drops_the_connection(
+        start_service, folders, monkeypatch):
+    class FailingFile:
+        """Reads of the converted TXT fail after the first block."""
+
+        def __init__(self, path, mode) -> None:
+            self.reads = 0
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc) -> None:
+            pass
+
+        def read(self, size: int) -> bytes:
+            self.reads += 1
+            if self.reads > 1:
+                raise OSError("disco")
+            return b"x" * 10
+
+    root = str(folders["root"])
+    _, client = start_service(workers=1, layout_dir=root, input_dir=root)
+    monkeypatch.setattr(service_module, "open", FailingFile, raising=False)
+    connection = http.client.HTTPConnection("127.0.0.1", client.port,
+                                            timeout=60)
+    connection.request("POST", "/convert?layout=layout.csv&input=input.csv")
+    response = connection.getresponse()
+    assert response.status == 200
+    with pytest.raises(http.client.IncompleteRead) as error:
+        response.read()
+    assert error.value.partial == b"x" * 10
+    connection.close()
+
+    monkeypatch.undo()
+    metrics = client.metrics()
+    assert (metrics["completed"], metrics["failed"]) == (0, 1)
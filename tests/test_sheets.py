@@ -0,0 +1,118 @@
+import os
+
+import pytest
+from openpyxl import Workbook
+
+from model import reader, writer
+from model.model import Model
+
+LAYOUT = (
+    "Campo,Tamanho,Decimais,Alinhamento,Preenchimento,Obrigatorio,"
+    "Formatacao,Novo registro,Anular\n"
+    "Codigo,10,,D,0,S,1,N,\n"
+    "Nome,20,,E, ,S,2,N,\n"
+    "Valor,15,2,D,0,N,3,N,\n"
+)
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    """Three sheets with columns in different orders; Resumo is invalid."""
+    book = Workbook()
+    sheet = book.active
+    sheet.title = "Filial A"
+    sheet.append(["Codigo", "Nome", "Valor", "Extra"])
+    for i in range(5):
+        sheet.append([i, f"ANA{i}", 10.5 + i, "x"])
+    sheet = book.create_sheet("Filial 2")
+    sheet.append(["nome", "codigo", "valor"])
+    for i in range(3):
+        sheet.append([f"BIA{i}", 100 + i, 1])
+    sheet = book.create_sheet("Resumo")
+    sheet.append(["Codigo", "Nome", "Valor"])
+    sheet.append([1, "", 2])
+    input_path = str(tmp_path / "multi.xlsx")
+    book.save(input_path)
+    layout_path = str(tmp_path / "layout.csv")
+    with open(layout_path, "w", encoding="utf-8") as f:
+        f.write(LAYOUT)
+    return layout_path, input_path
+
+
+def convert(layout_path: str, input_path: str, output_path: str,
+            sheets: list[str], split: bool = False,
+            num: str = "1") -> dict[str, bytes]:
+    model = Model()
+    model.sheets = sheets
+    model.split_sheets = split
+    model.convert_file(layout_path, input_path, output_path, num)
+    outputs = {}
+    for path in model.written_paths:
+        with open(path, "rb") as f:
+            outputs[os.path.basename(path)] = f.read()
+    return outputs
+
+
+def test_select_sheets_ignores_case_and_spaces():
+    available = ["Filial A", "Filial 2", "Resumo"]
+    assert reader.select_sheets(available, ["*"]) == available
+    assert reader.select_sheets(available, ["resumo", " FILIAL A "]) == [
+        "Filial A", "Resumo"]
+    with pytest.raises(ValueError, match="Abas não encontradas na "
+                                         "planilha: Nada"):
+        reader.select_sheets(available, ["Nada", "Resumo"])
+
+
+def test_sheet_paths_are_unique():
+    assert writer.sheet_paths("saida.txt", ["Filial A", "Filial B (sul)",
+                                            "Filial/A", "***"]) == [
+        "saida_Filial_A.txt", "saida_Filial_B_sul.txt",
+        "saida_Filial_A_2.txt", "saida_aba.txt"]
+
+
+def test_split_sheets_write_one_txt_per_sheet(workbook, tmp_path):
+    layout_path, input_path = workbook
+    outputs = convert(layout_path, input_path, str(tmp_path / "saida.txt"),
+                      ["Filial A", "Filial 2"], split=True, num="2")
+    # the part index follows a "-", so "Filial 2" part 1 is not "Filial 21"
+    assert sorted(outputs) == [
+        "saida_Filial_2-1.txt", "saida_Filial_2-2.txt",
+        "saida_Filial_A-1.txt", "saida_Filial_A-2.txt"]
+    assert outputs["saida_Filial_2-1.txt"].startswith(b"0000000100BIA0")
+
+
+def test_combined_output_is_the_sheets_in_order(workbook, tmp_path):
+    layout_path, input_path = workbook
+    combined = convert(layout_path, input_path, str(tmp_path / "saida.txt"),
+                       ["filial 2", "filial a"])
+    split = convert(layout_path, input_path, str(tmp_path / "aba.txt"),
+                    ["filial 2", "filial a"], split=True)
+    assert list(combined) == ["saida1.txt"]
+    # workbook order, whatever the order asked for
+    assert list(split) == ["aba_Filial_A-1.txt", "aba_Filial_2-1.txt"]
+    assert combined["saida1.txt"] == writer.NEWLINE.join(split.values())
+
+
+def test_errors_name_the_sheet(workbook, tmp_path):
+    layout_path, input_path = workbook
+    output_path = str(tmp_path / "saida.txt")
+    with pytest.raises(ValueError) as error:
+        convert(layout_path, input_path, output_path, ["*"])
+    assert ("Linha 2 (aba 'Resumo'): Campo obrigatório 'nome' está vazio."
+            in f"{error.value}")
+    with open(str(tmp_path / "saida.errors.csv"), encoding="utf-8-sig") as f:
+        assert f.read().splitlines() == [
+            "aba;linha;campo;regra;valor;mensagem",
+            "Resumo;2;nome;obrigatorio;;Campo obrigatório 'nome' está "
+            "vazio."]
+    assert sorted(os.listdir(tmp_path)) == [
+        "layout.csv", "multi.xlsx", "saida.errors.csv"]
+
+
+def test_sheets_only_apply_to_workbooks(workbook, synthetic_files,
+                                        tmp_path):
+    layout_path, _ = workbook
+    _, input_path = synthetic_files
+    with pytest.raises(ValueError, match="só vale para planilhas"):
+        convert(layout_path, input_path, str(tmp_path / "saida.txt"),
+                ["Filial A"])
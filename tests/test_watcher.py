@@ -0,0 +1,152 @@
+import os
+import shutil
+import threading
+
+import pytest
+
+from model import watcher
+from model.watcher import WatchFolder
+
+
+def watch(folders, expected, drop=None, timeout=60):
+    """Runs the watcher until `expected` files are reported."""
+    results = []
+    finished = threading.Event()
+
+    def on_result(path, status, seconds, error):
+        results.append((os.path.basename(path), status, error))
+        if len(results) >= expected:
+            finished.set()
+
+    daemon = watcher.FolderWatcher(folders, jobs=1, interval=0.1,
+                                   settle=0.1, polling=True,
+                                   on_result=on_result)
+    thread = threading.Thread(target=daemon.run)
+    thread.start()
+    try:
+        if drop:
+            drop()
+        assert finished.wait(timeout), results
+    finally:
+        daemon.stop()
+        thread.join()
+    return sorted(results)
+
+
+@pytest.fixture
+def inbox(synthetic_files, tmp_path):
+    layout_path, input_path = synthetic_files
+    folder = tmp_path / "entrada"
+    folder.mkdir()
+    return WatchFolder(str(folder), layout_path), input_path
+
+
+def test_dropped_files_are_converted_and_archived(inbox):
+    folder, input_path = inbox
+
+    def drop():
+        shutil.copy(input_path, os.path.join(folder.folder, "a.csv"))
+        with open(os.path.join(folder.folder, "notas.txt"), "w") as f:
+            f.write("não é entrada\n")
+
+    assert watch([folder], 1, drop) == [("a.csv", "ok", "")]
+    assert sorted(os.listdir(folder.output)) == [
+        watcher.STATE_FILE, "a_csv1.txt"]
+    assert sorted(os.listdir(folder.archive)) == [
+        "a.csv", "a.csv.report.json"]
+    # .txt is this tool's output, never picked up as input
+    assert sorted(os.listdir(folder.folder)) == [
+        "erros", "notas.txt", "processados", "saida"]
+
+
+def test_bad_input_goes_to_errors_with_the_message(inbox):
+    folder, _ = inbox
+
+    def drop():
+        with open(os.path.join(folder.folder, "ruim.csv"), "w") as f:
+            f.write("campo_0\n\n")
+
+    [(name, status, error)] = watch([folder], 1, drop)
+    assert (name, status) == ("ruim.csv", "erro")
+    assert sorted(os.listdir(folder.errors)) == [
+        "ruim.csv", "ruim.csv.erro.txt", "ruim.csv.errors.csv",
+        "ruim.csv.report.json"]
+    with open(os.path.join(folder.errors, "ruim.csv.erro.txt"),
+              encoding="utf-8") as f:
+        assert f.read() == error + "\n"
+    assert os.listdir(folder.archive) == []
+
+
+def test_journaled_files_are_only_archived(inbox):
+    folder, input_path = inbox
+    path = os.path.join(folder.folder, "a.csv")
+    shutil.copy(input_path, path)
+    os.makedirs(folder.output)
+    state = watcher.WatchState(
+        os.path.join(folder.output, watcher.STATE_FILE))
+    state.mark("a.csv", watcher._stamp(path), "ok")
+
+    assert watch([folder], 1) == [("a.csv", "ok", "")]
+    assert os.listdir(folder.archive) == ["a.csv"]
+    assert not os.path.exists(os.path.join(folder.output, "a_csv1.txt"))
+    # the entry is dropped once the file has left the folder
+    assert watcher.WatchState(state.path).is_done(
+        "a.csv", watcher._stamp(os.path.join(folder.archive, "a.csv"))
+    ) is None
+
+
+def test_output_path_keeps_the_input_extension(tmp_path):
+    folder = WatchFolder(str(tmp_path), "layout.csv")
+    assert folder.output == str(tmp_path / "saida")
+    assert watcher.output_path(folder, "a.csv") == str(
+        tmp_path / "saida" / "a_csv.txt")
+    assert watcher.output_path(folder, "a.XLSX") == str(
+        tmp_path / "saida" / "a_xlsx.txt")
+
+
+@pytest.mark.parametrize("second, message", [
+    ({"output": "a/saida"}, "a mesma pasta de saída aparece mais de uma vez"),
+    ({"archive": "a"}, "a pasta de processados não pode ser uma pasta "
+                       "monitorada"),
+    ({"errors": "a"}, "a pasta de erros não pode ser uma pasta monitorada"),
+])
+def test_folders_that_feed_each_other_are_refused(tmp_path, second,
+                                                  message):
+    paths = {key: str(tmp_path / value) for key, value in second.items()}
+    folders = [WatchFolder(str(tmp_path / "a"), "layout.csv"),
+               WatchFolder(str(tmp_path / "b"), "layout.csv", **paths)]
+    assert any(message in error for error in watcher.check_folders(folders))
+    with pytest.raises(ValueError, match="erros na configuração"):
+        watcher.FolderWatcher(folders).run()
+
+
+def test_output_inside_the_watched_folder_is_refused(tmp_path):
+    folder = WatchFolder(str(tmp_path), "layout.csv", output=str(tmp_path))
+    assert watcher.check_folders([folder]) == [
+        f"{tmp_path}: a pasta de saída não pode ser uma pasta monitorada"]
+
+
+def test_config_paths_are_relative_to_it(tmp_path):
+    path = tmp_path / "pastas.csv"
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("Pasta;Layout;Arquivos\nentrada;layout.csv;2\n;layout.csv;\n")
+    with pytest.raises(ValueError, match="pasta 2: faltando folder"):
+        watcher.load_watch_config(str(path))
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("Pasta;Layout;Arquivos\nentrada;layout.csv;2\n")
+    [folder] = watcher.load_watch_config(str(path))
+    assert folder.folder == str(tmp_path / "entrada")
+    assert folder.layout == str(tmp_path / "layout.csv")
+    assert folder.errors == str(tmp_path / "entrada" / "erros")
+    assert folder.num_files == "2"
+
+
+def test_unfinished_files_wait_for_the_settle_time(inbox):
+    folder, input_path = inbox
+    path = os.path.join(folder.folder, "a.csv")
+    shutil.copy(input_path, path)
+    daemon = watcher.FolderWatcher([folder], settle=60)
+    assert list(daemon._ready(set())) == []
+    # a file closed after writing is ready at once
+    assert list(daemon._ready({path})) == [(folder, path)]
@@ -0,0 +1,170 @@
+import os
+
+import numpy as np
+import pytest
+
+from model.model import Model
+from model.writer import NEWLINE, TextWriter, part_path, part_sizes
+
+RECORDS = [f"registro {i:02d}" for i in range(10)]
+
+
+def block(records: list[str]) -> np.ndarray:
+    data = b"".join(NEWLINE + record.encode("cp1252") for record in records)
+    return np.frombuffer(data, dtype=np.uint8).reshape(len(records), -1)
+
+
+def read_parts(paths: list[str]) -> list[list[str]]:
+    parts = []
+    for path in paths:
+        with open(path, "rb") as f:
+            data = f.read()
+        parts.append(data.decode("cp1252").split(NEWLINE.decode())
+                     if data else [])
+    return parts
+
+
+def test_part_sizes_spread_the_remainder():
+    assert part_sizes(10, 3) == [4, 3, 3]
+    assert part_sizes(2, 3) == [1, 1, 0]
+    assert part_sizes(0, 1) == [0]
+
+
+def test_parts_follow_the_total(tmp_path):
+    output_path = str(tmp_path / "saida.txt")
+    with TextWriter(output_path, 3, len(RECORDS)) as out:
+        out.write_records(RECORDS[:6])
+        out.write_records(RECORDS[6:])
+
+    assert out.paths == [part_path(output_path, i) for i in (1, 2, 3)]
+    assert read_parts(out.paths) == [RECORDS[:4], RECORDS[4:7], RECORDS[7:]]
+    assert sorted(os.listdir(tmp_path)) == [
+        "saida1.txt", "saida2.txt", "saida3.txt"]
+
+
+def test_empty_parts_are_still_written(tmp_path):
+    with TextWriter(str(tmp_path / "saida.txt"), 3, 2) as out:
+        out.write_records(RECORDS[:2])
+    assert read_parts(out.paths) == [RECORDS[:1], RECORDS[1:2], []]
+
+
+def test_failed_write_leaves_no_files(tmp_path):
+    try:
+        with TextWriter(str(tmp_path / "saida.txt"), 2, 4) as out:
+            out.write_records(RECORDS[:3])
+            raise RuntimeError
+    except RuntimeError:
+        pass
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.parametrize("total", [None, 4, 25])
+def test_parts_are_rebalanced_after_a_wrong_total(tmp_path, total):
+    with TextWriter(str(tmp_path / "saida.txt"), 3, total) as out:
+        out.write_records(RECORDS)
+
+    assert read_parts(out.paths) == [RECORDS[:4], RECORDS[4:7], RECORDS[7:]]
+    assert sorted(os.listdir(tmp_path)) == [
+        "saida1.txt", "saida2.txt", "saida3.txt"]
+
+
+def test_rolling_parts_by_records(tmp_path):
+    output_path = str(tmp_path / "saida.txt")
+    with TextWriter(output_path, max_records=4) as out:
+        out.write_records(RECORDS)
+
+    assert out.paths == [part_path(output_path, i) for i in (1, 2, 3)]
+    assert read_parts(out.paths) == [RECORDS[:4], RECORDS[4:8], RECORDS[8:]]
+
+
+def test_rolling_parts_by_bytes(tmp_path):
+    size = len(RECORDS[0])
+    max_bytes = 3 * size + 2 * len(NEWLINE)
+    with TextWriter(str(tmp_path / "saida.txt"), max_bytes=max_bytes) as out:
+        out.write_records(RECORDS)
+
+    assert read_parts(out.paths) == [
+        RECORDS[:3], RECORDS[3:6], RECORDS[6:9], RECORDS[9:]]
+    assert all(os.path.getsize(path) <= max_bytes for path in out.paths)
+
+
+def test_oversized_record_leaves_no_files(tmp_path):
+    with pytest.raises(ValueError, match="registro 2"):
+        with TextWriter(str(tmp_path / "saida.txt"), max_bytes=12) as out:
+            out.write_records(["curto", "x" * 13])
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.parametrize("limit", [
+    {"max_part_records": 70}, {"max_part_bytes": 20000}])
+def test_rolling_never_splits_a_record(synthetic_files, tmp_path, limit):
+    layout_path, input_path = synthetic_files
+    model = Model()
+    model.convert_file(layout_path, input_path, str(tmp_path / "a.txt"))
+    with open(model.written_paths[0], "rb") as f:
+        expected = f.read()
+
+    model = Model()
+    model.chunk_size = 64
+    for name, value in limit.items():
+        setattr(model, name, value)
+    model.convert_file(layout_path, input_path, str(tmp_path / "b.txt"))
+    parts = []
+    for path in model.written_paths:
+        with open(path, "rb") as f:
+            parts.append(f.read())
+    assert len(parts) > 2
+    assert NEWLINE.join(parts) == expected
+    # each part parses on its own, so none starts mid-record
+    assert sum(
+        Model().parse_file(layout_path, path, str(tmp_path / "parte.csv"))
+        for path in model.written_paths) == 500
+
+
+@pytest.mark.parametrize("total", [10, None, 4, 25])
+def test_blocks_and_strings_fill_the_same_parts(tmp_path, total):
+    with TextWriter(str(tmp_path / "saida.txt"), 3, total) as out:
+        out.write_records(RECORDS[:2])
+        out.write_block(block(RECORDS[2:9]))
+        out.write_records(RECORDS[9:])
+    assert read_parts(out.paths) == [RECORDS[:4], RECORDS[4:7], RECORDS[7:]]
+
+
+def test_blocks_roll_by_records_and_bytes(tmp_path):
+    size = len(RECORDS[0])
+    with TextWriter(str(tmp_path / "a.txt"), max_records=4,
+                    part_separator="-") as out:
+        out.write_block(block(RECORDS[:3]))
+        out.write_block(block(RECORDS[3:]))
+    assert out.paths[0].endswith("a-1.txt")
+    assert read_parts(out.paths) == [RECORDS[:4], RECORDS[4:8], RECORDS[8:]]
+
+    max_bytes = 3 * size + 2 * len(NEWLINE)
+    with TextWriter(str(tmp_path / "b.txt"), max_bytes=max_bytes) as out:
+        out.write_block(block(RECORDS))
+    assert read_parts(out.paths) == [
+        RECORDS[:3], RECORDS[3:6], RECORDS[6:9], RECORDS[9:]]
+
+
+def test_encoded_records_match_rendered_strings(tmp_path):
+    from benchmarks import synthetic
+
+    fields = synthetic.make_layout(20, seed=11, new_line_every=7,
+                                   null_ratio=0)
+    layout_path = str(tmp_path / "layout.csv")
+    input_path = str(tmp_path / "input.csv")
+    synthetic.write_layout(fields, layout_path)
+    synthetic.write_input(fields, 300, input_path, seed=11)
+
+    outputs = []
+    for engine in ("columns", "rows"):
+        model = Model()
+        model.engine = engine
+        model.chunk_size = 70
+        model.convert_file(layout_path, input_path,
+                           str(tmp_path / f"{engine}.txt"), "2")
+        outputs.append(read_parts(model.written_paths))
+    assert model._record_encoder() is None
+    model.engine = "columns"
+    assert model._record_encoder() is not None
+    assert outputs[0] == outputs[1]
@@ -1,45 +1,93 @@
+import numpy as np
 import pandas as pd
-import re
 import unicodedata
+from decimal import Decimal
+from functools import lru_cache, partial
+from utils import numeric
 
+MEMO_SIZE = 8192
 
+
+class _AccentTable(dict):
+    def __missing__(self, char: int) -> str:
+        nfkd = unicodedata.normalize('NFKD', chr(char))
+        stripped = "".join([c for c in nfkd if not unicodedata.combining(c)])
+        self[char] = stripped
+        return stripped
+
+
+class _DigitTable(dict):
+    def __missing__(self, char: int) -> str | None:
+        kept = chr(char) if chr(char).isdecimal() else None
+        self[char] = kept
+        return kept
+
+
+ACCENT_TABLE = _AccentTable()
+DIGIT_TABLE = _DigitTable()
+
+
+@lru_cache(maxsize=MEMO_SIZE)
 def zero_as_blank(value: str, length: int) -> str:
     value = value.replace(",", ".")
     try:
-        value_float = float(value)
-    except Exception:
-        raise ValueError('Não foi possivel aplicar a formatacao "4"\n'
-                         ''f'"{value}" não é um numero')
-    if value_float == 0:
+        number = numeric.parse_decimal(value)
+    except ValueError:
+        raise ValueError(_not_a_number("4", value))
+    if number == 0:
         return ' '*length
     return value
 
 
-def format_as_money(value: str, decimals: str) -> str:
-    value = value.replace(",", ".")
+def parse_decimals(decimals: str) -> int:
     if not decimals:
-        decimals_int = 2
-    else:
-        decimals_int = int(decimals)
+        return 2
+    return int(decimals)
+
+
+def format_as_money(value: str, decimals: str) -> str:
+    return scale_money(value, parse_decimals(decimals))
 
+
+@lru_cache(maxsize=MEMO_SIZE)
+def scale_money(value: str, decimals: int) -> str:
+    value = value.replace(",", ".")
     try:
-        value_float = float(value)
-    except Exception:
-        raise ValueError('Não foi possivel aplicar a formatacao "3"\n'
-                         ''f'"{value}" não é um numero')
-    fator = 10 ** decimals_int
-    return str(round(value_float * fator))
+        return str(numeric.scale_decimal(
+            numeric.parse_decimal(value), decimals))
+    except ValueError:
+        raise ValueError(_not_a_number("3", value))
+
+
+def _not_a_number(code: str, value: str) -> str:
+    return (f'Não foi possivel aplicar a formatacao "{code}"\n'
+            f'"{value}" não é um numero')
 
 
 def only_digits(value: str) -> str:
-    return re.sub(r"\D", "", value or "")
+    if not value:
+        return ""
+    if value.isascii() and value.isdecimal():
+        return value
+    return _only_digits(value)
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def _only_digits(value: str) -> str:
+    return value.translate(DIGIT_TABLE)
 
 
 def remove_accents(value: str) -> str:
     if value is None:
         return ""
-    nfkd = unicodedata.normalize('NFKD', value)
-    return "".join([c for c in nfkd if not unicodedata.combining(c)]).upper()
+    if value.isascii():
+        return value.upper()
+    return _strip_accents(value)
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def _strip_accents(value: str) -> str:
+    return value.translate(ACCENT_TABLE).upper()
 
 
 FORMATTERS = {
@@ -49,6 +97,40 @@ FORMATTERS = {
     "4": zero_as_blank
 }
 
+# Per-value memos of the rows engine. The column engine formats each
+# unique value once after factorizing, so it does not go through them.
+MEMOS = {
+    "1": _only_digits,
+    "2": _strip_accents,
+    "3": scale_money,
+    "4": zero_as_blank
+}
+
+
+def memo_stats(since: dict | None = None) -> dict:
+    stats = {}
+    for code, memo in MEMOS.items():
+        info = memo.cache_info()
+        hits, misses = info.hits, info.misses
+        if since and code in since:
+            hits -= since[code]["hits"]
+            misses -= since[code]["misses"]
+        calls = hits + misses
+        stats[code] = {
+            "formatter": FORMATTERS[code].__name__,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / calls if calls else 0.0,
+            "size": info.currsize,
+            "max_size": info.maxsize,
+        }
+    return stats
+
+
+def clear_memos() -> None:
+    for memo in MEMOS.values():
+        memo.cache_clear()
+
 
 def apply_format_rules(
         value: str, codes: list[str], length: int, decimals: int) -> str:
@@ -64,6 +146,151 @@ def apply_format_rules(
     return value
 
 
+def _map_unique(values: pd.Series, func) -> tuple[pd.Series, dict]:
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    results = np.empty(len(uniques), dtype=object)
+    failed = {}
+    for k, unique in enumerate(uniques):
+        try:
+            results[k] = func(unique)
+        except Exception as e:
+            results[k] = ""
+            failed[k] = str(e)
+    formatted = pd.Series(results[codes], index=values.index)
+    return formatted, _failed_rows(values.index, codes, failed)
+
+
+def _failed_rows(index: pd.Index, codes: np.ndarray, failed: dict) -> dict:
+    if not failed:
+        return {}
+    positions = np.flatnonzero(np.isin(codes, list(failed)))
+    return {index[pos]: failed[codes[pos]] for pos in positions}
+
+
+def only_digits_column(values: pd.Series) -> tuple[pd.Series, dict]:
+    return values.str.translate(DIGIT_TABLE), {}
+
+
+def remove_accents_column(values: pd.Series) -> tuple[pd.Series, dict]:
+    ascii_mask = values.map(str.isascii)
+    if ascii_mask.all():
+        return values.str.upper(), {}
+    formatted = values.str.upper()
+    others, errors = _map_unique(
+        values[~ascii_mask], _strip_accents.__wrapped__)
+    formatted[~ascii_mask] = others
+    return formatted, errors
+
+
+def format_as_money_column(
+        values: pd.Series, decimals: str) -> tuple[pd.Series, dict]:
+    return scale_money_column(values, parse_decimals(decimals))
+
+
+def scale_money_column(
+        values: pd.Series, decimals_int: int) -> tuple[pd.Series, dict]:
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    results, invalid = numeric.scale_column(uniques, decimals_int)
+    failed = {k: _not_a_number("3", uniques[k].replace(",", "."))
+              for k in np.flatnonzero(invalid)}
+
+    formatted = pd.Series(results[codes], index=values.index)
+    return formatted, _failed_rows(values.index, codes, failed)
+
+
+def zero_as_blank_column(
+        values: pd.Series, length: int) -> tuple[pd.Series, dict]:
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    zero, invalid = numeric.zero_column(uniques)
+    results = np.array([unique.replace(",", ".") for unique in uniques],
+                       dtype=object)
+    failed = {k: _not_a_number("4", results[k])
+              for k in np.flatnonzero(invalid)}
+    results[zero] = ' ' * length
+
+    formatted = pd.Series(results[codes], index=values.index)
+    return formatted, _failed_rows(values.index, codes, failed)
+
+
+def unscale_money(value: str, decimals: int) -> str:
+    try:
+        number = int(value or "0")
+    except ValueError:
+        return value
+    return f"{Decimal(number).scaleb(-decimals):f}"
+
+
+def unscale_money_column(values: pd.Series, decimals: int) -> pd.Series:
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    results = np.array([unscale_money(unique, decimals)
+                        for unique in uniques], dtype=object)
+    return pd.Series(results[codes], index=values.index)
+
+
+COLUMN_FORMATTERS = {
+    "1": only_digits_column,
+    "2": remove_accents_column,
+    "3": format_as_money_column,
+    "4": zero_as_blank_column
+}
+
+
+def apply_format_rules_column(
+        values: pd.Series, codes: list[str],
+        length: int, decimals: str) -> tuple[pd.Series, dict]:
+    return run_column_pipeline(
+        values, compile_column_format_rules(codes, length, decimals))
+
+
+def compile_format_rules(
+        codes, length: int, decimals: str, report=None) -> tuple:
+    pipeline = []
+    for code in codes:
+        if code == "3":
+            step = partial(scale_money, decimals=parse_decimals(decimals))
+        elif code == "4":
+            step = partial(zero_as_blank, length=length)
+        elif code in FORMATTERS:
+            step = FORMATTERS[code]
+        else:
+            continue
+        if report is not None:
+            step = report.wrap_formatter(
+                f"{code}:{FORMATTERS[code].__name__}", step)
+        pipeline.append(step)
+    return tuple(pipeline)
+
+
+def compile_column_format_rules(
+        codes, length: int, decimals: str, report=None) -> tuple:
+    pipeline = []
+    for code in codes:
+        if code == "3":
+            step = partial(
+                scale_money_column, decimals_int=parse_decimals(decimals))
+        elif code == "4":
+            step = partial(zero_as_blank_column, length=length)
+        elif code in COLUMN_FORMATTERS:
+            step = COLUMN_FORMATTERS[code]
+        else:
+            continue
+        if report is not None:
+            step = report.wrap_formatter(
+                f"{code}:{FORMATTERS[code].__name__}", step, column=True)
+        pipeline.append(step)
+    return tuple(pipeline)
+
+
+def run_column_pipeline(
+        values: pd.Series, pipeline: tuple) -> tuple[pd.Series, dict]:
+    errors = {}
+    for formatter in pipeline:
+        values, new_errors = formatter(values)
+        for pos, msg in new_errors.items():
+            errors.setdefault(pos, msg)
+    return values, errors
+
+
 def verify_formatacao(row: pd.Series) -> list | None:
     errors = []
     splited = str(row['formatacao']).split(';')
@@ -18,3 +18,12 @@ def parse_allign(x: str, default: str = "left") -> str:
     if s in {"right", "r", "direita", "d"}:
         return "right"
     return default
+
+
+def format_duration(seconds: float) -> str:
+    seconds = max(0, int(round(seconds)))
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes:02d}:{seconds:02d}"
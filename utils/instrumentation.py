@@ -0,0 +1,134 @@
+import json
+import sys
+import time
+from contextlib import contextmanager
+
+
+class StageStats:
+    __slots__ = ("seconds", "calls", "rows_in", "rows_out")
+
+    def __init__(self) -> None:
+        self.seconds = 0.0
+        self.calls = 0
+        self.rows_in = 0
+        self.rows_out = 0
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class FormatterStats:
+    __slots__ = ("seconds", "calls", "values")
+
+    def __init__(self) -> None:
+        self.seconds = 0.0
+        self.calls = 0
+        self.values = 0
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def totals(self) -> tuple[float, int, int]:
+        return self.seconds, self.calls, self.values
+
+    def add(self, seconds: float, calls: int, values: int) -> None:
+        self.seconds += seconds
+        self.calls += calls
+        self.values += values
+
+
+class TimedFormatter:
+    __slots__ = ("func", "stats", "column")
+
+    def __init__(self, func, stats: FormatterStats, column: bool) -> None:
+        self.func = func
+        self.stats = stats
+        self.column = column
+
+    def __call__(self, value):
+        started = time.perf_counter()
+        try:
+            return self.func(value)
+        finally:
+            self.stats.seconds += time.perf_counter() - started
+            self.stats.calls += 1
+            self.stats.values += len(value) if self.column else 1
+
+
+def formatter_stats(plan) -> list[FormatterStats]:
+    """Stats behind the timed steps of a plan, each once, in plan order.
+
+    A pickled copy of the plan yields its own stats in the same order, so
+    what a worker process measured can be added back to the original.
+    """
+    found = {}
+    for spec in plan:
+        for step in spec.formatters + spec.column_formatters:
+            if isinstance(step, TimedFormatter):
+                found.setdefault(id(step.stats), step.stats)
+    return list(found.values())
+
+
+def peak_rss_mb() -> float | None:
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return peak / 2**20
+    return peak / 2**10
+
+
+class RunReport:
+    def __init__(self) -> None:
+        self.started = time.time()
+        self.status = "running"
+        self.error = ""
+        self.stages: dict[str, StageStats] = {}
+        self.formatters: dict[str, FormatterStats] = {}
+        self.bytes_written = 0
+        self.files: list[str] = []
+        # filled only for single-process runs of the rows engine
+        self.rows_memo: dict = {}
+        self.incremental: dict = {}
+
+    @contextmanager
+    def stage(self, name: str, rows_in: int = 0):
+        stats = self.stages.setdefault(name, StageStats())
+        started = time.perf_counter()
+        try:
+            yield stats
+        finally:
+            stats.seconds += time.perf_counter() - started
+            stats.calls += 1
+            stats.rows_in += rows_in
+
+    def wrap_formatter(self, name: str, func, column: bool = False):
+        stats = self.formatters.setdefault(name, FormatterStats())
+        return TimedFormatter(func, stats, column)
+
+    def finish(self, status: str, error: str = "") -> None:
+        self.status = status
+        self.error = error
+
+    def to_dict(self) -> dict:
+        return {
+            "status": self.status,
+            "error": self.error,
+            "started": self.started,
+            "seconds": time.time() - self.started,
+            "stages": {name: stats.to_dict()
+                       for name, stats in self.stages.items()},
+            "formatters": {code: stats.to_dict()
+                           for code, stats in self.formatters.items()},
+            "bytes_written": self.bytes_written,
+            "files": self.files,
+            "rows_memo": self.rows_memo,
+            "incremental": self.incremental,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+
+    def write_json(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
@@ -0,0 +1,147 @@
+from decimal import Context, Decimal, InvalidOperation, ROUND_HALF_UP
+import numpy as np
+
+MAX_EXPONENT = 308
+FLOAT_DIGITS = 15
+FAST_WIDTH = 40
+
+
+def parse_decimal(value: str) -> Decimal:
+    try:
+        number = Decimal(value.replace(",", "."))
+    except (InvalidOperation, ValueError):
+        raise ValueError(value)
+    if number.is_snan():
+        raise ValueError(value)
+    return number
+
+
+def is_finite(number: Decimal) -> bool:
+    return number.is_finite() and number.adjusted() <= MAX_EXPONENT
+
+
+def scale_decimal(number: Decimal, decimals: int) -> int:
+    if not is_finite(number):
+        raise ValueError(number)
+    digits = len(number.as_tuple().digits)
+    context = Context(prec=max(28, digits + decimals + 2),
+                      rounding=ROUND_HALF_UP)
+    scaled = number.scaleb(decimals, context=context)
+    return int(scaled.quantize(Decimal(1), context=context))
+
+
+DIGIT, POINT, SIGN, OTHER = 1, 2, 4, 8
+KINDS = np.full(256, OTHER, dtype=np.uint8)
+KINDS[0] = 0
+KINDS[ord("0"):ord("9") + 1] = DIGIT
+KINDS[[ord("."), ord(",")]] = POINT
+KINDS[[ord("+"), ord("-")]] = SIGN
+
+
+class DigitColumn:
+    """Plain decimal strings ([sign]digits[.,]digits) as a byte matrix."""
+
+    def __init__(self, uniques) -> None:
+        self.texts = np.asarray(uniques, dtype=object)
+        texts = self.texts.tolist()
+        lengths = np.fromiter(map(len, texts), dtype=np.int64,
+                              count=len(texts))
+        rows = np.flatnonzero((lengths > 0) & (lengths <= FAST_WIDTH))
+        try:
+            fixed = self.texts[rows].astype("S" if len(rows) else "S1")
+        except UnicodeEncodeError:
+            ascii = np.fromiter(map(str.isascii, texts), dtype=bool,
+                                count=len(texts))
+            rows = rows[ascii[rows]]
+            fixed = self.texts[rows].astype("S" if len(rows) else "S1")
+        codes = fixed.view(np.uint8).reshape(len(rows), fixed.itemsize)
+        kinds = KINDS[codes]
+        found = (np.bitwise_or.reduce(kinds[:, 1:], axis=1) |
+                 (kinds[:, 0] & ~np.uint8(SIGN)))
+        points = (kinds == POINT).sum(axis=1)
+        # NUL bytes are padding only past the end of the text
+        padded = (codes == 0).sum(axis=1) == codes.shape[1] - lengths[rows]
+        simple = (((found & (SIGN | OTHER)) == 0) & ((found & DIGIT) != 0) &
+                  (points <= 1) & padded)
+
+        self.simple = np.zeros(len(texts), dtype=bool)
+        self.simple[rows[simple]] = True
+        self.rows = rows[simple]
+        self.codes = codes[simple]
+        self.negative = self.codes[:, 0] == ord("-")
+        self.point = np.where(
+            points[simple] > 0,
+            (kinds[simple] == POINT).argmax(axis=1), lengths[self.rows])
+        self.int_digits = self.point - (kinds[simple, 0] == SIGN)
+
+    def is_zero(self) -> np.ndarray:
+        return ~((self.codes >= ord("1")) & (self.codes <= ord("9"))).any(
+            axis=1)
+
+    def scale(self, decimals: int) -> tuple[np.ndarray, np.ndarray]:
+        fits = self.int_digits + decimals <= FLOAT_DIGITS
+        codes, point = self.codes[fits], self.point[fits]
+        columns = np.arange(codes.shape[1])
+        # cut each value after its last kept decimal: the float parse of
+        # the remaining digits is exact once scaled and rounded to integer
+        cut = point + decimals + 1
+        kept = np.where(columns < cut[:, None] - (decimals == 0), codes, 0)
+        kept[kept == ord(",")] = ord(".")
+        if decimals == 0:
+            kept[self.int_digits[fits] == 0] = ord("0") * (columns == 0)
+        floats = kept.view(f"S{codes.shape[1]}").ravel().astype(float)
+        scaled = np.rint(floats * 10.0 ** decimals).astype(np.int64)
+
+        # half-up only depends on the first dropped digit
+        dropped = np.take_along_axis(
+            np.pad(codes, ((0, 0), (0, 1))),
+            np.minimum(cut, codes.shape[1])[:, None], axis=1).ravel()
+        up = ((dropped >= ord("5")) & (dropped <= ord("9"))).astype(np.int64)
+        scaled += np.where(self.negative[fits], -up, up)
+        return self.rows[fits], scaled
+
+
+def scale_column(uniques, decimals: int) -> tuple[np.ndarray, np.ndarray]:
+    column = DigitColumn(uniques)
+    results = np.full(len(column.texts), "", dtype=object)
+    invalid = np.zeros(len(column.texts), dtype=bool)
+    done = np.zeros(len(column.texts), dtype=bool)
+
+    rows, scaled = column.scale(decimals)
+    results[rows] = list(map(str, scaled.tolist()))
+    done[rows] = True
+    for k in np.flatnonzero(~done):
+        try:
+            results[k] = str(scale_decimal(
+                parse_decimal(column.texts[k]), decimals))
+        except ValueError:
+            invalid[k] = True
+    return results, invalid
+
+
+def zero_column(uniques) -> tuple[np.ndarray, np.ndarray]:
+    column = DigitColumn(uniques)
+    zero = np.zeros(len(column.texts), dtype=bool)
+    invalid = np.zeros(len(column.texts), dtype=bool)
+
+    zero[column.rows] = column.is_zero()
+    for k in np.flatnonzero(~column.simple):
+        try:
+            zero[k] = parse_decimal(column.texts[k]) == 0
+        except ValueError:
+            invalid[k] = True
+    return zero, invalid
+
+
+def invalid_column(uniques, finite: bool = False) -> np.ndarray:
+    column = DigitColumn(uniques)
+    invalid = np.zeros(len(column.texts), dtype=bool)
+    for k in np.flatnonzero(~column.simple):
+        try:
+            number = parse_decimal(column.texts[k])
+        except ValueError:
+            invalid[k] = True
+            continue
+        if finite and not is_finite(number):
+            invalid[k] = True
+    return invalid
@@ -1,4 +1,6 @@
+import numpy as np
 import pandas as pd
+from utils import numeric
 
 EXPECTED_COLUMNS = [
     "campo", "tamanho", "decimais", "alinhamento",
@@ -46,3 +48,20 @@ def verify_preenchimento(row: pd.Series, i: int) -> str | None:
     if error:
         return f'Linha {i+1}: Preenchimento deve ter um caractere'
     return None
+
+
+def blank_mask(values: pd.Series) -> np.ndarray:
+    stripped = values.astype(str).str.strip()
+    return (values.isna() | (stripped == "")).to_numpy()
+
+
+def non_numeric_mask(values: pd.Series, finite: bool = False) -> np.ndarray:
+    codes, uniques = pd.factorize(
+        values.astype(str).str.replace(",", ".", regex=False),
+        use_na_sentinel=False)
+    invalid = numeric.invalid_column(uniques, finite)
+    return invalid[codes]
+
+
+def overflow_mask(values: pd.Series, length: int) -> np.ndarray:
+    return (values.astype(str).str.len() > length).to_numpy()
@@ -1,6 +1,7 @@
 import customtkinter as ctk
 from CTkMessagebox import CTkMessagebox
 from utils.assets_manager import load_icon
+from utils.helpers import format_duration
 
 
 ctk.set_appearance_mode("dark")
@@ -12,7 +13,7 @@ class MainView(ctk.CTk):
         super().__init__()
         self.controller = controller
         self.title("Conversor TXT posicional")
-        self.geometry("650x400")
+        self.geometry("650x520")
         self.setup_ui()
 
         self.grid_columnconfigure(0, weight=1)
@@ -22,6 +23,7 @@ class MainView(ctk.CTk):
         self.grid_rowconfigure(2, weight=1)
         self.grid_rowconfigure(3, weight=1)
         self.grid_rowconfigure(4, weight=0)
+        self.grid_rowconfigure(5, weight=0)
 
     def setup_ui(self):
         self.title_label = ctk.CTkLabel(
@@ -91,6 +93,7 @@ class MainView(ctk.CTk):
         self.button_frame.columnconfigure(0, weight=1)
         self.button_frame.columnconfigure(1, weight=1)
         self.button_frame.columnconfigure(2, weight=1)
+        self.button_frame.columnconfigure(3, weight=1)
 
         self.download_button = ctk.CTkButton(
             self.button_frame, text="", width=35, height=35,
@@ -108,13 +111,19 @@ class MainView(ctk.CTk):
         )
         self.convert_button.grid(row=0, column=1, padx=10)
 
+        self.preview_button = ctk.CTkButton(
+            self.button_frame, text="Prévia", width=35, height=35,
+            command=self.preview_file
+        )
+        self.preview_button.grid(row=0, column=2, padx=10)
+
         self.help_button = ctk.CTkButton(
             self.button_frame, text="", width=35, height=35,
             fg_color="transparent", text_color="#000000",
             image=load_icon('help.png'),
             compound="left", command=self.help_info
         )
-        self.help_button.grid(row=0, column=2, padx=10)
+        self.help_button.grid(row=0, column=3, padx=10)
 
         self.num_frame = ctk.CTkFrame(self, fg_color="transparent")
         self.num_frame.grid(
@@ -131,12 +140,47 @@ class MainView(ctk.CTk):
             self.num_frame, placeholder_text="1", height=30)
         self.num_of_files_entry.grid(row=1, column=0, sticky="we")
 
+        self.label_sheets = ctk.CTkLabel(
+            self.num_frame, text="Abas (* = todas)")
+        self.label_sheets.grid(row=2, column=0, sticky="w")
+
+        self.sheets_entry = ctk.CTkEntry(
+            self.num_frame, placeholder_text="primeira", height=30)
+        self.sheets_entry.grid(row=3, column=0, sticky="we")
+
+        self.split_sheets_check = ctk.CTkCheckBox(
+            self.num_frame, text="Um TXT por aba")
+        self.split_sheets_check.grid(row=4, column=0, pady=(5, 0),
+                                     sticky="w")
+
+        self.progress_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.progress_frame.grid(
+            row=5, column=0, columnspan=3,
+            padx=20, pady=(0, 20), sticky="ew"
+        )
+        self.progress_frame.columnconfigure(0, weight=1)
+
+        self.progress_bar = ctk.CTkProgressBar(self.progress_frame)
+        self.progress_bar.set(0)
+        self.progress_bar.grid(row=0, column=0, padx=(0, 10), sticky="ew")
+
+        self.cancel_button = ctk.CTkButton(
+            self.progress_frame, text="Cancelar", width=100,
+            state="disabled", command=self.cancel_conversion
+        )
+        self.cancel_button.grid(row=0, column=1)
+
+        self.progress_label = ctk.CTkLabel(self.progress_frame, text="")
+        self.progress_label.grid(row=1, column=0, columnspan=2, sticky="w")
+
     def select_input_file(self) -> None:
         file_path = ctk.filedialog.askopenfilename(
             title="Selecione o arquivo de entrada",
             filetypes=[
                 ("Excel Files", "*.xlsx"),
                 ("Excel 97-2003", "*.xls"),
+                ("CSV", "*.csv"),
+                ("Texto delimitado (TSV)", "*.tsv"),
                 ("Todos os arquivos", "*.*")
             ]
         )
@@ -174,15 +218,63 @@ class MainView(ctk.CTk):
             self.controller.download_sample_layout(folder_path)
 
     def convert_file(self) -> None:
-        self.controller.convert_file(self.num_of_files_entry.get())
+        self.controller.convert_file(
+            self.num_of_files_entry.get(), self.sheets_entry.get(),
+            bool(self.split_sheets_check.get()))
+
+    def preview_file(self) -> None:
+        self.controller.preview_file()
+
+    def preview_started(self) -> None:
+        self.preview_button.configure(state="disabled", text="Lendo...")
+
+    def preview_finished(self) -> None:
+        self.preview_button.configure(state="normal", text="Prévia")
+
+    def show_preview(self, preview) -> None:
+        PreviewWindow(self, preview)
+
+    def cancel_conversion(self) -> None:
+        self.cancel_button.configure(state="disabled")
+        self.progress_label.configure(text="Cancelando...")
+        self.controller.cancel_conversion()
+
+    def conversion_started(self) -> None:
+        self.convert_button.configure(state="disabled")
+        self.cancel_button.configure(state="normal")
+        self.progress_bar.set(0)
+        self.progress_label.configure(text="Iniciando conversão...")
+
+    def conversion_finished(self) -> None:
+        self.convert_button.configure(state="normal")
+        self.cancel_button.configure(state="disabled")
+        self.progress_bar.set(0)
+        self.progress_label.configure(text="")
+
+    def show_progress(self, done: int, total: int | None,
+                      rate: float, eta: float | None) -> None:
+        text = f"{done} linhas processadas · {rate:.0f} linhas/s"
+        if total:
+            self.progress_bar.set(min(1.0, done / total))
+            text = f"{done} de {total} linhas · {rate:.0f} linhas/s"
+        if eta is not None:
+            text += f" · restante {format_duration(eta)}"
+        self.progress_label.configure(text=text)
 
     def help_info(self) -> None:
         help_message = (
             "Instruções de uso:\n\n"
-            "1. Selecione o arquivo de entrada (Excel .xlsx ou .xls).\n"
+            "1. Selecione o arquivo de entrada (Excel .xlsx/.xls, CSV "
+            "ou TSV).\n"
             "2. Selecione o arquivo de layout (CSV).\n"
             "3. Escolha onde salvar o arquivo de saída (.txt).\n"
             "4. Clique no ícone de conversão para iniciar o processo.\n\n"
+            "Em planilhas com várias abas, informe as abas separadas por "
+            "vírgula (ou * para todas) e marque \"Um TXT por aba\" para "
+            "gerar um arquivo para cada uma.\n\n"
+            "Para conferir o layout antes de converter, clique em Prévia: "
+            "as primeiras linhas são geradas com régua de colunas e cada "
+            "campo destacado.\n\n"
             "Para baixar um layout de exemplo, clique no ícone de download."
         )
         CTkMessagebox(title="Ajuda", message=help_message, icon="info")
@@ -195,14 +287,20 @@ class MainView(ctk.CTk):
 
 
 class ErrorsWindow(ctk.CTkToplevel):
+    page_size = 100
+
     def __init__(self, master, errors: str):
         super().__init__(master)
 
         self.title("Erro")
-        self.geometry("600x400")
+        self.geometry("600x440")
+
+        self.lines = errors.splitlines() or [""]
+        self.pages = max(1, -(-len(self.lines) // self.page_size))
+        self.page = 0
 
         frame = ctk.CTkFrame(self)
-        frame.pack(fill="both", expand=True, padx=10, pady=10)
+        frame.pack(fill="both", expand=True, padx=10, pady=(10, 5))
 
         self.textbox = ctk.CTkTextbox(frame, wrap="none")
         self.textbox.pack(side="left", fill="both", expand=True)
@@ -211,8 +309,100 @@ class ErrorsWindow(ctk.CTkToplevel):
         scrollbar.pack(side="right", fill="y")
         self.textbox.configure(yscrollcommand=scrollbar.set)
 
-        self.textbox.insert("0.0", errors)
+        if self.pages > 1:
+            nav = ctk.CTkFrame(self, fg_color="transparent")
+            nav.pack(fill="x", padx=10, pady=(0, 10))
+            self.previous_button = ctk.CTkButton(
+                nav, text="Anterior", width=100, command=self.previous_page)
+            self.previous_button.pack(side="left")
+            self.next_button = ctk.CTkButton(
+                nav, text="Próxima", width=100, command=self.next_page)
+            self.next_button.pack(side="right")
+            self.page_label = ctk.CTkLabel(nav, text="")
+            self.page_label.pack(side="top")
+
+        self.show_page()
+
+    def show_page(self) -> None:
+        start = self.page * self.page_size
+        self.textbox.configure(state="normal")
+        self.textbox.delete("0.0", "end")
+        self.textbox.insert(
+            "0.0", "\n".join(self.lines[start:start + self.page_size]))
+        self.textbox.configure(state="disabled")
+        if self.pages > 1:
+            self.page_label.configure(
+                text=f"Página {self.page + 1} de {self.pages}")
+            self.previous_button.configure(
+                state="normal" if self.page > 0 else "disabled")
+            self.next_button.configure(
+                state="normal" if self.page < self.pages - 1 else "disabled")
+
+    def previous_page(self) -> None:
+        if self.page > 0:
+            self.page -= 1
+            self.show_page()
+
+    def next_page(self) -> None:
+        if self.page < self.pages - 1:
+            self.page += 1
+            self.show_page()
+
+
+class PreviewWindow(ctk.CTkToplevel):
+    field_colors = ("#1f3b5c", "#2e5a3a")
+    ruler_color = "#8a8a8a"
+
+    def __init__(self, master, preview):
+        super().__init__(master)
+
+        self.title("Prévia")
+        self.geometry("760x480")
+
+        self.spans: dict[int, list] = {}
+        for span in preview.spans:
+            self.spans.setdefault(span.line, []).append(span)
+        self.ruler = preview.ruler()
+
+        self.textbox = ctk.CTkTextbox(
+            self, wrap="none", font=ctk.CTkFont(family="Courier", size=13))
+        self.textbox.pack(fill="both", expand=True, padx=10, pady=(10, 5))
+        self.textbox.tag_config("ruler", foreground=self.ruler_color)
+        for i, color in enumerate(self.field_colors):
+            self.textbox.tag_config(f"field{i}", background=color)
+
+        self.textbox.insert("end", "\n".join(self.ruler + preview.lines))
+        for line in range(1, len(self.ruler) + 1):
+            self.textbox.tag_add("ruler", f"{line}.0", f"{line}.end")
+        for line, spans in self.spans.items():
+            row = line + len(self.ruler) + 1
+            for i, span in enumerate(spans):
+                self.textbox.tag_add(
+                    f"field{i % len(self.field_colors)}",
+                    f"{row}.{span.start}", f"{row}.{span.end}")
         self.textbox.configure(state="disabled")
+        self.textbox.bind("<Motion>", self.show_field)
+
+        self.field_label = ctk.CTkLabel(
+            self, text=f"{preview.rows} linhas da entrada. "
+                       "Passe o mouse sobre um campo para ver suas posições.")
+        self.field_label.pack(fill="x", padx=10)
+
+        if preview.errors:
+            errors = ctk.CTkTextbox(self, wrap="none", height=90)
+            errors.pack(fill="x", padx=10, pady=(0, 10))
+            errors.insert("0.0", "\n".join(preview.errors))
+            errors.configure(state="disabled")
+
+    def show_field(self, event) -> None:
+        index = self.textbox.index(f"@{event.x},{event.y}")
+        row, column = (int(part) for part in index.split("."))
+        for span in self.spans.get(row - len(self.ruler) - 1, ()):
+            if span.start <= column < span.end:
+                self.field_label.configure(
+                    text=f"Campo '{span.name}': posições "
+                         f"{span.start + 1} a {span.end}")
+                return
 
 
 if __name__ == "__main__":